@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+
+LOG_DEBUG = 10
+LOG_INFO = 20
+LOG_WARNING = 30
+
+LOG_LEVEL_LABELS = {
+    LOG_DEBUG: "Все, включая тики",
+    LOG_INFO: "События",
+    LOG_WARNING: "Только предупреждения",
+}
+
+DEFAULT_LOG_CAPACITY = 2000
+
+
+@dataclass(frozen=True)
+class LogRecord:
+    timestamp: datetime
+    level: int
+    text: str
+
+    def format(self) -> str:
+        return f"[{self.timestamp.strftime('%H:%M:%S')}] {self.text}"
+
+
+class ActivityLog:
+    """
+    Журнал активности фиксированного размера: старые записи вытесняются,
+    так что память не растет при многодневных сессиях. Новые записи
+    копятся в pending, чтобы вид забирал их пачкой раз в кадр.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_LOG_CAPACITY):
+        self.capacity = max(1, capacity)
+        self._records: deque[LogRecord] = deque(maxlen=self.capacity)
+        self._pending: deque[LogRecord] = deque(maxlen=self.capacity)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def append(self, text: str, level: int = LOG_INFO) -> LogRecord:
+        record = LogRecord(timestamp=datetime.now(), level=level, text=text)
+        self._records.append(record)
+        self._pending.append(record)
+        return record
+
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def drain_pending(self, min_level: int = LOG_DEBUG) -> list[LogRecord]:
+        records = [record for record in self._pending if record.level >= min_level]
+        self._pending.clear()
+        return records
+
+    def records(self, min_level: int = LOG_DEBUG) -> list[LogRecord]:
+        return [record for record in self._records if record.level >= min_level]
+
+    def clear(self) -> None:
+        self._records.clear()
+        self._pending.clear()
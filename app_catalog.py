@@ -0,0 +1,272 @@
+"""
+Каталог приложений на вкладке «Правила»: строки источника, индекс поиска
+по ним и модель для QListView. Модель получает новый список целиком, но
+сама превращает его в вставки, удаления и изменения строк, поэтому поиск
+и смена правила не пересоздают весь список, а вид сохраняет выделение и
+прокрутку. Иконки запрашиваются в data(), то есть только для видимых строк.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QObject, Qt, QTimer
+
+from app_rules import RULE_LABELS, RULE_NONE
+from icon_cache import IconCache
+
+ROW_ROLE = Qt.ItemDataRole.UserRole
+NGRAM = 3
+# Строк индекса за один проход цикла событий (~10 мс на 1000 строк).
+INDEX_BUILD_STEP = 1000
+SEARCH_CACHE_SIZE = 32
+# Иконки приходят пачками: перерисовку откладываем, чтобы не дергать вид
+# на каждую.
+ICON_REFRESH_DELAY_MS = 50
+# Больше отдельных вставок и удалений за раз — сброс модели вместо диффа.
+MAX_DIFF_RUNS = 64
+
+
+@dataclass(frozen=True)
+class CatalogRow:
+    key: str
+    process_name: str
+    window_title: str = ""
+    exe_path: str = ""
+    rule: str = RULE_NONE
+    history: str = ""
+    favorite: bool = False
+
+    @property
+    def rule_label(self) -> str:
+        return RULE_LABELS.get(self.rule, RULE_LABELS[RULE_NONE])
+
+
+def unique_keys(rows: Iterable[CatalogRow]) -> list[CatalogRow]:
+    """Одинаковые ключи (два окна с одним заголовком) получают суффикс."""
+    seen: dict[str, int] = {}
+    result = []
+    for row in rows:
+        count = seen.get(row.key, 0)
+        seen[row.key] = count + 1
+        if count:
+            row = CatalogRow(**{**row.__dict__, "key": f"{row.key}#{count}"})
+        result.append(row)
+    return result
+
+
+def _runs(flags: Sequence[bool]) -> list[tuple[int, int]]:
+    """Непрерывные отрезки [first, last] из True."""
+    runs = []
+    start = -1
+    for position, flag in enumerate(flags):
+        if flag and start < 0:
+            start = position
+        elif not flag and start >= 0:
+            runs.append((start, position - 1))
+            start = -1
+    if start >= 0:
+        runs.append((start, len(flags) - 1))
+    return runs
+
+
+def _search_text(row: CatalogRow) -> str:
+    # Перевод строки в запросе из QLineEdit не встретится, так что совпадение
+    # не склеит имя процесса с заголовком.
+    return f"{row.process_name}\n{row.window_title}".lower()
+
+
+class CatalogSearchIndex:
+    """
+    Поиск подстроки через индекс триграмм: кандидаты берутся из самого
+    редкого n-грамма запроса и проверяются обычным `in`. Индекс строится
+    частями через build_step() (в простое цикла событий); пока он не готов
+    и для запросов короче n-грамма строки просматриваются подряд. Недавние
+    результаты запоминаются: стирание запроса их не пересчитывает.
+    """
+
+    def __init__(self, texts: Sequence[str]):
+        self.texts = list(texts)
+        self._postings: dict[str, list[int]] = {}
+        self._indexed = 0
+        self._results: OrderedDict[str, list[int]] = OrderedDict()
+
+    @property
+    def ready(self) -> bool:
+        return self._indexed >= len(self.texts)
+
+    def build_step(self, max_rows: int = INDEX_BUILD_STEP) -> bool:
+        """Индексирует следующие max_rows строк; True, когда индекс готов."""
+        postings = self._postings
+        stop = min(len(self.texts), self._indexed + max_rows)
+        for position in range(self._indexed, stop):
+            text = self.texts[position]
+            for gram in {text[i : i + NGRAM] for i in range(len(text) - NGRAM + 1)}:
+                try:
+                    postings[gram].append(position)
+                except KeyError:
+                    postings[gram] = [position]
+        self._indexed = stop
+        return self.ready
+
+    def search(self, query: str) -> list[int]:
+        """Позиции строк, содержащих query, в исходном порядке."""
+        query = query.lower()
+        if not query:
+            return list(range(len(self.texts)))
+        cached = self._results.get(query)
+        if cached is not None:
+            self._results.move_to_end(query)
+            return cached
+
+        texts = self.texts
+        previous = next(
+            (self._results[known] for known in reversed(self._results) if query.startswith(known)),
+            None,
+        )
+        if previous is not None:
+            # Пользователь дописывает запрос: сужаем прошлый результат.
+            candidates: Iterable[int] = previous
+        elif len(query) < NGRAM or not self.ready:
+            candidates = range(len(texts))
+        else:
+            grams = {query[i : i + NGRAM] for i in range(len(query) - NGRAM + 1)}
+            candidates = min((self._postings.get(gram, []) for gram in grams), key=len)
+        result = [position for position in candidates if query in texts[position]]
+        self._results[query] = result
+        while len(self._results) > SEARCH_CACHE_SIZE:
+            self._results.popitem(last=False)
+        return result
+
+
+class AppCatalog:
+    """Все строки текущего источника; поиск возвращает их подмножество."""
+
+    def __init__(self) -> None:
+        self.rows: list[CatalogRow] = []
+        self._index = CatalogSearchIndex(())
+
+    @property
+    def index_ready(self) -> bool:
+        return self._index.ready
+
+    def set_rows(self, rows: list[CatalogRow]) -> None:
+        texts = [_search_text(row) for row in rows]
+        # Смена правила или избранного не меняет текст: индекс остается.
+        if texts != self._index.texts:
+            self._index = CatalogSearchIndex(texts)
+        self.rows = rows
+
+    def build_index_step(self) -> bool:
+        return self._index.build_step()
+
+    def search(self, query: str) -> list[CatalogRow]:
+        query = query.strip()
+        if not query:
+            return list(self.rows)
+        return [self.rows[position] for position in self._index.search(query)]
+
+
+class AppCatalogModel(QAbstractListModel):
+    def __init__(self, icon_cache: IconCache, parent: QObject | None = None):
+        super().__init__(parent)
+        self._rows: list[CatalogRow] = []
+        self._positions: dict[str, int] | None = None
+        self._icon_cache = icon_cache
+        self._icon_refresh = QTimer(self)
+        self._icon_refresh.setSingleShot(True)
+        self._icon_refresh.setInterval(ICON_REFRESH_DELAY_MS)
+        self._icon_refresh.timeout.connect(self._refresh_icons)
+        icon_cache.icon_ready.connect(self._schedule_icon_refresh)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: N802
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        row = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            favorite_prefix = "★ " if row.favorite else ""
+            title = row.window_title or "Без активного заголовка"
+            return f"{favorite_prefix}{row.process_name} · {row.rule_label}\n{title}"
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self._icon_cache.icon(row.exe_path, row.process_name)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            title = row.window_title or "Без активного заголовка"
+            return f"{title}\n{row.rule_label} • {row.history}"
+        if role == ROW_ROLE:
+            return row
+        return None
+
+    def row_at(self, position: int) -> CatalogRow | None:
+        if 0 <= position < len(self._rows):
+            return self._rows[position]
+        return None
+
+    def position_of(self, key: str) -> int:
+        if self._positions is None:
+            self._positions = {row.key: position for position, row in enumerate(self._rows)}
+        return self._positions.get(key, -1)
+
+    def set_rows(self, rows: Sequence[CatalogRow]) -> None:
+        """Заменяет содержимое минимальным набором сигналов модели."""
+        new_rows = list(rows)
+        self._positions = None
+        old_keys = [row.key for row in self._rows]
+        new_keys = [row.key for row in new_rows]
+        if old_keys == new_keys:
+            self._replace_changed(new_rows)
+            return
+
+        wanted = set(new_keys)
+        kept = wanted.intersection(old_keys)
+        removed = _runs([key not in wanted for key in old_keys])
+        inserted = _runs([key not in kept for key in new_keys])
+        same_order = [key for key in old_keys if key in kept] == [
+            key for key in new_keys if key in kept
+        ]
+        if not same_order or len(removed) + len(inserted) > MAX_DIFF_RUNS:
+            # Строки поменяли порядок (например, недавние после нового
+            # наблюдения) или изменения разбросаны: дешевле сбросить модель.
+            self.beginResetModel()
+            self._rows = new_rows
+            self.endResetModel()
+            return
+
+        for first, last in reversed(removed):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._rows[first : last + 1]
+            self.endRemoveRows()
+        # Позиции вставок указаны в новом списке; вставляя по порядку,
+        # получаем ровно их.
+        for first, last in inserted:
+            self.beginInsertRows(QModelIndex(), first, last)
+            self._rows[first:first] = new_rows[first : last + 1]
+            self.endInsertRows()
+        self._replace_changed(new_rows)
+
+    def _replace_changed(self, new_rows: list[CatalogRow]) -> None:
+        first = last = -1
+        for position, (old, new) in enumerate(zip(self._rows, new_rows)):
+            if old != new:
+                if first < 0:
+                    first = position
+                last = position
+        self._rows = new_rows
+        if first >= 0:
+            self.dataChanged.emit(self.index(first), self.index(last))
+
+    def _schedule_icon_refresh(self, _key: object) -> None:
+        if not self._icon_refresh.isActive():
+            self._icon_refresh.start()
+
+    def _refresh_icons(self) -> None:
+        if self._rows:
+            self.dataChanged.emit(
+                self.index(0),
+                self.index(len(self._rows) - 1),
+                [Qt.ItemDataRole.DecorationRole],
+            )
@@ -5,12 +5,16 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 
-from config import Config, save_config
-
-RULE_WORK = "work"
-RULE_DISTRACTING = "distracting"
-RULE_EXCLUDED = "excluded"
-RULE_NONE = "none"
+from config import CONFIG_PATH, Config, save_config
+from file_watcher import FileSignature, file_signature
+from rules_engine import (
+    RULE_DISTRACTING,
+    RULE_EXCLUDED,
+    RULE_NONE,
+    RULE_WORK,
+    PatternRule,
+    RulesClassifier,
+)
 
 RULE_LABELS = {
     RULE_WORK: "Рабочее",
@@ -49,12 +53,17 @@ class AppRulesState:
     excluded_apps: set[str] = field(default_factory=set)
     favorites: set[str] = field(default_factory=set)
     history: dict[str, AppHistoryEntry] = field(default_factory=dict)
+    patterns: list[PatternRule] = field(default_factory=list)
 
 
 class AppRulesRepository:
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, config_path: Path = CONFIG_PATH):
         self.config = config
+        # Куда apply_to_config сохраняет work_apps/distracting_apps.
+        self.config_path = config_path
         self.path = Path(config.app_rules_path)
+        self._classifier: RulesClassifier | None = None
+        self.disk_signature: FileSignature | None = None
         self.state = self._load_state()
         self.apply_to_config(persist=False)
 
@@ -73,16 +82,22 @@ class AppRulesRepository:
             return legacy
 
         try:
+            signature = file_signature(self.path)
             with self.path.open("r", encoding="utf-8") as handle:
                 raw = json.load(handle)
+            self.disk_signature = signature
         except (OSError, json.JSONDecodeError):
             self.state = legacy
             self.save()
             return legacy
 
+        return self._state_from_raw(raw, legacy)
+
+    def _state_from_raw(self, raw: dict, legacy: AppRulesState) -> AppRulesState:
         rules = raw.get("rules", {})
         history_raw = raw.get("history", {})
         favorites_raw = raw.get("favorites", [])
+        patterns_raw = raw.get("patterns", [])
 
         state = AppRulesState(
             work_apps={normalize_process_name(item) for item in rules.get("work", []) if item},
@@ -101,6 +116,13 @@ class AppRulesRepository:
             },
         )
 
+        for payload in patterns_raw:
+            if not isinstance(payload, dict):
+                continue
+            pattern = PatternRule.from_dict(payload)
+            if pattern is not None:
+                state.patterns.append(pattern)
+
         for key, payload in history_raw.items():
             process_name = normalize_process_name(payload.get("process_name") or key)
             if not process_name:
@@ -123,11 +145,40 @@ class AppRulesRepository:
     def _ensure_parent_dir(self) -> None:
         self.path.parent.mkdir(parents=True, exist_ok=True)
 
+    def is_stale(self) -> bool:
+        """Файл правил изменен извне с момента последнего чтения или записи."""
+        current = file_signature(self.path)
+        return current is not None and current != self.disk_signature
+
     def reload(self) -> AppRulesState:
         self.state = self._load_state()
+        self._classifier = None
         self.apply_to_config(persist=False)
         return self.state
 
+    def reload_if_changed(self) -> bool:
+        """
+        Перечитывает файл, только если изменились mtime или размер.
+        Недочитанный или битый файл (например, во время сохранения
+        в редакторе) не трогает текущее состояние и не перезаписывается.
+        """
+        if not self.is_stale():
+            return False
+
+        signature = file_signature(self.path)
+        try:
+            with self.path.open("r", encoding="utf-8") as handle:
+                raw = json.load(handle)
+            state = self._state_from_raw(raw, self._legacy_state())
+        except (OSError, ValueError, TypeError, AttributeError):
+            return False
+
+        self.state = state
+        self.disk_signature = signature
+        self._classifier = None
+        self.apply_to_config(persist=False)
+        return True
+
     def save(self) -> None:
         self._ensure_parent_dir()
         payload = {
@@ -138,6 +189,7 @@ class AppRulesRepository:
                 "excluded": sorted(self.state.excluded_apps),
             },
             "favorites": sorted(self.state.favorites),
+            "patterns": [item.to_dict() for item in self.state.patterns],
             "history": {
                 key: {
                     "process_name": entry.process_name,
@@ -151,12 +203,29 @@ class AppRulesRepository:
         }
         with self.path.open("w", encoding="utf-8") as handle:
             json.dump(payload, handle, ensure_ascii=False, indent=2)
+        self.disk_signature = file_signature(self.path)
 
     def apply_to_config(self, persist: bool = True) -> None:
         self.config.work_apps = sorted(self.state.work_apps)
         self.config.distracting_apps = sorted(self.state.distracting_apps)
         if persist:
-            save_config(self.config)
+            save_config(self.config, self.config_path)
+
+    def replace_config(self, config: Config) -> bool:
+        """
+        Переходит на новый объект настроек. Если в нем другой
+        app_rules_path, состояние перечитывается из нового файла
+        (возвращает True).
+        """
+        self.config = config
+        path = Path(config.app_rules_path)
+        if path == self.path:
+            self.apply_to_config(persist=False)
+            return False
+        self.path = path
+        self.disk_signature = None
+        self.reload()
+        return True
 
     def get_rule(self, process_name: str) -> str:
         key = normalize_process_name(process_name)
@@ -170,6 +239,41 @@ class AppRulesRepository:
             return RULE_EXCLUDED
         return RULE_NONE
 
+    def _build_classifier(self) -> RulesClassifier:
+        exact: dict[str, str] = {}
+        # Тот же приоритет, что и в get_rule: work > distracting > excluded.
+        for rule, names in (
+            (RULE_EXCLUDED, self.state.excluded_apps),
+            (RULE_DISTRACTING, self.state.distracting_apps),
+            (RULE_WORK, self.state.work_apps),
+        ):
+            for name in names:
+                exact[name] = rule
+        return RulesClassifier(exact, self.state.patterns, default=RULE_NONE)
+
+    @property
+    def classifier(self) -> RulesClassifier:
+        if self._classifier is None:
+            self._classifier = self._build_classifier()
+        return self._classifier
+
+    def classify(
+        self,
+        process_name: str,
+        window_title: str = "",
+        exe_path: str = "",
+    ) -> str:
+        """Правило для окна с учетом шаблонов по процессу, пути и заголовку."""
+        key = normalize_process_name(process_name)
+        if not key and not window_title and not exe_path:
+            return RULE_NONE
+        return self.classifier.classify(key, window_title or "", exe_path or "")
+
+    def set_pattern_rules(self, patterns: list[PatternRule]) -> None:
+        self.state.patterns = list(patterns)
+        self._classifier = None
+        self.save()
+
     def set_rule(self, process_name: str, rule: str) -> None:
         key = normalize_process_name(process_name)
         if not key:
@@ -186,6 +290,7 @@ class AppRulesRepository:
         elif rule == RULE_EXCLUDED:
             self.state.excluded_apps.add(key)
 
+        self._classifier = None
         self.save()
         self.apply_to_config(persist=True)
 
@@ -0,0 +1,424 @@
+"""
+Бенчмарк GUI под QT_QPA_PLATFORM=offscreen: время построения MainWindow,
+StatsWindow и FocusWidget, время до первого заполненного списка на
+синтетической БД, стоимость одного обновления снимка (с отрисовкой) и
+поиск по каталогу приложений с большой историей (--catalog-apps).
+
+Запуск из корня репозитория:
+    python -m benchmarks.gui --days 30
+    python -m benchmarks.gui --days 365 --db /tmp/focusmeter-gui.db --output gui.json
+
+Пороговые значения лежат рядом, в benchmarks/gui_thresholds.json (ключ
+"365d" для годовой истории, иначе "default"); если какая-то метрика их
+превышает, бенчмарк завершается с кодом 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import replace
+from datetime import datetime, time as dt_time, timedelta
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QDate  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from benchmarks.report import (  # noqa: E402
+    environment,
+    latency_summary,
+    load_report,
+    print_comparison,
+    write_report,
+)
+from benchmarks.synthetic_events import (  # noqa: E402
+    APP_PROFILES,
+    SyntheticDataset,
+    ensure_database,
+    write_rules_file,
+)
+from config import CONFIG_PATH, Config, load_config, read_config, save_config  # noqa: E402
+from file_watcher import file_signature  # noqa: E402
+from tracker_engine import WorkerSnapshot, diff_snapshots, status_text_for_state  # noqa: E402
+
+THRESHOLDS_PATH = Path(__file__).with_name("gui_thresholds.json")
+WAIT_TIMEOUT_SECONDS = 30.0
+
+
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
+
+
+def _wait_until(app: QApplication, predicate: Callable[[], bool]) -> bool:
+    deadline = time.perf_counter() + WAIT_TIMEOUT_SECONDS
+    while not predicate():
+        if time.perf_counter() > deadline:
+            return False
+        app.processEvents()
+    return True
+
+
+def build_config(workdir: Path, db_path: Path) -> Path:
+    """Отдельные config.json и app_rules.json, чтобы не трогать настоящие."""
+    config = Config(
+        db_path=str(db_path),
+        app_rules_path=str(workdir / "app_rules.json"),
+        ipc_enabled=False,
+        status_file_enabled=False,
+        metrics_enabled=False,
+        stall_watchdog_enabled=False,
+        icon_cache_dir=str(workdir / "icons"),
+    )
+    write_rules_file(config.app_rules_path, with_history=True)
+    config_path = workdir / "config.json"
+    save_config(config, config_path)
+    return config_path
+
+
+def snapshot_stream(count: int, seed: int = 3) -> list[tuple[WorkerSnapshot, frozenset[str]]]:
+    """
+    Поток снимков как от движка: таймеры меняются каждый тик, окно время
+    от времени переключается. Возвращает пары (снимок, изменившиеся поля).
+    """
+    rng = random.Random(seed)
+    now = datetime(2025, 1, 1, 9, 0)
+    current = WorkerSnapshot(
+        timestamp_utc=now,
+        state="work",
+        status_text=status_text_for_state("work"),
+        app_name="code",
+        window_title="engine.py - focusmeter",
+        exe_path="/usr/bin/code",
+        user_active=True,
+        is_work_app=True,
+        is_distracting_app=False,
+        is_excluded_app=False,
+        idle_seconds=0.0,
+        non_productive_seconds=0.0,
+        fatigue_score=0.0,
+        fatigue_threshold=1500.0,
+        idle_notify_seconds=600.0,
+        seconds_to_break=1500.0,
+        seconds_to_idle_warning=600.0,
+        paused=False,
+    )
+    stream = []
+    previous: WorkerSnapshot | None = None
+    for index in range(count):
+        fatigue = (current.fatigue_score + 1.0) % current.fatigue_threshold
+        changes: dict[str, object] = {
+            "timestamp_utc": now + timedelta(seconds=index),
+            "fatigue_score": fatigue,
+            "seconds_to_break": current.fatigue_threshold - fatigue,
+            "idle_seconds": float(index % 3),
+        }
+        if rng.random() < 0.05:
+            profile = rng.choice(APP_PROFILES)
+            state = {"work": "work", "distract": "distract"}.get(profile.kind, "other")
+            changes.update(
+                app_name=profile.name,
+                window_title=rng.choice(profile.titles).replace("{n}", str(index)),
+                exe_path=f"/usr/bin/{profile.name}",
+                state=state,
+                status_text=status_text_for_state(state),
+                is_work_app=profile.kind == "work",
+                is_distracting_app=profile.kind == "distract",
+            )
+        current = replace(current, **changes)
+        stream.append((current, frozenset(diff_snapshots(previous, current))))
+        previous = current
+    return stream
+
+
+def _measure_updates(
+    app: QApplication,
+    apply: Callable[[WorkerSnapshot, frozenset[str]], None],
+    stream: list[tuple[WorkerSnapshot, frozenset[str]]],
+) -> dict[str, float]:
+    samples = []
+    for snapshot, changed in stream:
+        started = time.perf_counter()
+        apply(snapshot, changed)
+        app.processEvents()
+        samples.append(_elapsed_ms(started))
+    summary = latency_summary(samples)
+    # Доля одного ядра при потоке 10 снимков в секунду.
+    summary["core_share_at_10hz"] = summary["p50_ms"] * 10 / 1000
+    return summary
+
+
+def bench_main_window(app: QApplication, config_path: Path, stream) -> dict[str, object]:
+    from main_gui import MainWindow
+
+    started = time.perf_counter()
+    window = MainWindow(config_path)
+    construct_ms = _elapsed_ms(started)
+
+    # Каталог и сводка грузятся после первой отрисовки, поэтому show_ms —
+    # время до показа, а first_list_ms считается от начала построения.
+    shown = time.perf_counter()
+    window.show()
+    _wait_until(app, window.isVisible)
+    show_ms = _elapsed_ms(shown)
+    _wait_until(app, lambda: window._initial_data_loaded)
+    if window.app_model.rowCount() == 0:
+        # Без открытых окон (offscreen, CI) каталог показывает недавние.
+        window.app_source_combo.setCurrentIndex(window.app_source_combo.findData("recent"))
+    populated = _wait_until(app, lambda: window.app_model.rowCount() > 0)
+    first_list_ms = _elapsed_ms(started)
+
+    widget = window._ensure_widget_window()
+    widget.show()
+    app.processEvents()
+    updates = _measure_updates(app, window._apply_snapshot, stream)
+
+    widget.close()
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    return {
+        "construct_ms": construct_ms,
+        "first_list_ms": first_list_ms,
+        "list_populated": populated,
+        "show_ms": show_ms,
+        "apply_snapshot": updates,
+    }
+
+
+def bench_catalog(app: QApplication, workdir: Path, db_path: Path, apps: int) -> dict[str, object]:
+    """Каталог «Недавние» с большой историей: заполнение, набор запроса, смена правила."""
+    from app_rules import RULE_WORK
+    from main_gui import MainWindow
+
+    catalog_dir = workdir / "catalog"
+    catalog_dir.mkdir(exist_ok=True)
+    config_path = build_config(catalog_dir, db_path)
+    write_rules_file(load_config(config_path).app_rules_path, with_history=True, extra_history=apps)
+    window = MainWindow(config_path)
+    window.show()
+    _wait_until(app, lambda: window._initial_data_loaded)
+
+    started = time.perf_counter()
+    window.app_source_combo.setCurrentIndex(window.app_source_combo.findData("recent"))
+    app.processEvents()
+    populate_ms = _elapsed_ms(started)
+    rows = window.app_model.rowCount()
+
+    # Набор запроса по символу и стирание обратно; поиск вызывается сразу,
+    # без задержки ввода, чтобы мерить саму фильтрацию.
+    query = "document 4242"
+    steps = [query[:size] for size in range(1, len(query) + 1)]
+    steps += [query[:size] for size in range(len(query) - 1, -1, -1)]
+    samples = []
+    for text in steps:
+        started = time.perf_counter()
+        window.app_search_edit.setText(text)
+        window._apply_app_search()
+        app.processEvents()
+        samples.append(_elapsed_ms(started))
+
+    # Смена правила сохраняет config.json: окно построено с config_path
+    # каталога бенчмарка, и настоящий файл меняться не должен.
+    real_config = file_signature(CONFIG_PATH)
+    window.app_list.setCurrentIndex(window.app_model.index(rows // 2))
+    selected = window._selected_row_payload()
+    started = time.perf_counter()
+    window._set_rule_for_selected(RULE_WORK)
+    app.processEvents()
+    rule_change_ms = _elapsed_ms(started)
+    if file_signature(CONFIG_PATH) != real_config:
+        raise RuntimeError(f"benchmark modified {CONFIG_PATH}")
+    if selected is not None and selected.process_name.lower() not in read_config(config_path).work_apps:
+        raise RuntimeError(f"rule change was not saved to {config_path}")
+
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    return {
+        "apps": apps,
+        "rows": rows,
+        "populate_ms": populate_ms,
+        "search": latency_summary(samples),
+        "rule_change_ms": rule_change_ms,
+    }
+
+
+def bench_stats_window(app: QApplication, config: Config) -> dict[str, object]:
+    from stats_window import StatsWindow
+
+    started = time.perf_counter()
+    window = StatsWindow(config)
+    construct_ms = _elapsed_ms(started)
+    window.show()
+    populated = _wait_until(app, lambda: window.app_proxy.rowCount() > 0)
+    first_list_ms = _elapsed_ms(started)
+
+    periods: dict[str, float] = {}
+    for key in ("last7", "last30"):
+        window.app_model.clear()
+        started = time.perf_counter()
+        window.period_combo.setCurrentIndex(window.period_combo.findData(key))
+        _wait_until(app, lambda: window.app_proxy.rowCount() > 0)
+        periods[key] = _elapsed_ms(started)
+
+    window.app_model.clear()
+    started = time.perf_counter()
+    window.period_combo.setCurrentIndex(window.period_combo.findData("custom"))
+    today = QDate.currentDate()
+    window.start_date_edit.setDate(today.addDays(-364))
+    window.end_date_edit.setDate(today)
+    window.refresh_button.click()
+    _wait_until(app, lambda: window.app_proxy.rowCount() > 0)
+    periods["last365"] = _elapsed_ms(started)
+
+    # Разбивка по заголовкам для самого активного приложения года, без
+    # задержки таймера выделения.
+    window.title_timer.stop()
+    started = time.perf_counter()
+    window._load_titles()
+    app.processEvents()
+    titles_ms = _elapsed_ms(started)
+
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    return {
+        "construct_ms": construct_ms,
+        "first_list_ms": first_list_ms,
+        "list_populated": populated,
+        "period_ms": periods,
+        "titles_ms": titles_ms,
+    }
+
+
+def bench_focus_widget(app: QApplication, stream) -> dict[str, object]:
+    from focus_widget import FocusWidget
+
+    started = time.perf_counter()
+    widget = FocusWidget()
+    construct_ms = _elapsed_ms(started)
+    widget.show()
+    app.processEvents()
+    full = _measure_updates(app, lambda snapshot, changed: widget.update_snapshot(snapshot), stream[:200])
+    delta = _measure_updates(app, widget.update_snapshot, stream)
+    widget.close()
+    widget.deleteLater()
+    app.processEvents()
+    return {
+        "construct_ms": construct_ms,
+        "full_update": full,
+        "delta_update": delta,
+    }
+
+
+def _headline(report: dict[str, object]) -> dict[str, float]:
+    main_window = report["main_window"]
+    stats_window = report["stats_window"]
+    focus_widget = report["focus_widget"]
+    values = {
+        "main_window.construct_ms": main_window["construct_ms"],
+        "main_window.first_list_ms": main_window["first_list_ms"],
+        "main_window.show_ms": main_window["show_ms"],
+        "main_window.apply_snapshot_p95_ms": main_window["apply_snapshot"]["p95_ms"],
+        "stats_window.construct_ms": stats_window["construct_ms"],
+        "stats_window.first_list_ms": stats_window["first_list_ms"],
+        "stats_window.titles_ms": stats_window["titles_ms"],
+    }
+    for key, value in stats_window["period_ms"].items():
+        values[f"stats_window.{key}_ms"] = value
+    catalog = report.get("catalog")
+    if catalog:
+        values["catalog.populate_ms"] = catalog["populate_ms"]
+        values["catalog.search_p95_ms"] = catalog["search"]["p95_ms"]
+        values["catalog.rule_change_ms"] = catalog["rule_change_ms"]
+    values["focus_widget.construct_ms"] = focus_widget["construct_ms"]
+    values["focus_widget.full_update_p95_ms"] = focus_widget["full_update"]["p95_ms"]
+    values["focus_widget.delta_update_p95_ms"] = focus_widget["delta_update"]["p95_ms"]
+    return values
+
+
+def check_thresholds(values: dict[str, float], thresholds: dict[str, float]) -> list[str]:
+    failures = []
+    for name, limit in thresholds.items():
+        value = values.get(name)
+        if value is not None and value > limit:
+            failures.append(f"{name}: {value:.2f} > {limit:.2f}")
+    return failures
+
+
+def run(args: argparse.Namespace) -> dict[str, object]:
+    workdir = Path(tempfile.mkdtemp(prefix="focusmeter-gui-"))
+    db_path = Path(args.db) if args.db else workdir / "gui.db"
+    # Данные заканчиваются концом сегодняшних суток, чтобы окна видели их
+    # в периодах "сегодня", "7 дней" и т.д.
+    today = datetime.combine(datetime.now().date(), dt_time.min)
+    dataset = SyntheticDataset(start=today - timedelta(days=args.days - 1), days=args.days)
+    print(f"preparing {dataset.row_count} rows ...", flush=True)
+    reused = ensure_database(db_path, dataset)
+
+    config_path = build_config(workdir, db_path)
+    stream = snapshot_stream(args.snapshots)
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    report = environment("gui")
+    report["dataset"] = dataset.describe()
+    report["dataset"]["reused"] = reused
+    report["qt_platform"] = app.platformName()
+    print("MainWindow ...", flush=True)
+    report["main_window"] = bench_main_window(app, config_path, stream)
+    print(f"catalog with {args.catalog_apps} apps ...", flush=True)
+    report["catalog"] = bench_catalog(app, workdir, db_path, args.catalog_apps)
+    print("StatsWindow ...", flush=True)
+    report["stats_window"] = bench_stats_window(app, load_config(config_path))
+    print("FocusWidget ...", flush=True)
+    report["focus_widget"] = bench_focus_widget(app, stream)
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--days", type=int, default=30, help="Synthetic history length.")
+    parser.add_argument("--snapshots", type=int, default=2000, help="Snapshots fed per widget.")
+    parser.add_argument("--catalog-apps", type=int, default=10_000, help="Apps in the catalog history.")
+    parser.add_argument("--db", help="Keep the generated database here and reuse it next time.")
+    parser.add_argument("--thresholds", default=str(THRESHOLDS_PATH))
+    parser.add_argument("--no-check", action="store_true", help="Report only, ignore thresholds.")
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against.")
+    args = parser.parse_args(argv)
+
+    baseline = load_report(args.compare) if args.compare else None
+    report = run(args)
+    values = _headline(report)
+    print(f"dataset:          {report['dataset']['days']} days, {report['dataset']['rows']} rows")
+    if baseline:
+        print(f"baseline:         {baseline.get('commit') or '?'}")
+    print_comparison(values, _headline(baseline) if baseline else {})
+
+    thresholds = load_report(args.thresholds) if Path(args.thresholds).exists() else {}
+    thresholds = thresholds.get(f"{args.days}d") or thresholds.get("default", {})
+    failures = check_thresholds(values, thresholds)
+    report["threshold_failures"] = failures
+    if args.output:
+        write_report(args.output, report)
+        print(f"report:           {args.output}")
+    for failure in failures:
+        print(f"[FAIL] {failure}")
+    if failures and not args.no_check:
+        return 1
+    print("result:           " + ("OK" if not failures else "over thresholds (--no-check)"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Общие части JSON-отчетов бенчмарков: окружение и сводка задержек."""
+
+from __future__ import annotations
+
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+def git_commit() -> str:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            check=False,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return result.stdout.strip()
+
+
+def environment(benchmark: str) -> dict[str, object]:
+    return {
+        "benchmark": benchmark,
+        "commit": git_commit(),
+        "created_utc": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+
+def latency_summary(samples_ms: list[float]) -> dict[str, float]:
+    ordered = sorted(samples_ms)
+    if not ordered:
+        return {"count": 0, "min_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    return {
+        "count": len(ordered),
+        "min_ms": ordered[0],
+        "p50_ms": statistics.median(ordered),
+        "p95_ms": ordered[max(0, int(round(len(ordered) * 0.95)) - 1)],
+        "max_ms": ordered[-1],
+    }
+
+
+def load_report(path: str | Path) -> dict[str, object]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def write_report(path: str | Path, report: dict[str, object]) -> None:
+    Path(path).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+
+def print_comparison(
+    current: dict[str, float],
+    baseline: dict[str, float],
+    width: int = 36,
+) -> None:
+    for name, value in current.items():
+        line = f"{name:<{width}} {value:>14.3f}"
+        previous = baseline.get(name)
+        if previous:
+            line += f"   x{value / previous:.2f} vs baseline"
+        print(line)
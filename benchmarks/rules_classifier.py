@@ -0,0 +1,119 @@
+"""
+Бенчмарк классификатора правил: 1000 шаблонных правил поверх точных имен.
+
+Запуск из корня репозитория:
+    python -m benchmarks.rules_classifier
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from rules_engine import SYNTAX_GLOB, SYNTAX_REGEX, PatternRule, RulesClassifier
+
+
+def build_rules(count: int, seed: int = 7) -> tuple[dict[str, str], list[PatternRule]]:
+    rng = random.Random(seed)
+    rules = ["work", "distracting", "excluded"]
+    exact = {f"app{index}": rng.choice(rules) for index in range(count)}
+
+    patterns: list[PatternRule] = []
+    for index in range(count):
+        kind = index % 4
+        if kind == 0:
+            item = PatternRule(
+                rule=rng.choice(rules),
+                process=f"browser{index % 25}",
+                title=f"*project-{index}*",
+                priority=rng.randint(0, 10),
+            )
+        elif kind == 1:
+            item = PatternRule(
+                rule=rng.choice(rules),
+                title=rf"\bticket-{index}\b",
+                syntax=SYNTAX_REGEX,
+                priority=rng.randint(0, 10),
+            )
+        elif kind == 2:
+            item = PatternRule(
+                rule=rng.choice(rules),
+                exe_path=f"*/tools{index}/*",
+                syntax=SYNTAX_GLOB,
+            )
+        else:
+            item = PatternRule(rule=rng.choice(rules), process=f"tool{index}*")
+        patterns.append(item)
+    return exact, patterns
+
+
+def build_windows(count: int, seed: int = 11) -> list[tuple[str, str, str]]:
+    rng = random.Random(seed)
+    windows = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.4:
+            windows.append(
+                (
+                    f"browser{rng.randrange(25)}",
+                    f"Review project-{rng.randrange(2000)} - Browser",
+                    "/usr/bin/browser",
+                )
+            )
+        elif roll < 0.7:
+            windows.append(
+                (
+                    f"app{rng.randrange(1000)}",
+                    f"Document {rng.randrange(50)}",
+                    f"/opt/app{rng.randrange(1000)}/bin/app",
+                )
+            )
+        else:
+            windows.append(
+                (
+                    "editor",
+                    f"ticket-{rng.randrange(2000)} notes.md",
+                    "/usr/bin/editor",
+                )
+            )
+    return windows
+
+
+def _per_call_us(func, windows, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for process, title, exe_path in windows:
+            func(process, title, exe_path)
+    elapsed = time.perf_counter() - started
+    return elapsed / (repeat * len(windows)) * 1e6
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", type=int, default=1000)
+    parser.add_argument("--windows", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    exact, patterns = build_rules(args.rules)
+    started = time.perf_counter()
+    classifier = RulesClassifier(exact, patterns, default="none")
+    compile_ms = (time.perf_counter() - started) * 1000
+
+    windows = build_windows(args.windows)
+    cold_us = _per_call_us(classifier._classify_uncached, windows, 1)
+    classifier.classify.cache_clear()
+    for process, title, exe_path in windows:
+        classifier.classify(process, title, exe_path)
+    warm_us = _per_call_us(classifier.classify, windows, args.repeat)
+
+    print(f"rules:            {args.rules} exact + {len(patterns)} patterns")
+    print(f"compile:          {compile_ms:.1f} ms")
+    print(f"cold classify:    {cold_us:.1f} us/call")
+    print(f"cached classify:  {warm_us:.2f} us/call")
+    print(f"cache:            {classifier.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
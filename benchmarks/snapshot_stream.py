@@ -0,0 +1,180 @@
+"""
+Нагрузочная проверка потока дельт: 50 подписчиков на реальном Unix-сокете,
+среди них быстрые, медленные и зависшие клиенты. Проверяется, что вызов
+из потока движка не ждет клиентов, медленные получают свернутые дельты
+и финальное состояние, а зависшие отключаются.
+
+Запуск из корня репозитория:
+    python -m benchmarks.snapshot_stream
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from config import Config
+from ipc_server import TrackerIpcServer
+from tracker_engine import SnapshotDelta, TrackerEngine, WorkerSnapshot, diff_snapshots
+
+
+_EPOCH = datetime(2025, 1, 1)
+
+
+def make_snapshot(index: int) -> WorkerSnapshot:
+    return WorkerSnapshot(
+        timestamp_utc=_EPOCH,
+        state="work" if index % 7 else "distract",
+        status_text="",
+        app_name=f"app{index % 13}",
+        window_title=f"Window {index}",
+        exe_path="",
+        user_active=True,
+        is_work_app=bool(index % 7),
+        is_distracting_app=not index % 7,
+        is_excluded_app=False,
+        idle_seconds=float(index),
+        non_productive_seconds=0.0,
+        fatigue_score=float(index),
+        fatigue_threshold=1500.0,
+        idle_notify_seconds=600.0,
+        seconds_to_break=max(1500.0 - index, 0.0),
+        seconds_to_idle_warning=600.0,
+        paused=False,
+    )
+
+
+class _Client(threading.Thread):
+    def __init__(self, path: Path, kind: str, final_index: int):
+        super().__init__(daemon=True)
+        self.kind = kind
+        self.final_index = final_index
+        self.received = 0
+        self.last_index = -1
+        self.reached_final = threading.Event()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if kind == "stalled":
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        self.sock.connect(str(path))
+        self.reader = self.sock.makefile("rb")
+        self.sock.sendall(b'{"jsonrpc": "2.0", "id": 1, "method": "subscribe"}\n')
+        self.reader.readline()
+
+    def run(self) -> None:
+        if self.kind == "stalled":
+            return
+        try:
+            for line in self.reader:
+                message = json.loads(line)
+                self.received += 1
+                self.last_index = int(message["params"]["snapshot"]["idle_seconds"])
+                if self.last_index >= self.final_index:
+                    self.reached_final.set()
+                if self.kind == "slow":
+                    time.sleep(0.02)
+        except (OSError, ValueError):
+            pass
+
+    def close(self) -> None:
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, default=50)
+    parser.add_argument("--slow", type=int, default=5)
+    parser.add_argument("--stalled", type=int, default=5)
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--interval-ms", type=float, default=0.5)
+    parser.add_argument("--budget-ms", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    tmp = Path(tempfile.mkdtemp(prefix="focusmeter-stream-"))
+    config = Config(
+        db_path=str(tmp / "bench.db"),
+        app_rules_path=str(tmp / "app_rules.json"),
+    )
+    engine = TrackerEngine(config)
+    server = TrackerIpcServer(engine, path=tmp / "bench.sock")
+    if not server.start():
+        print("Unix sockets are not available here.")
+        return 2
+
+    final_index = args.updates - 1
+    fast = args.subscribers - args.slow - args.stalled
+    kinds = ["fast"] * fast + ["slow"] * args.slow + ["stalled"] * args.stalled
+    clients = [_Client(server.path, kind, final_index) for kind in kinds]
+    for client in clients:
+        client.start()
+
+    hub = server.hub
+    publish_ms: list[float] = []
+    previous: WorkerSnapshot | None = None
+    started = time.perf_counter()
+    for index in range(args.updates):
+        snapshot = make_snapshot(index)
+        delta = SnapshotDelta(snapshot, diff_snapshots(previous, snapshot))
+        previous = snapshot
+        call_started = time.perf_counter()
+        hub.on_snapshot(delta)
+        publish_ms.append((time.perf_counter() - call_started) * 1000)
+        if args.interval_ms > 0:
+            time.sleep(args.interval_ms / 1000)
+    publish_seconds = time.perf_counter() - started
+
+    deadline = time.monotonic() + 10.0
+    for client in clients:
+        if client.kind != "stalled":
+            client.reached_final.wait(max(0.0, deadline - time.monotonic()))
+    # Зависшие клиенты отключаются по таймауту записи сервера.
+    time.sleep(3.0)
+
+    subscribers_left = hub.subscriber_count()
+    dropped = hub.dropped
+    server.stop()
+    for client in clients:
+        client.close()
+
+    publish_ms.sort()
+    p99 = publish_ms[int(len(publish_ms) * 0.99) - 1]
+    missed_final = [c for c in clients if c.kind != "stalled" and not c.reached_final.is_set()]
+    received = {
+        kind: statistics.mean(c.received for c in clients if c.kind == kind)
+        for kind in ("fast", "slow")
+        if any(c.kind == kind for c in clients)
+    }
+
+    print(f"subscribers:      {fast} fast, {args.slow} slow, {args.stalled} stalled")
+    print(f"updates:          {args.updates} in {publish_seconds:.2f} s")
+    print(
+        f"publish call:     p50={statistics.median(publish_ms):.3f} ms "
+        f"p99={p99:.3f} ms max={publish_ms[-1]:.3f} ms"
+    )
+    for kind, mean in received.items():
+        print(f"received ({kind}):  {mean:.0f} messages on average")
+    readers = len(clients) - args.stalled
+    print(f"reached final:    {readers - len(missed_final)}/{readers}")
+    print(f"dropped:          {dropped} (left subscribed: {subscribers_left})")
+
+    ok = (
+        p99 <= args.budget_ms
+        and not missed_final
+        and dropped >= args.stalled
+    )
+    print("result:           " + ("OK" if ok else "FAIL"))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+"""
+Ускоренный soak-тест всего приложения: MainWindow offscreen, трекер на
+подменных окне/вводе/часах, периодические обновления каталога, сводки
+за сегодня и окна статистики. Модельные сутки проходят за минуты.
+
+По ходу раз в модельный час снимаются RSS, объем tracemalloc и размеры
+растущих структур (журнал, история приложений, кэш иконок, элементы
+списков). Рост на модельный час считается по наклону после прогрева;
+при превышении бюджета тест завершается с кодом 1 и печатает места
+выделения памяти, которые выросли сильнее всего.
+
+Запуск из корня репозитория:
+    python -m benchmarks.soak --hours 24
+    python -m benchmarks.soak --hours 168 --extra-apps 200 --output soak.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import psutil  # noqa: E402
+from PyQt5.QtCore import QEventLoop  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from benchmarks.report import environment, write_report  # noqa: E402
+from benchmarks.synthetic_events import APP_PROFILES, write_rules_file  # noqa: E402
+from config import Config, save_config  # noqa: E402
+from notifier import NotificationDispatcher  # noqa: E402
+from tracker.active_window import WindowInfo  # noqa: E402
+from tracker.fake_backends import FakeInputTracker, FakeWindowProbe, SimulatedClock  # noqa: E402
+from tracker_engine import TrackerEngine  # noqa: E402
+
+CATALOG_REFRESH_SECONDS = 600.0
+OVERVIEW_REFRESH_SECONDS = 300.0
+STATS_REFRESH_SECONDS = 3600.0
+SAMPLE_SECONDS = 3600.0
+TOP_ALLOCATIONS = 10
+
+
+def build_windows(extra_apps: int) -> list[WindowInfo]:
+    windows = []
+    for index, profile in enumerate(APP_PROFILES):
+        for title in profile.titles:
+            windows.append(
+                WindowInfo(
+                    process_name=profile.name,
+                    window_title=title.replace("{n}", str(index)),
+                    pid=1000 + index,
+                    exe_path=f"/usr/bin/{profile.name}",
+                )
+            )
+    for index in range(extra_apps):
+        for variant in range(3):
+            windows.append(
+                WindowInfo(
+                    process_name=f"tool{index}",
+                    window_title=f"Tool {index} — document {variant}",
+                    pid=5000 + index,
+                    exe_path=f"/opt/tool{index}/bin/tool{index}",
+                )
+            )
+    return windows
+
+
+def _slope_per_hour(hours: list[float], values: list[float]) -> float:
+    """Наклон линейной регрессии values по hours."""
+    count = len(hours)
+    if count < 2:
+        return 0.0
+    mean_x = sum(hours) / count
+    mean_y = sum(values) / count
+    denominator = sum((x - mean_x) ** 2 for x in hours)
+    if not denominator:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(hours, values)) / denominator
+
+
+class SoakRun:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.workdir = Path(tempfile.mkdtemp(prefix="focusmeter-soak-"))
+        config = Config(
+            db_path=str(self.workdir / "soak.db"),
+            app_rules_path=str(self.workdir / "app_rules.json"),
+            ipc_enabled=False,
+            status_file_enabled=False,
+            metrics_enabled=False,
+            stall_log_path=str(self.workdir / "stalls.log"),
+            icon_cache_dir=str(self.workdir / "icons"),
+        )
+        write_rules_file(config.app_rules_path)
+        self.config_path = self.workdir / "config.json"
+        save_config(config, self.config_path)
+
+        # Модельное время идет от текущего часа, чтобы сводка "сегодня" и окно
+        # статистики видели новые события.
+        start = datetime.now(timezone.utc).replace(tzinfo=None, minute=0, second=0, microsecond=0)
+        self.clock = SimulatedClock(start=start, speedup=args.speedup)
+        self.probe = FakeWindowProbe(
+            self.clock,
+            windows=build_windows(args.extra_apps),
+            dwell_seconds=args.dwell,
+            random_dwell=True,
+        )
+        self.notifier = NotificationDispatcher(deliver=lambda title, message: None)
+        self.notifier.start()
+        self.engine_factory = partial(
+            TrackerEngine,
+            clock=self.clock,
+            window_probe=self.probe,
+            input_tracker_factory=partial(FakeInputTracker, self.clock),
+            notifier=self.notifier,
+        )
+        self.process = psutil.Process()
+        self.samples: list[dict[str, float]] = []
+
+    def _sample(self, window) -> dict[str, float]:
+        gc.collect()
+        sample = {
+            "hour": self.clock.elapsed / 3600,
+            "wall_seconds": time.perf_counter() - self._started,
+            "rss_bytes": float(self.process.memory_info().rss),
+            "traced_bytes": float(tracemalloc.get_traced_memory()[0])
+            if tracemalloc.is_tracing()
+            else 0.0,
+            "log_records": float(len(window._activity_log)),
+            "log_blocks": float(window.log_edit.blockCount()),
+            "history_entries": float(len(window.rules_service.get_recent_apps(limit=1_000_000))),
+            "icon_cache": float(len(window.icon_cache)),
+            "catalog_items": float(window.app_model.rowCount()),
+            "stats_items": float(
+                window.stats_window.app_proxy.rowCount() if window.stats_window is not None else 0
+            ),
+            "ticks": float(self.probe.calls),
+        }
+        self.samples.append(sample)
+        if self.args.verbose:
+            print(
+                f"  hour {sample['hour']:6.1f}: rss={sample['rss_bytes'] / 2**20:7.1f} MiB "
+                f"traced={sample['traced_bytes'] / 2**20:6.1f} MiB "
+                f"history={sample['history_entries']:.0f} icons={sample['icon_cache']:.0f}",
+                flush=True,
+            )
+        return sample
+
+    def run(self) -> dict[str, object]:
+        from main_gui import MainWindow
+
+        app = QApplication.instance() or QApplication(sys.argv[:1])
+        if self.args.tracemalloc:
+            tracemalloc.start(self.args.trace_depth)
+        self._started = time.perf_counter()
+
+        window = MainWindow(self.config_path, engine_factory=self.engine_factory)
+        window.show()
+        # Вкладки строятся при первом открытии; в soak нужны все, чтобы
+        # рост ленты активности и диагностики тоже попадал в замер.
+        for index in range(len(window.section_buttons)):
+            window._ensure_section(index)
+        # Открытых окон offscreen нет; недавние приложения дают каталогу
+        # элементы и иконки, которые пересоздаются при каждом обновлении.
+        window.app_source_combo.setCurrentIndex(window.app_source_combo.findData("recent"))
+        window.on_start_clicked()
+
+        target = self.args.hours * 3600.0
+        next_catalog = CATALOG_REFRESH_SECONDS
+        next_overview = OVERVIEW_REFRESH_SECONDS
+        next_stats = STATS_REFRESH_SECONDS
+        next_sample = 0.0
+        baseline_snapshot = None
+        while self.clock.elapsed < target:
+            app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 50)
+            now = self.clock.elapsed
+            if now >= next_catalog:
+                window._refresh_app_catalog()
+                next_catalog = now + CATALOG_REFRESH_SECONDS
+            if now >= next_overview:
+                window._refresh_today_overview()
+                next_overview = now + OVERVIEW_REFRESH_SECONDS
+            if now >= next_stats:
+                window.on_open_detailed_stats()
+                next_stats = now + STATS_REFRESH_SECONDS
+            if now >= next_sample:
+                self._sample(window)
+                next_sample = now + SAMPLE_SECONDS
+                if (
+                    baseline_snapshot is None
+                    and tracemalloc.is_tracing()
+                    and now >= self.args.warmup_hours * 3600
+                ):
+                    baseline_snapshot = tracemalloc.take_snapshot()
+            if window.worker is None or not window.worker.isRunning():
+                break
+
+        window.on_stop_clicked()
+        app.processEvents()
+        self._sample(window)
+        top: list[str] = []
+        if tracemalloc.is_tracing():
+            if baseline_snapshot is not None:
+                final = tracemalloc.take_snapshot()
+                filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+                stats = final.filter_traces(filters).compare_to(
+                    baseline_snapshot.filter_traces(filters), "lineno"
+                )
+                top = [str(item) for item in stats[:TOP_ALLOCATIONS]]
+            tracemalloc.stop()
+
+        if window.stats_window is not None:
+            window.stats_window.close()
+        window.close()
+        self.notifier.stop()
+        return self._report(top)
+
+    def _report(self, top: list[str]) -> dict[str, object]:
+        args = self.args
+        steady = [item for item in self.samples if item["hour"] >= args.warmup_hours]
+        hours = [item["hour"] for item in steady]
+        growth = {
+            key: _slope_per_hour(hours, [item[key] for item in steady])
+            for key in (
+                "rss_bytes",
+                "traced_bytes",
+                "log_blocks",
+                "history_entries",
+                "icon_cache",
+                "catalog_items",
+                "stats_items",
+            )
+        }
+        failures = []
+        rss_budget = args.rss_budget_kib * 1024
+        traced_budget = args.traced_budget_kib * 1024
+        if growth["rss_bytes"] > rss_budget:
+            failures.append(
+                f"RSS grows {growth['rss_bytes'] / 1024:.0f} KiB/h > {args.rss_budget_kib} KiB/h"
+            )
+        if args.tracemalloc and growth["traced_bytes"] > traced_budget:
+            failures.append(
+                f"traced memory grows {growth['traced_bytes'] / 1024:.0f} KiB/h "
+                f"> {args.traced_budget_kib} KiB/h"
+            )
+
+        report = environment("soak")
+        last = self.samples[-1] if self.samples else {}
+        report["params"] = {
+            "hours": args.hours,
+            "warmup_hours": args.warmup_hours,
+            "extra_apps": args.extra_apps,
+            "dwell_seconds": args.dwell,
+            "speedup": args.speedup,
+            "tracemalloc": args.tracemalloc,
+            "rss_budget_kib_per_hour": args.rss_budget_kib,
+            "traced_budget_kib_per_hour": args.traced_budget_kib,
+        }
+        report["simulated_hours"] = last.get("hour", 0.0)
+        report["wall_seconds"] = last.get("wall_seconds", 0.0)
+        report["ticks"] = last.get("ticks", 0.0)
+        report["growth_per_hour"] = growth
+        report["samples"] = self.samples
+        report["top_allocations"] = top
+        report["failures"] = failures
+        return report
+
+
+def print_report(report: dict[str, object]) -> None:
+    growth = report["growth_per_hour"]
+    print(
+        f"simulated:        {report['simulated_hours']:.1f} h "
+        f"({report['ticks']:.0f} ticks) in {report['wall_seconds']:.0f} s"
+    )
+    print(f"RSS growth:       {growth['rss_bytes'] / 1024:.1f} KiB/h")
+    print(f"traced growth:    {growth['traced_bytes'] / 1024:.1f} KiB/h")
+    for key in ("log_blocks", "history_entries", "icon_cache", "catalog_items", "stats_items"):
+        print(f"{key + ':':<18}{growth[key]:+.2f}/h")
+    if report["top_allocations"]:
+        print("top allocation growth since warmup:")
+        for line in report["top_allocations"]:
+            print(f"  {line}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--hours", type=float, default=24.0, help="Simulated hours to run.")
+    parser.add_argument("--warmup-hours", type=float, default=2.0)
+    parser.add_argument("--extra-apps", type=int, default=50, help="Synthetic apps beyond the base mix.")
+    parser.add_argument("--dwell", type=float, default=60.0, help="Mean seconds per window.")
+    parser.add_argument(
+        "--speedup",
+        type=float,
+        default=0.0,
+        help="Simulated seconds per real second (0 = as fast as possible).",
+    )
+    parser.add_argument("--no-tracemalloc", dest="tracemalloc", action="store_false")
+    parser.add_argument("--trace-depth", type=int, default=1)
+    parser.add_argument("--rss-budget-kib", type=float, default=512.0, help="Per simulated hour.")
+    parser.add_argument("--traced-budget-kib", type=float, default=128.0, help="Per simulated hour.")
+    parser.add_argument("--verbose", action="store_true", help="Print every hourly sample.")
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    args = parser.parse_args(argv)
+
+    report = SoakRun(args).run()
+    print_report(report)
+    if args.output:
+        write_report(args.output, report)
+        print(f"report:           {args.output}")
+    for failure in report["failures"]:
+        print(f"[FAIL] {failure}")
+    print("result:           " + ("FAIL" if report["failures"] else "OK"))
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
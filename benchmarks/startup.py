@@ -0,0 +1,262 @@
+"""
+Бенчмарк запуска GUI: время импорта main_gui (вместе с PyQt5), построения
+MainWindow, до первой отрисовки и до загрузки отложенных данных (каталог
+и сводка за сегодня). Каждый прогон идет в свежем процессе, иначе кэш
+импортов обнулил бы главную часть замера; в отчет попадают медианы.
+
+Запуск из корня репозитория:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 9 --importtime --output startup.json
+
+Бюджеты лежат в benchmarks/startup_thresholds.json; при превышении
+бенчмарк завершается с кодом 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Модуль запускается и как дочерний процесс замера, поэтому на верхнем
+# уровне только легкие модули stdlib; код приложения и вспомогательные
+# модули бенчмарков импортируются в функциях родителя.
+
+ROOT = Path(__file__).resolve().parent.parent
+THRESHOLDS_PATH = Path(__file__).with_name("startup_thresholds.json")
+CHILD_TIMEOUT_SECONDS = 120.0
+RESULT_PREFIX = "STARTUP_RESULT "
+METRICS = (
+    "import_ms",
+    "app_ms",
+    "construct_ms",
+    "first_paint_ms",
+    "ready_ms",
+    "process_first_paint_ms",
+)
+
+
+def build_config(workdir: Path, db_path: Path) -> Path:
+    """Сервисы включены как у пользователя, но их файлы — во временном каталоге."""
+    from benchmarks.synthetic_events import write_rules_file
+    from config import Config, save_config
+
+    config = Config(
+        db_path=str(db_path),
+        app_rules_path=str(workdir / "app_rules.json"),
+        ipc_socket_path=str(workdir / "focusmeter.sock"),
+        status_file_path=str(workdir / "focusmeter.status"),
+        stall_log_path=str(workdir / "stalls.log"),
+        icon_cache_dir=str(workdir / "icons"),
+    )
+    write_rules_file(config.app_rules_path, with_history=True)
+    config_path = workdir / "config.json"
+    save_config(config, config_path)
+    return config_path
+
+
+def child(config_path: Path, spawned_at: float) -> None:
+    """Один запуск в этом процессе; PyQt5 и main_gui здесь еще не загружены."""
+    started = time.perf_counter()
+    from PyQt5.QtCore import QEvent, QObject
+    from PyQt5.QtWidgets import QApplication
+
+    import main_gui
+
+    imported = time.perf_counter()
+    app = QApplication(sys.argv[:1])
+    app_ready = time.perf_counter()
+    window = main_gui.MainWindow(config_path)
+    constructed = time.perf_counter()
+
+    class PaintProbe(QObject):
+        painted_at = 0.0
+        painted_wall = 0.0
+
+        def eventFilter(self, watched, event) -> bool:  # noqa: N802
+            if event.type() == QEvent.Type.Paint and not self.painted_at:
+                self.painted_at = time.perf_counter()
+                self.painted_wall = time.time()
+            return False
+
+    probe = PaintProbe()
+    window.installEventFilter(probe)
+    shown = time.perf_counter()
+    window.show()
+    deadline = shown + CHILD_TIMEOUT_SECONDS
+    while not (probe.painted_at and window._initial_data_loaded):
+        if time.perf_counter() > deadline:
+            break
+        app.processEvents()
+    ready = time.perf_counter()
+
+    result = {
+        "import_ms": (imported - started) * 1000,
+        "app_ms": (app_ready - imported) * 1000,
+        "construct_ms": (constructed - app_ready) * 1000,
+        "first_paint_ms": (probe.painted_at - shown) * 1000 if probe.painted_at else -1.0,
+        "ready_ms": (ready - shown) * 1000,
+        "process_first_paint_ms": (probe.painted_wall - spawned_at) * 1000
+        if probe.painted_wall
+        else -1.0,
+        "catalog_items": window.app_model.rowCount(),
+    }
+    window.close()
+    app.processEvents()
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+def _child_env() -> dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return env
+
+
+def run_child(config_path: Path, importtime: bool = False) -> tuple[dict[str, float], str]:
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    spawned_at = time.time()
+    command += ["-m", "benchmarks.startup", "--child", str(config_path), "--spawned-at", repr(spawned_at)]
+    completed = subprocess.run(
+        command,
+        cwd=ROOT,
+        env=_child_env(),
+        capture_output=True,
+        text=True,
+        timeout=CHILD_TIMEOUT_SECONDS,
+        check=False,
+    )
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):]), completed.stderr
+    raise RuntimeError(f"startup child failed ({completed.returncode}):\n{completed.stderr[-2000:]}")
+
+
+def top_imports(stderr: str, limit: int) -> list[tuple[str, int, int]]:
+    """Самые дорогие модули по собственному времени из вывода -X importtime."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue
+        rows.append((parts[2].strip(), self_us, cumulative_us))
+    rows.sort(key=lambda row: -row[1])
+    return rows[:limit]
+
+
+def run(args: argparse.Namespace) -> dict[str, object]:
+    import statistics
+    import tempfile
+    from datetime import datetime, time as dt_time, timedelta
+
+    from benchmarks.report import environment
+    from benchmarks.synthetic_events import SyntheticDataset, ensure_database
+
+    workdir = Path(tempfile.mkdtemp(prefix="focusmeter-startup-"))
+    db_path = Path(args.db) if args.db else workdir / "startup.db"
+    today = datetime.combine(datetime.now().date(), dt_time.min)
+    dataset = SyntheticDataset(start=today - timedelta(days=args.days - 1), days=args.days)
+    print(f"preparing {dataset.row_count} rows ...", flush=True)
+    reused = ensure_database(db_path, dataset)
+    config_path = build_config(workdir, db_path)
+
+    report = environment("startup")
+    report["dataset"] = dataset.describe()
+    report["dataset"]["reused"] = reused
+    runs = []
+    for index in range(args.repeat):
+        result, _stderr = run_child(config_path)
+        runs.append(result)
+        print(
+            f"run {index + 1}/{args.repeat}: import {result['import_ms']:.0f} ms, "
+            f"first paint {result['process_first_paint_ms']:.0f} ms after spawn",
+            flush=True,
+        )
+    report["runs"] = runs
+    report["median"] = {name: statistics.median(run[name] for run in runs) for name in METRICS}
+    if args.importtime:
+        _result, stderr = run_child(config_path, importtime=True)
+        report["top_imports"] = [
+            {"module": name, "self_us": self_us, "cumulative_us": cumulative_us}
+            for name, self_us, cumulative_us in top_imports(stderr, args.importtime_top)
+        ]
+    return report
+
+
+def check_thresholds(values: dict[str, float], thresholds: dict[str, float]) -> list[str]:
+    failures = []
+    for name, limit in thresholds.items():
+        value = values.get(name)
+        if value is not None and (value > limit or value < 0):
+            failures.append(f"{name}: {value:.2f} > {limit:.2f}")
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--days", type=int, default=30, help="Synthetic history length.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes to start.")
+    parser.add_argument("--db", help="Keep the generated database here and reuse it next time.")
+    parser.add_argument("--importtime", action="store_true", help="Show the slowest imports.")
+    parser.add_argument("--importtime-top", type=int, default=15)
+    parser.add_argument("--thresholds", default=str(THRESHOLDS_PATH))
+    parser.add_argument("--no-check", action="store_true", help="Report only, ignore thresholds.")
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--spawned-at", type=float, default=0.0, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(Path(args.child), args.spawned_at or time.time())
+        return 0
+
+    from benchmarks.report import load_report, print_comparison, write_report
+
+    baseline = load_report(args.compare) if args.compare else None
+    report = run(args)
+    values = {f"startup.{name}": value for name, value in report["median"].items()}
+    print(f"dataset:          {report['dataset']['days']} days, {report['dataset']['rows']} rows")
+    if baseline:
+        print(f"baseline:         {baseline.get('commit') or '?'}")
+    baseline_values = (
+        {f"startup.{name}": value for name, value in baseline.get("median", {}).items()}
+        if baseline
+        else {}
+    )
+    print_comparison(values, baseline_values)
+    for item in report.get("top_imports", []):
+        print(
+            f"  {item['module']:<40} self {item['self_us'] / 1000:>7.1f} ms"
+            f"   cumulative {item['cumulative_us'] / 1000:>7.1f} ms"
+        )
+
+    thresholds = load_report(args.thresholds) if Path(args.thresholds).exists() else {}
+    thresholds = thresholds.get(f"{args.days}d") or thresholds.get("default", {})
+    failures = check_thresholds(values, thresholds)
+    report["threshold_failures"] = failures
+    if args.output:
+        write_report(args.output, report)
+        print(f"report:           {args.output}")
+    for failure in failures:
+        print(f"[FAIL] {failure}")
+    if failures and not args.no_check:
+        return 1
+    print("result:           " + ("OK" if not failures else "over thresholds (--no-check)"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+Бенчмарк хранилища на синтетических данных: скорость insert_event,
+размер БД, время построения свертки, задержка get_time_stats за
+сегодня/7/30/365 дней и поиска по заголовкам окон за весь набор.
+
+Запуск из корня репозитория:
+    python -m benchmarks.storage --days 30 --output bench-storage.json
+    python -m benchmarks.storage --days 365 --compare bench-storage.json
+
+Результат пишется в JSON с параметрами набора, версиями Python/SQLite и
+коммитом, так что прогоны до и после изменения хранилища можно сравнить.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.report import (
+    environment,
+    latency_summary,
+    load_report,
+    print_comparison,
+    write_report,
+)
+from benchmarks.synthetic_events import (
+    DEFAULT_START,
+    SyntheticDataset,
+    build_rollup,
+    fill_database,
+    iter_events,
+)
+from storage.db import get_time_stats, init_db, insert_event, search_window_titles
+
+STATS_RANGES = (("today", 1), ("7d", 7), ("30d", 30), ("365d", 365))
+# Редкий заголовок, частый и широкий запрос, упирающийся в лимит совпадений.
+TITLE_QUERIES = (("rare", "Issue #12"), ("frequent", "README"), ("broad", "py"))
+
+def _db_size(db_path: Path) -> int:
+    size = 0
+    for suffix in ("", "-wal", "-shm"):
+        candidate = Path(f"{db_path}{suffix}")
+        if candidate.exists():
+            size += candidate.stat().st_size
+    return size
+
+
+def _count_rows(db_path: Path) -> int:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM events;").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def measure_inserts(db_path: Path, dataset: SyntheticDataset, count: int) -> dict[str, float]:
+    """insert_event ровно так, как его зовет движок: по строке на вызов."""
+    samples: list[float] = []
+    started = time.perf_counter()
+    for row in itertools.islice(iter_events(dataset), count):
+        call_started = time.perf_counter()
+        insert_event(
+            str(db_path),
+            datetime.fromisoformat(row[0]),
+            row[1],
+            row[2],
+            bool(row[3]),
+            bool(row[4]),
+            bool(row[5]),
+            row[6],
+            row[7],
+        )
+        samples.append((time.perf_counter() - call_started) * 1000)
+    elapsed = time.perf_counter() - started
+    result = latency_summary(samples)
+    result["rows_per_second"] = len(samples) / elapsed if elapsed else 0.0
+    return result
+
+
+def measure_stats(
+    db_path: Path,
+    dataset: SyntheticDataset,
+    repeat: int,
+) -> dict[str, dict[str, float]]:
+    end_utc = dataset.end
+    day_start = end_utc - timedelta(days=1)
+    results: dict[str, dict[str, float]] = {}
+    for label, days in STATS_RANGES:
+        start_utc = day_start if days == 1 else end_utc - timedelta(days=days)
+        samples: list[float] = []
+        stats = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            stats = get_time_stats(str(db_path), start_utc, end_utc, dataset.interval_seconds)
+            samples.append((time.perf_counter() - started) * 1000)
+        entry = latency_summary(samples)
+        entry["first_ms"] = samples[0]
+        entry["total_seconds"] = stats.total_seconds if stats is not None else 0.0
+        entry["apps"] = len(stats.by_app) if stats is not None else 0
+        results[label] = entry
+    return results
+
+
+def measure_title_search(
+    db_path: Path,
+    dataset: SyntheticDataset,
+    repeat: int,
+) -> dict[str, dict[str, float]]:
+    results: dict[str, dict[str, float]] = {}
+    for label, query in TITLE_QUERIES:
+        samples: list[float] = []
+        found = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            found = search_window_titles(
+                str(db_path),
+                query,
+                dataset.start,
+                dataset.end,
+                dataset.interval_seconds,
+            )
+            samples.append((time.perf_counter() - started) * 1000)
+        entry = latency_summary(samples)
+        entry["matched_titles"] = found.matched_titles if found is not None else 0
+        entry["active_seconds"] = found.active_seconds if found is not None else 0.0
+        results[label] = entry
+    return results
+
+
+def run(args: argparse.Namespace) -> dict[str, object]:
+    dataset = SyntheticDataset(
+        start=DEFAULT_START,
+        days=args.days,
+        interval_seconds=args.interval,
+        seed=args.seed,
+    )
+    if args.db:
+        db_path = Path(args.db)
+    else:
+        db_path = Path(tempfile.mkdtemp(prefix="focusmeter-storage-")) / "bench.db"
+
+    init_db(str(db_path))
+    existing = _count_rows(db_path)
+    report = environment("storage")
+    report["dataset"] = dataset.describe()
+
+    if existing == 0:
+        inserts = min(args.insert_samples, dataset.row_count)
+        print(f"insert_event x{inserts} ...", flush=True)
+        report["insert_event"] = measure_inserts(db_path, dataset, inserts)
+        print(f"filling {dataset.row_count - inserts} rows ...", flush=True)
+        report["bulk_fill"] = fill_database(db_path, dataset, skip=inserts)
+    elif existing != dataset.row_count:
+        raise SystemExit(
+            f"{db_path} has {existing} rows, expected {dataset.row_count} for this dataset"
+        )
+    else:
+        print(f"reusing {db_path} ({existing} rows)", flush=True)
+
+    print("rollup ...", flush=True)
+    report["rollup"] = build_rollup(db_path)
+
+    size = _db_size(db_path)
+    report["db"] = {
+        "path": str(db_path),
+        "size_bytes": size,
+        "bytes_per_row": size / dataset.row_count if dataset.row_count else 0.0,
+    }
+    print("get_time_stats ...", flush=True)
+    report["get_time_stats"] = measure_stats(db_path, dataset, args.repeat)
+    print("title search ...", flush=True)
+    report["title_search"] = measure_title_search(db_path, dataset, args.repeat)
+    return report
+
+
+def _headline(report: dict[str, object]) -> dict[str, float]:
+    """Плоский набор метрик, по которому сравниваются прогоны."""
+    values: dict[str, float] = {}
+    inserts = report.get("insert_event")
+    if isinstance(inserts, dict):
+        values["insert_event.rows_per_second"] = inserts["rows_per_second"]
+        values["insert_event.p50_ms"] = inserts["p50_ms"]
+    values["db.bytes_per_row"] = report["db"]["bytes_per_row"]
+    rollup = report.get("rollup")
+    if isinstance(rollup, dict):
+        values["rollup.rows"] = rollup["rows"]
+    for label, entry in report["get_time_stats"].items():
+        values[f"get_time_stats.{label}.p50_ms"] = entry["p50_ms"]
+    for label, entry in report.get("title_search", {}).items():
+        values[f"title_search.{label}.p50_ms"] = entry["p50_ms"]
+    return values
+
+
+def print_report(report: dict[str, object], baseline: dict[str, object] | None) -> None:
+    dataset = report["dataset"]
+    print(f"dataset:          {dataset['days']} days, {dataset['rows']} rows, seed {dataset['seed']}")
+    print(f"sqlite:           {report['sqlite']} (python {report['python']})")
+    if baseline:
+        print(f"baseline:         {baseline.get('commit') or '?'} ({baseline['dataset']['rows']} rows)")
+    print_comparison(_headline(report), _headline(baseline) if baseline else {})
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=30, help="Synthetic history length.")
+    parser.add_argument("--interval", type=float, default=1.0, help="Poll interval, seconds.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--insert-samples", type=int, default=2000, help="Rows written via insert_event.")
+    parser.add_argument("--repeat", type=int, default=5, help="get_time_stats calls per range.")
+    parser.add_argument("--db", help="Keep the generated database here and reuse it next time.")
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against.")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        baseline = load_report(args.compare)
+
+    report = run(args)
+    print_report(report, baseline)
+    if args.output:
+        write_report(args.output, report)
+        print(f"report:           {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""
+Детерминированный генератор событий трекера для бенчмарков.
+
+Сутки моделируются так, будто трекер работает круглосуточно с опросом раз
+в interval секунд: рабочие часы с перевесом рабочих приложений, вечер с
+перевесом отвлекающих, ночь без активности пользователя. Внутри активных
+часов переключения между окнами идут отрезками случайной длины, среди
+которых попадаются перерывы в простое. Один и тот же seed дает одни и те
+же строки, поэтому результаты сравнимы между коммитами.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import sqlite3
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import cast
+
+from storage.db import init_db
+from storage.rollup import catch_up
+
+# Порядок полей совпадает с аргументами storage.db.insert_event.
+EventRow = tuple[str, str, str, int, int, int, float, int]
+
+DEFAULT_START = datetime(2025, 1, 1)
+
+# Те же колонки, что заполняет insert_event; массовая вставка нужна только
+# для подготовки набора, ее скорость к приложению не относится.
+_BULK_INSERT = """
+    INSERT INTO events (
+        timestamp_utc, app_name, window_title, is_work_app, is_distracting_app,
+        user_active, idle_seconds, inputs_since_last
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
+
+@dataclass(frozen=True)
+class AppProfile:
+    name: str
+    kind: str
+    titles: tuple[str, ...]
+    mean_segment_seconds: float
+
+
+APP_PROFILES = (
+    AppProfile(
+        "code",
+        "work",
+        ("{n}.py - focusmeter - Visual Studio Code", "README.md - focusmeter", "test_{n}.py"),
+        420.0,
+    ),
+    AppProfile(
+        "pycharm",
+        "work",
+        ("tracker_engine.py – FocusMeter", "storage/db.py – FocusMeter", "Run: main {n}"),
+        600.0,
+    ),
+    AppProfile("terminal", "work", ("bash — ~/src/project-{n}", "python -m pytest", "htop"), 120.0),
+    AppProfile(
+        "firefox",
+        "other",
+        ("Issue #{n} · GitHub — Mozilla Firefox", "sqlite3 — Python docs", "Search: {n}"),
+        180.0,
+    ),
+    AppProfile("slack", "other", ("#general | Team", "Direct message {n}", "Threads"), 90.0),
+    AppProfile("outlook", "other", ("Inbox ({n}) - Outlook", "Meeting notes {n}"), 150.0),
+    AppProfile("telegram", "distract", ("Telegram ({n})", "Chat {n}", "Saved Messages"), 100.0),
+    AppProfile("youtube", "distract", ("Video {n} - YouTube", "YouTube"), 480.0),
+    AppProfile("steam", "distract", ("Steam", "Library - Game {n}"), 1200.0),
+)
+
+# Веса приложений по периодам суток (в порядке APP_PROFILES).
+WORKDAY_WEIGHTS = (30, 18, 12, 14, 8, 6, 5, 4, 1)
+EVENING_WEIGHTS = (6, 3, 3, 16, 4, 2, 20, 30, 16)
+
+WORKDAY_HOURS = (9, 19)
+EVENING_HOURS = (19, 24)
+IDLE_BREAK_PROBABILITY = 0.08
+
+
+@dataclass(frozen=True)
+class SyntheticDataset:
+    start: datetime
+    days: int
+    interval_seconds: float = 1.0
+    seed: int = 42
+
+    @property
+    def end(self) -> datetime:
+        return self.start + timedelta(days=self.days)
+
+    @property
+    def row_count(self) -> int:
+        return int(round(self.days * 86400 / self.interval_seconds))
+
+    def describe(self) -> dict[str, object]:
+        return {
+            "start": self.start.isoformat(),
+            "days": self.days,
+            "interval_seconds": self.interval_seconds,
+            "seed": self.seed,
+            "rows": self.row_count,
+        }
+
+
+def _format_title(rng: random.Random, profile: AppProfile) -> str:
+    return rng.choice(profile.titles).replace("{n}", str(rng.randrange(1, 500)))
+
+
+def _period_weights(hour: int) -> tuple[int, ...] | None:
+    if WORKDAY_HOURS[0] <= hour < WORKDAY_HOURS[1]:
+        return WORKDAY_WEIGHTS
+    if EVENING_HOURS[0] <= hour < EVENING_HOURS[1]:
+        return EVENING_WEIGHTS
+    return None
+
+
+def iter_events(dataset: SyntheticDataset) -> Iterator[EventRow]:
+    """Строки событий по одной на интервал опроса, в порядке времени."""
+    rng = random.Random(dataset.seed)
+    interval = dataset.interval_seconds
+    step = timedelta(seconds=interval)
+    total = dataset.row_count
+    emitted = 0
+    current = dataset.start
+    profile = APP_PROFILES[0]
+    title = _format_title(rng, profile)
+
+    while emitted < total:
+        weights = _period_weights(current.hour)
+        if weights is None:
+            # Ночью компьютер не выключен, но пользователя нет до утра.
+            morning = current.replace(hour=WORKDAY_HOURS[0], minute=0, second=0, microsecond=0)
+            if morning <= current:
+                morning += timedelta(days=1)
+            length = max(1, int((morning - current).total_seconds() / interval))
+            active = False
+        elif rng.random() < IDLE_BREAK_PROBABILITY:
+            length = max(1, int(rng.uniform(60, 1200) / interval))
+            active = False
+        else:
+            profile = rng.choices(APP_PROFILES, weights=weights)[0]
+            title = _format_title(rng, profile)
+            seconds = min(max(rng.expovariate(1 / profile.mean_segment_seconds), 5.0), 3600.0)
+            length = max(1, int(seconds / interval))
+            active = True
+
+        length = min(length, total - emitted)
+        is_work = 1 if profile.kind == "work" else 0
+        is_distract = 1 if profile.kind == "distract" else 0
+        for index in range(length):
+            timestamp = (current + step * index).isoformat()
+            if active:
+                yield (
+                    timestamp,
+                    profile.name,
+                    title,
+                    is_work,
+                    is_distract,
+                    1,
+                    float(rng.randrange(3)) if index % 7 else 0.0,
+                    rng.randrange(0, 40),
+                )
+            else:
+                yield (
+                    timestamp,
+                    profile.name,
+                    title,
+                    is_work,
+                    is_distract,
+                    0,
+                    (index + 1) * interval,
+                    0,
+                )
+        emitted += length
+        current += step * length
+
+
+def iter_batches(dataset: SyntheticDataset, size: int = 50_000) -> Iterator[list[EventRow]]:
+    batch: list[EventRow] = []
+    for row in iter_events(dataset):
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def fill_database(db_path: str | Path, dataset: SyntheticDataset, skip: int = 0) -> dict[str, float]:
+    """Массовая вставка набора, пропуская первые skip строк."""
+    init_db(str(db_path))
+    conn = sqlite3.connect(db_path)
+    rows = 0
+    started = time.perf_counter()
+    try:
+        for batch in iter_batches(dataset):
+            if skip >= len(batch):
+                skip -= len(batch)
+                continue
+            if skip:
+                batch = batch[skip:]
+                skip = 0
+            conn.executemany(_BULK_INSERT, batch)
+            conn.commit()
+            rows += len(batch)
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - started
+    return {"rows": rows, "seconds": elapsed, "rows_per_second": rows / elapsed if elapsed else 0.0}
+
+
+def build_rollup(db_path: str | Path) -> dict[str, float]:
+    """Догоняет свертку целиком, как со временем сделает само приложение."""
+    init_db(str(db_path))
+    conn = sqlite3.connect(db_path)
+    started = time.perf_counter()
+    try:
+        catch_up(conn, None)
+        rows = conn.execute("SELECT COUNT(*) FROM usage_rollup;").fetchone()[0]
+    finally:
+        conn.close()
+    return {"rows": rows, "seconds": time.perf_counter() - started}
+
+
+def ensure_database(db_path: str | Path, dataset: SyntheticDataset) -> bool:
+    """
+    Готовит БД с набором dataset. Рядом хранится описание набора: если оно
+    совпадает, база переиспользуется (True), иначе строится заново.
+    """
+    db_path = Path(db_path)
+    marker = db_path.with_name(db_path.name + ".dataset.json")
+    description = dataset.describe()
+    if db_path.exists() and marker.exists():
+        try:
+            if json.loads(marker.read_text(encoding="utf-8")) == description:
+                build_rollup(db_path)
+                return True
+        except (OSError, ValueError):
+            pass
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+    fill_database(db_path, dataset)
+    build_rollup(db_path)
+    marker.write_text(json.dumps(description), encoding="utf-8")
+    return False
+
+
+def write_rules_file(path: str | Path, with_history: bool = False, extra_history: int = 0) -> None:
+    """
+    app_rules.json для набора: рабочие и отвлекающие приложения по
+    APP_PROFILES, один шаблон по заголовку и, при with_history, история;
+    extra_history добавляет столько выдуманных приложений в историю.
+    Файл пишется напрямую: set_rule заодно сохранил бы config.json.
+    """
+    payload: dict[str, object] = {
+        "version": 1,
+        "rules": {
+            "work": sorted(item.name for item in APP_PROFILES if item.kind == "work"),
+            "distracting": sorted(item.name for item in APP_PROFILES if item.kind == "distract"),
+            "excluded": [],
+        },
+        "favorites": [],
+        "patterns": [
+            {"rule": "work", "process": "firefox", "title": "*GitHub*", "syntax": "glob", "priority": 5}
+        ],
+        "history": {},
+    }
+    if with_history:
+        payload["history"] = {
+            item.name: {
+                "process_name": item.name,
+                "window_title": item.titles[0].replace("{n}", "1"),
+                "exe_path": f"/usr/bin/{item.name}",
+                "last_seen_utc": DEFAULT_START.isoformat(),
+                "seen_count": 1,
+            }
+            for item in APP_PROFILES
+        }
+    history = cast(dict[str, object], payload["history"])
+    for index in range(extra_history):
+        name = f"synthapp{index}"
+        history[name] = {
+            "process_name": name,
+            "window_title": f"Document {index} - Synthetic Suite {index % 97}",
+            "exe_path": f"/opt/synth/{name}/bin/{name}",
+            "last_seen_utc": (DEFAULT_START - timedelta(minutes=index)).isoformat(),
+            "seen_count": 1 + index % 7,
+        }
+    Path(path).write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
@@ -0,0 +1,271 @@
+"""
+Бенчмарк цикла трекера: настоящий TrackerEngine (классификация, история
+приложений, запись в БД, снимки для получателей) с подменными окном,
+вводом и часами. Модельное время не ждет, так что миллионы тиков
+прокручиваются без сна; платформенную задержку можно добавить флагами.
+
+Запуск из корня репозитория:
+    python -m benchmarks.tracker_loop --ticks 100000 --output loop.json
+    python -m benchmarks.tracker_loop --ticks 2000000 --compare loop.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from functools import partial
+from pathlib import Path
+
+from benchmarks.report import environment, load_report, print_comparison, write_report
+from benchmarks.synthetic_events import APP_PROFILES, write_rules_file
+from config import Config
+from notifier import NotificationDispatcher
+from rules_service import AppRulesService
+from tracker.active_window import WindowInfo
+from tracker.fake_backends import FakeInputTracker, FakeWindowProbe, SimulatedClock
+from tracker_engine import SnapshotDelta, TrackerEngine, TrackerSink, WorkerSnapshot
+
+
+class _CountingSink(TrackerSink):
+    def __init__(self) -> None:
+        self.snapshots = 0
+        self.ticks = 0
+
+    def on_snapshot(self, delta: SnapshotDelta) -> None:
+        self.snapshots += 1
+
+    def on_tick(self, snapshot: WorkerSnapshot | None) -> None:
+        self.ticks += 1
+
+
+class _AllocationSink(TrackerSink):
+    """Пиковый прирост памяти за тик по tracemalloc."""
+
+    def __init__(self, ticks: int) -> None:
+        # Буфер выделен заранее, чтобы сам замер не выглядел как рост памяти.
+        self.peaks = array("q", bytes(8 * ticks))
+        self.recorded = 0
+        self._baseline = 0
+
+    def arm(self) -> None:
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def on_tick(self, snapshot: WorkerSnapshot | None) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        if self.recorded < len(self.peaks):
+            self.peaks[self.recorded] = max(0, peak - self._baseline)
+            self.recorded += 1
+        self._baseline = current
+        tracemalloc.reset_peak()
+
+
+def build_windows() -> list[WindowInfo]:
+    windows = []
+    for index, profile in enumerate(APP_PROFILES):
+        for title in profile.titles:
+            windows.append(
+                WindowInfo(
+                    process_name=profile.name,
+                    window_title=title.replace("{n}", str(index)),
+                    pid=1000 + index,
+                    exe_path=f"/usr/bin/{profile.name}",
+                )
+            )
+    return windows
+
+
+def build_engine(args: argparse.Namespace, workdir: Path) -> tuple[TrackerEngine, FakeWindowProbe, _CountingSink]:
+    config = Config(
+        db_path=str(workdir / "loop.db"),
+        app_rules_path=str(workdir / "app_rules.json"),
+    )
+    write_rules_file(config.app_rules_path)
+    rules = AppRulesService(config)
+
+    clock = SimulatedClock()
+    probe = FakeWindowProbe(
+        clock,
+        windows=build_windows(),
+        dwell_seconds=args.dwell,
+        random_dwell=True,
+        latency_seconds=args.window_latency_ms / 1000,
+    )
+    input_factory = partial(
+        FakeInputTracker,
+        clock,
+        active_seconds=args.active_seconds,
+        idle_seconds=args.idle_seconds,
+        latency_seconds=args.input_latency_ms / 1000,
+    )
+    notifier = NotificationDispatcher(deliver=lambda title, message: None)
+    notifier.start()
+    sink = _CountingSink()
+    engine = TrackerEngine(
+        config,
+        rules_service=rules,
+        sinks=[sink],
+        clock=clock,
+        window_probe=probe,
+        input_tracker_factory=input_factory,
+        notifier=notifier,
+        profile=args.phases,
+    )
+    return engine, probe, sink
+
+
+def _gc_collections() -> int:
+    return sum(item["collections"] for item in gc.get_stats())
+
+
+def run(args: argparse.Namespace) -> dict[str, object]:
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix="focusmeter-loop-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    engine, probe, sink = build_engine(args, workdir)
+
+    if args.warmup:
+        engine.run(max_ticks=args.warmup)
+    engine.tick_duration.reset()
+    engine.db_write_duration.reset()
+    engine.profiler.reset()
+    snapshots_before = sink.snapshots
+    switches_before = probe.switches
+    collections_before = _gc_collections()
+
+    print(f"running {args.ticks} ticks ...", flush=True)
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    engine.run(max_ticks=args.ticks)
+    wall = time.perf_counter() - wall_started
+    cpu = time.process_time() - cpu_started
+    ticks = args.ticks
+
+    report = environment("tracker_loop")
+    report["params"] = {
+        "ticks": ticks,
+        "warmup": args.warmup,
+        "dwell_seconds": args.dwell,
+        "active_seconds": args.active_seconds,
+        "idle_seconds": args.idle_seconds,
+        "window_latency_ms": args.window_latency_ms,
+        "input_latency_ms": args.input_latency_ms,
+        "phases": args.phases,
+    }
+    report["loop"] = {
+        "wall_seconds": wall,
+        "cpu_seconds": cpu,
+        "cpu_us_per_tick": cpu / ticks * 1e6,
+        "wall_us_per_tick": wall / ticks * 1e6,
+        "ticks_per_second": ticks / wall if wall else 0.0,
+        "simulated_hours": ticks * engine.config.poll_interval_seconds / 3600,
+        "snapshots_emitted": sink.snapshots - snapshots_before,
+        "window_switches": probe.switches - switches_before,
+        "gc_collections_per_1k_ticks": (_gc_collections() - collections_before) * 1000 / ticks,
+        "tick_duration": engine.tick_duration.summary(),
+        "db_write_duration": engine.db_write_duration.summary(),
+    }
+    if args.phases:
+        report["phases"] = engine.profiler.summary()
+
+    if args.alloc_ticks:
+        print(f"tracing allocations over {args.alloc_ticks} ticks ...", flush=True)
+        allocations = _AllocationSink(args.alloc_ticks)
+        engine.add_sink(allocations)
+        tracemalloc.start()
+        # Циклический мусор (например, замыкания json-кодировщика) собирается
+        # не сразу; без gc.collect() он выглядел бы как утечка.
+        gc.collect()
+        started_bytes = tracemalloc.get_traced_memory()[0]
+        allocations.arm()
+        engine.run(max_ticks=args.alloc_ticks)
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - started_bytes
+        tracemalloc.stop()
+        engine.remove_sink(allocations)
+        peaks = sorted(allocations.peaks[1:allocations.recorded]) or [0]
+        report["allocations"] = {
+            "ticks": args.alloc_ticks,
+            "peak_bytes_per_tick_p50": peaks[len(peaks) // 2],
+            "peak_bytes_per_tick_max": peaks[-1],
+            "retained_bytes_per_1k_ticks": retained * 1000 / args.alloc_ticks,
+        }
+
+    engine.notifier.stop()
+    return report
+
+
+def _headline(report: dict[str, object]) -> dict[str, float]:
+    loop = report["loop"]
+    values = {
+        "loop.cpu_us_per_tick": loop["cpu_us_per_tick"],
+        "loop.wall_us_per_tick": loop["wall_us_per_tick"],
+        "loop.tick_p95_ms": loop["tick_duration"]["p95_ms"],
+        "loop.db_write_p50_ms": loop["db_write_duration"]["p50_ms"],
+        "loop.gc_collections_per_1k_ticks": loop["gc_collections_per_1k_ticks"],
+    }
+    allocations = report.get("allocations")
+    if isinstance(allocations, dict):
+        values["alloc.peak_bytes_per_tick_p50"] = allocations["peak_bytes_per_tick_p50"]
+        values["alloc.retained_bytes_per_1k_ticks"] = allocations["retained_bytes_per_1k_ticks"]
+    return values
+
+
+def print_report(report: dict[str, object], baseline: dict[str, object] | None) -> None:
+    loop = report["loop"]
+    print(
+        f"ticks:            {report['params']['ticks']} "
+        f"({loop['simulated_hours']:.1f} simulated hours) in {loop['wall_seconds']:.1f} s"
+    )
+    print(
+        f"emitted:          {loop['snapshots_emitted']} snapshots, "
+        f"{loop['window_switches']} window switches"
+    )
+    if baseline:
+        print(f"baseline:         {baseline.get('commit') or '?'} ({baseline['params']['ticks']} ticks)")
+    print_comparison(_headline(report), _headline(baseline) if baseline else {})
+    phases = report.get("phases")
+    if isinstance(phases, dict):
+        for name, entry in phases.items():
+            print(f"  {name:<10} p50={entry['p50_ms']:.3f} ms p95={entry['p95_ms']:.3f} ms")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--ticks", type=int, default=100_000)
+    parser.add_argument("--warmup", type=int, default=1000)
+    parser.add_argument("--dwell", type=float, default=45.0, help="Mean seconds per window.")
+    parser.add_argument("--active-seconds", type=float, default=900.0)
+    parser.add_argument("--idle-seconds", type=float, default=180.0)
+    parser.add_argument("--window-latency-ms", type=float, default=0.0)
+    parser.add_argument("--input-latency-ms", type=float, default=0.0)
+    parser.add_argument("--phases", action="store_true", help="Enable the per-phase profiler.")
+    parser.add_argument(
+        "--alloc-ticks",
+        type=int,
+        default=5000,
+        help="Extra ticks traced with tracemalloc (0 disables).",
+    )
+    parser.add_argument("--workdir", help="Directory for the database and rules file.")
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against.")
+    args = parser.parse_args(argv)
+
+    baseline = load_report(args.compare) if args.compare else None
+    report = run(args)
+    print_report(report, baseline)
+    if args.output:
+        write_report(args.output, report)
+        print(f"report:           {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 import sys
-from dataclasses import asdict, dataclass, field
+from dataclasses import asdict, dataclass, field, fields
 from pathlib import Path
 
 if getattr(sys, "frozen", False):
@@ -46,39 +46,80 @@ class Config:
     widget_compact_mode: bool = False
     app_rules_path: str = str(APP_RULES_PATH_DEFAULT)
 
+    ipc_enabled: bool = True
+    ipc_socket_path: str = ""
+    status_file_enabled: bool = True
+    status_file_path: str = ""
+    metrics_enabled: bool = False
+    metrics_port: int = 9464
+    stall_watchdog_enabled: bool = True
+    stall_threshold_ms: int = 500
+    stall_log_path: str = ""
+    icon_cache_dir: str = ""
+
+
+def _config_from_raw(raw: dict) -> Config:
+    cfg = Config(
+        poll_interval_seconds=int(raw.get("poll_interval_seconds", 1)),
+        idle_threshold_seconds=int(raw.get("idle_threshold_seconds", 10)),
+        idle_warning_minutes=int(raw.get("idle_warning_minutes", 10)),
+        break_warning_minutes=int(raw.get("break_warning_minutes", 25)),
+        notify_on_idle=bool(raw.get("notify_on_idle", True)),
+        notify_on_break=bool(raw.get("notify_on_break", True)),
+        work_apps=list(raw.get("work_apps", [])),
+        distracting_apps=list(raw.get("distracting_apps", [])),
+        db_path=raw.get("db_path", str(DB_PATH_DEFAULT)),
+        theme=raw.get("theme", "dark"),
+        widget_always_on_top=bool(raw.get("widget_always_on_top", True)),
+        widget_compact_mode=bool(raw.get("widget_compact_mode", False)),
+        app_rules_path=raw.get("app_rules_path", str(APP_RULES_PATH_DEFAULT)),
+        ipc_enabled=bool(raw.get("ipc_enabled", True)),
+        ipc_socket_path=str(raw.get("ipc_socket_path", "") or ""),
+        status_file_enabled=bool(raw.get("status_file_enabled", True)),
+        status_file_path=str(raw.get("status_file_path", "") or ""),
+        metrics_enabled=bool(raw.get("metrics_enabled", False)),
+        metrics_port=int(raw.get("metrics_port", 9464)),
+        stall_watchdog_enabled=bool(raw.get("stall_watchdog_enabled", True)),
+        stall_threshold_ms=int(raw.get("stall_threshold_ms", 500)),
+        stall_log_path=str(raw.get("stall_log_path", "") or ""),
+        icon_cache_dir=str(raw.get("icon_cache_dir", "") or ""),
+    )
+    cfg.work_apps = _normalize_app_names(cfg.work_apps)
+    cfg.distracting_apps = _normalize_app_names(cfg.distracting_apps)
+    return cfg
+
 
-def load_config() -> Config:
-    if CONFIG_PATH.exists():
-        with CONFIG_PATH.open("r", encoding="utf-8") as handle:
-            raw = json.load(handle)
-
-        cfg = Config(
-            poll_interval_seconds=int(raw.get("poll_interval_seconds", 1)),
-            idle_threshold_seconds=int(raw.get("idle_threshold_seconds", 10)),
-            idle_warning_minutes=int(raw.get("idle_warning_minutes", 10)),
-            break_warning_minutes=int(raw.get("break_warning_minutes", 25)),
-            notify_on_idle=bool(raw.get("notify_on_idle", True)),
-            notify_on_break=bool(raw.get("notify_on_break", True)),
-            work_apps=list(raw.get("work_apps", [])),
-            distracting_apps=list(raw.get("distracting_apps", [])),
-            db_path=raw.get("db_path", str(DB_PATH_DEFAULT)),
-            theme=raw.get("theme", "dark"),
-            widget_always_on_top=bool(raw.get("widget_always_on_top", True)),
-            widget_compact_mode=bool(raw.get("widget_compact_mode", False)),
-            app_rules_path=raw.get("app_rules_path", str(APP_RULES_PATH_DEFAULT)),
-        )
-        cfg.work_apps = _normalize_app_names(cfg.work_apps)
-        cfg.distracting_apps = _normalize_app_names(cfg.distracting_apps)
-        return cfg
+def read_config(path: Path = CONFIG_PATH) -> Config:
+    """Прочитать config.json без создания файла по умолчанию."""
+    with path.open("r", encoding="utf-8") as handle:
+        return _config_from_raw(json.load(handle))
+
+
+def load_config(path: Path = CONFIG_PATH) -> Config:
+    if path.exists():
+        return read_config(path)
 
     cfg = Config()
-    save_config(cfg)
+    save_config(cfg, path)
     return cfg
 
 
-def save_config(cfg: Config) -> None:
+def config_changes(current: Config, fresh: Config) -> set[str]:
+    """
+    Поля, которыми fresh отличается от current. Настройки не меняются на
+    месте: другие потоки читают Config без блокировок, поэтому новый набор
+    значений передается им целиком новым объектом.
+    """
+    return {
+        item.name
+        for item in fields(Config)
+        if getattr(current, item.name) != getattr(fresh, item.name)
+    }
+
+
+def save_config(cfg: Config, path: Path = CONFIG_PATH) -> None:
     cfg.work_apps = _normalize_app_names(cfg.work_apps)
     cfg.distracting_apps = _normalize_app_names(cfg.distracting_apps)
 
-    with CONFIG_PATH.open("w", encoding="utf-8") as handle:
+    with path.open("w", encoding="utf-8") as handle:
         json.dump(asdict(cfg), handle, ensure_ascii=False, indent=2)
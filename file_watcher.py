@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class FileSignature:
+    mtime_ns: int
+    size: int
+
+
+def file_signature(path: str | Path) -> FileSignature | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return FileSignature(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+
+
+class FileWatcher:
+    """
+    Дешевый опрос файлов через stat: файл считается измененным, только
+    если поменялись mtime или размер. Содержимое никто не перечитывает,
+    пока changed() не вернет путь.
+    """
+
+    def __init__(self, paths: Iterable[str | Path] = ()):
+        self._signatures: dict[Path, FileSignature | None] = {}
+        for path in paths:
+            self.watch(path)
+
+    def watch(self, path: str | Path) -> None:
+        self.prime(path)
+
+    def prime(self, path: str | Path) -> None:
+        """Запомнить текущее состояние файла, например после собственной записи."""
+        key = Path(path)
+        self._signatures[key] = file_signature(key)
+
+    def invalidate(self, path: str | Path) -> None:
+        """Заставить следующий changed() вернуть путь (например, файл не распарсился)."""
+        key = Path(path)
+        if key in self._signatures:
+            self._signatures[key] = None
+
+    def changed(self) -> list[Path]:
+        result: list[Path] = []
+        for path, previous in self._signatures.items():
+            current = file_signature(path)
+            if current is None or current == previous:
+                continue
+            self._signatures[path] = current
+            result.append(path)
+        return result
@@ -44,6 +44,7 @@ class FocusWidget(QDialog):
         self._always_on_top = True
         self._is_running = False
         self._is_paused = False
+        self._snapshot: WorkerSnapshot | None = None
         self._allow_close = False
         self._screen_sync_connected = False
         self._initial_layout_stabilized = False
@@ -234,6 +235,9 @@ class FocusWidget(QDialog):
         self.setFixedSize(target_size)
         self.resize(target_size)
 
+        if self._is_running and self._snapshot is not None:
+            self.update_snapshot(self._snapshot)
+
         if was_visible:
             self.show()
             self.raise_()
@@ -271,42 +275,61 @@ class FocusWidget(QDialog):
         self.pause_button.setText("Продолжить" if is_paused else "Пауза")
 
     def show_idle_state(self) -> None:
+        self._snapshot = None
         self.set_tracking_state(is_running=False, is_paused=False)
         self.timer_label.setText("00:00:00")
         self.app_label.setText("Нет активной сессии")
         self.meta_label.setText("Запустите трекинг, чтобы получить компактный обзор.")
-        self.break_label.setText("Перерыв: --")
         self.idle_label.setText("До возврата: --")
         self.break_label.setText("До перерыва: --")
         self.warning_label.hide()
 
-    def update_snapshot(self, snapshot: WorkerSnapshot) -> None:
-        self.set_tracking_state(is_running=True, is_paused=snapshot.paused)
-        self.status_chip.setText(snapshot.status_text)
-        self.timer_label.setText(format_duration(snapshot.fatigue_score))
-        self.app_label.setText(snapshot.app_name or "Не удалось определить приложение")
+    def update_snapshot(
+        self,
+        snapshot: WorkerSnapshot,
+        changed: frozenset[str] | None = None,
+    ) -> None:
+        """
+        Обновляет только виджеты, зависящие от полей changed.
+        changed=None означает полную перерисовку (например, при первом показе).
+        """
+        self._snapshot = snapshot
+
+        def touched(*names: str) -> bool:
+            return changed is None or not changed.isdisjoint(names)
+
+        if touched("paused") or not self._is_running:
+            self.set_tracking_state(is_running=True, is_paused=snapshot.paused)
+        if touched("status_text"):
+            self.status_chip.setText(snapshot.status_text)
+        if touched("fatigue_score"):
+            self.timer_label.setText(format_duration(snapshot.fatigue_score))
+        if touched("app_name"):
+            self.app_label.setText(
+                snapshot.app_name or "Не удалось определить приложение"
+            )
 
         if self._compact_mode:
-            self.meta_label.setText(
-                f"Перерыв через {format_duration(snapshot.seconds_to_break)}"
-            )
-        else:
+            if touched("seconds_to_break"):
+                self.meta_label.setText(
+                    f"Перерыв через {format_duration(snapshot.seconds_to_break)}"
+                )
+        elif touched("window_title"):
             self.meta_label.setText(
                 snapshot.window_title or "Заголовок окна недоступен."
             )
 
-        self.break_label.setText(
-            f"Перерыв: {format_duration(snapshot.seconds_to_break)}"
-        )
-        self.idle_label.setText(
-            f"Idle: {format_duration(snapshot.seconds_to_idle_warning)}"
-        )
-        self.break_label.setText(
-            f"До перерыва: {format_duration(snapshot.seconds_to_break)}"
-        )
-        self.idle_label.setText(
-            f"До возврата: {format_duration(snapshot.seconds_to_idle_warning)}"
-        )
+        if touched("seconds_to_break"):
+            self.break_label.setText(
+                f"До перерыва: {format_duration(snapshot.seconds_to_break)}"
+            )
+        if touched("seconds_to_idle_warning"):
+            self.idle_label.setText(
+                f"До возврата: {format_duration(snapshot.seconds_to_idle_warning)}"
+            )
+
+        if not touched("state", "seconds_to_break", "seconds_to_idle_warning"):
+            return
 
         warning_text = ""
         if snapshot.state == "distract" and snapshot.seconds_to_idle_warning <= 60:
@@ -317,7 +340,8 @@ class FocusWidget(QDialog):
             warning_text = "FocusMeter не видит недавнюю активность."
 
         if warning_text:
-            self.warning_label.setText(warning_text)
+            if self.warning_label.text() != warning_text:
+                self.warning_label.setText(warning_text)
             self.warning_label.show()
         else:
             self.warning_label.hide()
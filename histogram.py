@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import bisect
+import threading
+
+# Границы корзин в миллисекундах, примерно логарифмическая шкала.
+DEFAULT_BOUNDS_MS = (
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0,
+    100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0,
+)
+
+
+def geometric_bounds(start_ms: float, stop_ms: float, factor: float) -> tuple[float, ...]:
+    bounds = []
+    value = start_ms
+    while value < stop_ms:
+        bounds.append(round(value, 4))
+        value *= factor
+    bounds.append(stop_ms)
+    return tuple(bounds)
+
+
+def _percentile(
+    bounds: tuple[float, ...],
+    counts: list[int],
+    count: int,
+    maximum: float,
+    fraction: float,
+) -> float:
+    if not count:
+        return 0.0
+    target = max(1, int(round(count * fraction)))
+    seen = 0
+    for index, bucket in enumerate(counts):
+        seen += bucket
+        if seen >= target:
+            if index < len(bounds):
+                return min(bounds[index], maximum)
+            return maximum
+    return maximum
+
+
+class LatencyHistogram:
+    """
+    Гистограмма с фиксированными корзинами: запись O(log n) без выделения
+    памяти. Перцентили приблизительные (верхняя граница корзины), максимум
+    и среднее точные.
+    """
+
+    def __init__(self, bounds_ms: tuple[float, ...] = DEFAULT_BOUNDS_MS):
+        self._bounds = tuple(bounds_ms)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = [0] * (len(self._bounds) + 1)
+            self._count = 0
+            self._total = 0.0
+            self._max = 0.0
+
+    def record(self, value_ms: float) -> None:
+        index = bisect.bisect_left(self._bounds, value_ms)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._total += value_ms
+            if value_ms > self._max:
+                self._max = value_ms
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def percentile(self, fraction: float) -> float:
+        with self._lock:
+            return self._percentile_locked(fraction)
+
+    def _percentile_locked(self, fraction: float) -> float:
+        return _percentile(self._bounds, self._counts, self._count, self._max, fraction)
+
+    def summary(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "count": self._count,
+                "mean_ms": (self._total / self._count) if self._count else 0.0,
+                "p50_ms": self._percentile_locked(0.50),
+                "p95_ms": self._percentile_locked(0.95),
+                "max_ms": self._max,
+            }
+
+    def buckets(self) -> list[tuple[float, int]]:
+        """Пары (верхняя граница, количество); последняя граница — inf."""
+        with self._lock:
+            edges = (*self._bounds, float("inf"))
+            return list(zip(edges, self._counts))
+
+    def export(self) -> tuple[list[tuple[float, int]], int, float]:
+        """Согласованный срез: корзины, число записей и сумма в мс."""
+        with self._lock:
+            edges = (*self._bounds, float("inf"))
+            return list(zip(edges, self._counts)), self._count, self._total
+
+
+class RollingHistogram:
+    """
+    Скользящее окно из двух поколений по window записей: сводка покрывает
+    последние window..2*window значений, старые выпадают целиком.
+    Пишет один поток, читать можно из любого.
+    """
+
+    def __init__(
+        self,
+        window: int = 600,
+        bounds_ms: tuple[float, ...] = DEFAULT_BOUNDS_MS,
+    ):
+        self._window = max(1, window)
+        self._bounds = tuple(bounds_ms)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._current = [0] * (len(self._bounds) + 1)
+            self._previous = [0] * (len(self._bounds) + 1)
+            self._current_count = 0
+            self._previous_count = 0
+            self._current_max = 0.0
+            self._previous_max = 0.0
+            self._current_total = 0.0
+            self._previous_total = 0.0
+
+    def record(self, value_ms: float) -> None:
+        index = bisect.bisect_left(self._bounds, value_ms)
+        with self._lock:
+            if self._current_count >= self._window:
+                self._previous, self._current = self._current, self._previous
+                self._previous_count = self._current_count
+                self._previous_max = self._current_max
+                self._previous_total = self._current_total
+                for position in range(len(self._current)):
+                    self._current[position] = 0
+                self._current_count = 0
+                self._current_max = 0.0
+                self._current_total = 0.0
+            self._current[index] += 1
+            self._current_count += 1
+            self._current_total += value_ms
+            if value_ms > self._current_max:
+                self._current_max = value_ms
+
+    def summary(self) -> dict[str, float]:
+        with self._lock:
+            counts = [a + b for a, b in zip(self._current, self._previous)]
+            count = self._current_count + self._previous_count
+            maximum = max(self._current_max, self._previous_max)
+            total = self._current_total + self._previous_total
+        return {
+            "count": count,
+            "mean_ms": (total / count) if count else 0.0,
+            "p50_ms": _percentile(self._bounds, counts, count, maximum, 0.50),
+            "p95_ms": _percentile(self._bounds, counts, count, maximum, 0.95),
+            "max_ms": maximum,
+        }
@@ -0,0 +1,319 @@
+"""
+Иконки приложений для каталога. icon() отвечает сразу: иконкой из памяти
+или заглушкой, а настоящая иконка ищется в пуле потоков и приходит
+сигналом icon_ready. Найденные иконки сохраняются на диск как PNG с ключом
+из пути к файлу и его mtime, поэтому повторные запуски и обновления
+каталога не извлекают их заново. Каталог на диске ограничен по размеру,
+вытесняются давно не использованные файлы.
+
+QFileIconProvider и QPixmap работают только в GUI-потоке, поэтому в пуле
+идут stat, чтение и запись PNG и (на macOS) NSWorkspace с разбором TIFF,
+а провайдер вызывается в GUI-потоке небольшими пачками и только при
+промахе дискового кэша.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import platform
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from PyQt5.QtCore import QFileInfo, QObject, QTimer, pyqtSignal
+from PyQt5.QtGui import QIcon, QImage, QPixmap
+from PyQt5.QtWidgets import QFileIconProvider
+
+from config import BASE_DIR
+
+_SYSTEM = platform.system()
+DEFAULT_ICON_CACHE_DIR = BASE_DIR / "icon_cache"
+ICON_CACHE_MAX_BYTES = 8 * 1024 * 1024
+# После вытеснения каталог занимает не больше этой доли лимита, чтобы
+# не чистить его на каждой записи.
+ICON_CACHE_TRIM_RATIO = 0.8
+ICON_SIZE = 32
+MEMORY_CACHE_SIZE = 512
+ICON_WORKERS = 2
+# Сколько иконок извлекается провайдером за один проход цикла событий.
+EXTRACT_BATCH = 4
+
+IconKey = tuple[str, str]
+
+_nsworkspace = None
+_nsworkspace_loaded = False
+
+
+def _workspace():
+    global _nsworkspace, _nsworkspace_loaded
+    if not _nsworkspace_loaded:
+        _nsworkspace_loaded = True
+        if _SYSTEM == "Darwin":
+            try:
+                from AppKit import NSWorkspace
+            except ImportError:
+                pass
+            else:
+                _nsworkspace = NSWorkspace
+    if _nsworkspace is None:
+        return None
+    return _nsworkspace.sharedWorkspace()
+
+
+def _macos_icon_source(exe_path: str) -> str:
+    """
+    На macOS иконка приложения обычно лежит у .app bundle, а не у бинарника
+    внутри Contents/MacOS. Возвращаем путь к bundle, если можем его вычислить.
+    """
+    candidate = (exe_path or "").strip()
+    if not candidate:
+        return candidate
+
+    parts = Path(candidate).parts
+    for index, part in enumerate(parts):
+        lowered = part.lower()
+        if lowered.endswith(".app") or lowered.endswith(".app.bundle"):
+            return str(Path(*parts[: index + 1]))
+    return candidate
+
+
+def _macos_app_path_by_name(process_name: str) -> str:
+    workspace = _workspace() if process_name else None
+    if workspace is None:
+        return ""
+    candidates = [
+        process_name,
+        process_name.title(),
+        process_name.replace("_", " "),
+        process_name.replace("_", " ").title(),
+    ]
+    for candidate in candidates:
+        try:
+            resolved = workspace.fullPathForApplication_(candidate)
+        except Exception:
+            resolved = None
+        if resolved:
+            return str(resolved)
+    return ""
+
+
+def _image_from_nsworkspace(path: str) -> QImage:
+    workspace = _workspace() if path else None
+    if workspace is None:
+        return QImage()
+    try:
+        tiff_data = workspace.iconForFile_(path).TIFFRepresentation()
+        raw = bytes(tiff_data) if tiff_data else b""
+    except Exception:
+        raw = b""
+    image = QImage()
+    if raw:
+        image.loadFromData(raw)
+    return image
+
+
+def icon_source(exe_path: str, process_name: str) -> str:
+    """Файл, чья иконка показывается для приложения."""
+    path = (exe_path or "").strip()
+    if _SYSTEM != "Darwin":
+        return path
+    source = _macos_icon_source(path)
+    if source and os.path.exists(source):
+        return source
+    if path and os.path.exists(path):
+        return path
+    return _macos_app_path_by_name((process_name or "").strip())
+
+
+def disk_key(source: str, stat: os.stat_result) -> str:
+    raw = f"{_SYSTEM}|{source}|{stat.st_mtime_ns}|{stat.st_size}"
+    return hashlib.sha1(raw.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class _Signals(QObject):
+    # Из пула: найдено изображение / нужен провайдер в GUI-потоке.
+    image_ready = pyqtSignal(object, object)
+    extract_needed = pyqtSignal(object, str, str)
+
+
+class IconCache(QObject):
+    icon_ready = pyqtSignal(object)
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        max_bytes: int = ICON_CACHE_MAX_BYTES,
+        parent: QObject | None = None,
+    ):
+        super().__init__(parent)
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_ICON_CACHE_DIR
+        self.max_bytes = max(0, max_bytes)
+        self.placeholder = QFileIconProvider().icon(QFileIconProvider.IconType.File)
+        self._icons: OrderedDict[IconKey, QIcon] = OrderedDict()
+        self._pending: set[IconKey] = set()
+        self._to_extract: deque[tuple[IconKey, str, str]] = deque()
+        self._provider: QFileIconProvider | None = None
+        self._trim_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=ICON_WORKERS, thread_name_prefix="FocusMeterIcons"
+        )
+        self._closed = False
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "extracted": 0}
+
+        self._signals = _Signals(self)
+        self._signals.image_ready.connect(self._on_image_ready)
+        self._signals.extract_needed.connect(self._on_extract_needed)
+        self._extract_timer = QTimer(self)
+        self._extract_timer.setInterval(0)
+        self._extract_timer.timeout.connect(self._extract_batch)
+
+    def __len__(self) -> int:
+        return len(self._icons)
+
+    @staticmethod
+    def key(exe_path: str, process_name: str = "") -> IconKey:
+        return (exe_path or "").strip(), (process_name or "").strip().lower()
+
+    def icon(self, exe_path: str, process_name: str = "") -> QIcon:
+        key = self.key(exe_path, process_name)
+        cached = self._icons.get(key)
+        if cached is not None:
+            self._icons.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return cached
+        if key not in self._pending and not self._closed:
+            self._pending.add(key)
+            self._executor.submit(self._resolve, key, (process_name or "").strip())
+        return self.placeholder
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._extract_timer.stop()
+        self._to_extract.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _remember(self, key: IconKey, icon: QIcon) -> None:
+        self._pending.discard(key)
+        self._icons[key] = icon
+        self._icons.move_to_end(key)
+        while len(self._icons) > MEMORY_CACHE_SIZE:
+            self._icons.popitem(last=False)
+        self.icon_ready.emit(key)
+
+    # --- пул потоков ---
+
+    def _emit(self, signal, *args) -> None:
+        if self._closed:
+            return
+        try:
+            signal.emit(*args)
+        except RuntimeError:
+            # Окно закрылось, пока поток искал иконку.
+            pass
+
+    def _resolve(self, key: IconKey, process_name: str) -> None:
+        source = icon_source(key[0], process_name)
+        if not source:
+            self._emit(self._signals.image_ready, key, QImage())
+            return
+        try:
+            stat = os.stat(source)
+        except OSError:
+            # Файла нет (или нет доступа): иконку даст провайдер, но без
+            # mtime кэшировать ее на диске нельзя.
+            self._emit(self._signals.extract_needed, key, source, "")
+            return
+
+        png_path = self.cache_dir / f"{disk_key(source, stat)}.png"
+        image = QImage(str(png_path)) if png_path.exists() else QImage()
+        if not image.isNull():
+            try:
+                os.utime(png_path)
+            except OSError:
+                pass
+            self.stats["disk_hits"] += 1
+            self._emit(self._signals.image_ready, key, image)
+            return
+
+        if _SYSTEM == "Darwin":
+            image = _image_from_nsworkspace(source)
+            if not image.isNull():
+                image = image.scaled(ICON_SIZE * 2, ICON_SIZE * 2)
+                self._store(image, str(png_path))
+                self.stats["extracted"] += 1
+                self._emit(self._signals.image_ready, key, image)
+                return
+        self._emit(self._signals.extract_needed, key, source, str(png_path))
+
+    def _store(self, image: QImage, png_path: str) -> None:
+        if self.max_bytes <= 0:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            return
+        # Пишем во временный файл: соседний поток не прочитает половину PNG.
+        tmp_path = f"{png_path}.{threading.get_ident()}.tmp"
+        if not image.save(tmp_path, "PNG"):
+            return
+        try:
+            os.replace(tmp_path, png_path)
+        except OSError:
+            return
+        self._trim()
+
+    def _trim(self) -> None:
+        with self._trim_lock:
+            entries = []
+            total = 0
+            try:
+                with os.scandir(self.cache_dir) as items:
+                    for item in items:
+                        if item.name.endswith(".png"):
+                            stat = item.stat()
+                            entries.append((stat.st_mtime, stat.st_size, item.path))
+                            total += stat.st_size
+            except OSError:
+                return
+            if total <= self.max_bytes:
+                return
+            entries.sort()
+            target = self.max_bytes * ICON_CACHE_TRIM_RATIO
+            for _mtime, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+
+    # --- GUI-поток ---
+
+    def _on_image_ready(self, key: IconKey, image: QImage) -> None:
+        icon = QIcon(QPixmap.fromImage(image)) if not image.isNull() else QIcon()
+        self._remember(key, icon)
+
+    def _on_extract_needed(self, key: IconKey, source: str, png_path: str) -> None:
+        self._to_extract.append((key, source, png_path))
+        if not self._extract_timer.isActive():
+            self._extract_timer.start()
+
+    def _extract_batch(self) -> None:
+        if self._provider is None:
+            self._provider = QFileIconProvider()
+        for _ in range(min(EXTRACT_BATCH, len(self._to_extract))):
+            key, source, png_path = self._to_extract.popleft()
+            icon = self._provider.icon(QFileInfo(source))
+            self.stats["extracted"] += 1
+            self._remember(key, icon)
+            if png_path and not icon.isNull():
+                image = icon.pixmap(ICON_SIZE, ICON_SIZE).toImage()
+                if not image.isNull() and not self._closed:
+                    self._executor.submit(self._store, image, png_path)
+        if not self._to_extract:
+            self._extract_timer.stop()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import socket
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+from config import CONFIG_PATH, read_config
+from ipc_protocol import resolve_socket_path
+
+
+class IpcError(Exception):
+    pass
+
+
+class IpcClient:
+    """Клиент JSON-RPC сокета запущенного трекера (одно соединение на клиент)."""
+
+    def __init__(self, path: str | Path | None = None, timeout: float = 5.0):
+        self.path = Path(path) if path else resolve_socket_path()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(str(self.path))
+        self._reader = self._sock.makefile("rb")
+        self._ids = itertools.count(1)
+
+    def close(self) -> None:
+        self._reader.close()
+        self._sock.close()
+
+    def __enter__(self) -> IpcClient:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def call(self, method: str, **params) -> object:
+        request_id = next(self._ids)
+        request = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params:
+            request["params"] = params
+        self._sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        line = self._reader.readline()
+        if not line:
+            raise IpcError("Connection closed by tracker")
+        response = json.loads(line)
+        if "error" in response:
+            error = response["error"]
+            raise IpcError(f"{error.get('code')}: {error.get('message')}")
+        return response.get("result")
+
+    def subscribe(self) -> Iterator[dict]:
+        """Перевести соединение в поток дельт и отдавать их по мере прихода."""
+        self.call("subscribe")
+        self._sock.settimeout(None)
+        for line in self._reader:
+            message = json.loads(line)
+            yield message.get("params", {})
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Query a running FocusMeter tracker")
+    parser.add_argument("--socket", default="", help="Socket path (default: tracker default).")
+    sub = parser.add_subparsers(dest="method", required=True)
+    for name in ("ping", "snapshot", "today", "pause", "resume", "scheduler", "profile", "subscribe"):
+        sub.add_parser(name)
+    stats = sub.add_parser("stats", help="Stats for [start, end) in UTC ISO 8601.")
+    stats.add_argument("start")
+    stats.add_argument("end")
+    return parser
+
+
+def _configured_socket_path() -> Path:
+    try:
+        return resolve_socket_path(read_config(CONFIG_PATH).ipc_socket_path)
+    except (OSError, ValueError):
+        return resolve_socket_path()
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    params = {}
+    if args.method == "stats":
+        params = {"start": args.start, "end": args.end}
+    try:
+        with IpcClient(args.socket or _configured_socket_path()) as client:
+            if args.method == "subscribe":
+                for update in client.subscribe():
+                    print(json.dumps(update, ensure_ascii=False), flush=True)
+                return 0
+            result = client.call(args.method, **params)
+    except OSError as exc:
+        print(f"Cannot connect to tracker: {exc}", file=sys.stderr)
+        return 2
+    except IpcError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 0
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import os
+import socket
+import stat
+import tempfile
+from pathlib import Path
+
+IPC_SUPPORTED = hasattr(socket, "AF_UNIX")
+MAX_REQUEST_BYTES = 64 * 1024
+
+# Коды ошибок JSON-RPC 2.0.
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _fallback_runtime_dir() -> Path:
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return Path(tempfile.gettempdir()) / f"focusmeter-{uid}"
+
+
+def runtime_path(suffix: str) -> Path:
+    """
+    Файл в $XDG_RUNTIME_DIR или, если его нет, в личном каталоге
+    focusmeter-<uid> во временном каталоге (см. prepare_runtime_path).
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return Path(runtime_dir) / f"focusmeter.{suffix}"
+    return _fallback_runtime_dir() / f"focusmeter.{suffix}"
+
+
+def prepare_runtime_path(path: Path) -> None:
+    """
+    Вызывается перед созданием сокета или файла статуса. Личный каталог во
+    временном каталоге создается с правами 0700; если имя в общем /tmp
+    заранее занял другой пользователь или это не каталог, бросает
+    PermissionError. Пути вне этого каталога не проверяются.
+    """
+    directory = path.parent
+    if directory != _fallback_runtime_dir():
+        return
+    try:
+        directory.mkdir(mode=0o700)
+    except FileExistsError:
+        pass
+    info = directory.lstat()
+    owner = os.getuid() if hasattr(os, "getuid") else info.st_uid
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != owner or info.st_mode & 0o077:
+        raise PermissionError(f"{directory} is not a private directory")
+
+
+def default_socket_path() -> Path:
+    return runtime_path("sock")
+
+
+def resolve_socket_path(configured: str = "") -> Path:
+    return Path(configured).expanduser() if configured else default_socket_path()
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import socketserver
+import threading
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+
+from ipc_protocol import (
+    INTERNAL_ERROR,
+    INVALID_PARAMS,
+    INVALID_REQUEST,
+    IPC_SUPPORTED,
+    MAX_REQUEST_BYTES,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    RpcError,
+    prepare_runtime_path,
+    resolve_socket_path,
+)
+from live_stats import time_stats_to_dict
+from snapshot_stream import SnapshotHub, Subscription
+from tracker_engine import TrackerEngine, snapshot_to_dict
+
+STREAM_WRITE_TIMEOUT_SECONDS = 2.0
+
+
+def _parse_utc(value: object, name: str) -> datetime:
+    if not isinstance(value, str):
+        raise RpcError(INVALID_PARAMS, f"'{name}' must be an ISO 8601 string")
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError as exc:
+        raise RpcError(INVALID_PARAMS, f"'{name}': {exc}") from None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class _ConnectionHandler(socketserver.StreamRequestHandler):
+    server: _UnixServer
+    subscription: Subscription | None = None
+
+    def handle(self) -> None:
+        while True:
+            line = self.rfile.readline(MAX_REQUEST_BYTES)
+            if not line:
+                return
+            if not line.strip():
+                continue
+            response = self.server.api.handle_line(line, connection=self)
+            try:
+                self.wfile.write(response + b"\n")
+                self.wfile.flush()
+            except OSError:
+                return
+            if self.subscription is not None:
+                self._stream(self.subscription)
+                return
+
+    def _stream(self, subscription: Subscription) -> None:
+        """После subscribe соединение только получает дельты снимков."""
+        hub = self.server.api.hub
+        # Клиент, который не читает сокет, упрется в таймаут записи и будет
+        # отключен; поток движка при этом ничего не ждет.
+        self.connection.settimeout(STREAM_WRITE_TIMEOUT_SECONDS)
+        try:
+            while not subscription.closed:
+                message = subscription.get(timeout=1.0)
+                if message is None:
+                    continue
+                try:
+                    self.wfile.write(message.encoded() + b"\n")
+                    self.wfile.flush()
+                except OSError:
+                    hub.drop(subscription)
+                    return
+        finally:
+            subscription.close()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    allow_reuse_address = False
+
+    def __init__(self, path: str, api: TrackerIpcServer):
+        self.api = api
+        super().__init__(path, _ConnectionHandler)
+
+
+class TrackerIpcServer:
+    """
+    JSON-RPC 2.0 поверх Unix-сокета: одна строка JSON на запрос и ответ.
+    Данные берутся из памяти движка и его кешей, БД повторно не сканируется.
+    """
+
+    def __init__(self, engine: TrackerEngine, path: str | Path | None = None):
+        self.engine = engine
+        self.path = Path(path) if path else resolve_socket_path(
+            engine.config.ipc_socket_path
+        )
+        self.hub = SnapshotHub()
+        self._server: _UnixServer | None = None
+        self._thread: threading.Thread | None = None
+        self._methods: dict[str, Callable[[dict], object]] = {
+            "ping": lambda params: "pong",
+            "snapshot": self._rpc_snapshot,
+            "today": self._rpc_today,
+            "stats": self._rpc_stats,
+            "pause": self._rpc_pause,
+            "resume": self._rpc_resume,
+            "scheduler": lambda params: self.engine.scheduler.summary(),
+            "profile": self._rpc_profile,
+        }
+
+    @property
+    def is_running(self) -> bool:
+        return self._server is not None
+
+    def start(self) -> bool:
+        if self._server is not None:
+            return True
+        if not IPC_SUPPORTED:
+            return False
+
+        try:
+            prepare_runtime_path(self.path)
+            self._remove_stale_socket()
+        except OSError:
+            return False
+        # umask на время bind: сокет сразу создается с правами 0600, без
+        # окна, когда он доступен с правами по умолчанию.
+        previous_umask = os.umask(0o177)
+        try:
+            server = _UnixServer(str(self.path), self)
+        except OSError:
+            return False
+        finally:
+            os.umask(previous_umask)
+
+        self.engine.add_sink(self.hub)
+        self._server = server
+        self._thread = threading.Thread(
+            target=server.serve_forever,
+            kwargs={"poll_interval": 0.5},
+            name="FocusMeterIpc",
+            daemon=True,
+        )
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        server = self._server
+        if server is None:
+            return
+        self._server = None
+        self.engine.remove_sink(self.hub)
+        self.hub.close_all()
+        server.shutdown()
+        server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+    def _remove_stale_socket(self) -> None:
+        if not self.path.exists():
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.path))
+        except OSError:
+            # Никто не слушает: сокет остался от упавшего процесса.
+            self.path.unlink(missing_ok=True)
+        finally:
+            probe.close()
+
+    # --- протокол ----------------------------------------------------------
+
+    def handle_line(
+        self,
+        line: bytes,
+        connection: _ConnectionHandler | None = None,
+    ) -> bytes:
+        request_id = None
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                raise RpcError(PARSE_ERROR, "Parse error") from None
+            if not isinstance(request, dict):
+                raise RpcError(INVALID_REQUEST, "Request must be an object")
+            request_id = request.get("id")
+            method = request.get("method")
+            if method == "subscribe":
+                result = self._rpc_subscribe(connection)
+            else:
+                result = self.dispatch(method, request.get("params"))
+            payload = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except RpcError as exc:
+            payload = {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {"code": exc.code, "message": exc.message},
+            }
+        except Exception as exc:
+            payload = {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {"code": INTERNAL_ERROR, "message": str(exc)},
+            }
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+    def dispatch(self, method: object, params: object) -> object:
+        if not isinstance(method, str):
+            raise RpcError(INVALID_REQUEST, "'method' must be a string")
+        handler = self._methods.get(method)
+        if handler is None:
+            raise RpcError(METHOD_NOT_FOUND, f"Unknown method: {method}")
+        if params is None:
+            params = {}
+        if not isinstance(params, dict):
+            raise RpcError(INVALID_PARAMS, "'params' must be an object")
+        return handler(params)
+
+    def _rpc_snapshot(self, params: dict) -> dict:
+        snapshot = self.engine.last_snapshot
+        return {
+            "running": self.engine.is_running,
+            "paused": self.engine.is_paused,
+            "snapshot": snapshot_to_dict(snapshot) if snapshot is not None else None,
+        }
+
+    def _rpc_today(self, params: dict) -> dict:
+        return time_stats_to_dict(self.engine.today_totals())
+
+    def _rpc_stats(self, params: dict) -> dict:
+        start_utc = _parse_utc(params.get("start"), "start")
+        end_utc = _parse_utc(params.get("end"), "end")
+        if end_utc <= start_utc:
+            raise RpcError(INVALID_PARAMS, "'end' must be after 'start'")
+        return time_stats_to_dict(self.engine.stats(start_utc, end_utc))
+
+    def _rpc_subscribe(self, connection: _ConnectionHandler | None) -> dict:
+        if connection is None:
+            raise RpcError(INVALID_REQUEST, "subscribe needs a socket connection")
+        connection.subscription = self.hub.subscribe()
+        return {"subscribed": True, "subscribers": self.hub.subscriber_count()}
+
+    def _rpc_profile(self, params: dict) -> dict:
+        profiler = self.engine.profiler
+        if "enabled" in params:
+            profiler.enabled = bool(params["enabled"])
+        return {"enabled": profiler.enabled, "phases": profiler.summary()}
+
+    def _rpc_pause(self, params: dict) -> dict:
+        self.engine.pause()
+        return {"paused": True}
+
+    def _rpc_resume(self, params: dict) -> dict:
+        self.engine.resume()
+        return {"paused": False}
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime, time as dt_time, timedelta
+
+from storage.db import AppUsageRow, TimeStats, get_time_stats
+
+
+def local_day_bounds_utc(now: datetime | None = None) -> tuple[datetime, datetime]:
+    """Границы локальных суток в naive UTC, как их считает обзор «Сегодня»."""
+    local_now = now or datetime.now()
+    offset = datetime.now().astimezone().utcoffset() or timedelta(0)
+    start_local = datetime.combine(local_now.date(), dt_time.min)
+    return start_local - offset, start_local + timedelta(days=1) - offset
+
+
+def time_stats_to_dict(stats: TimeStats) -> dict[str, object]:
+    payload = asdict(stats)
+    payload["period_start"] = stats.period_start.isoformat()
+    payload["period_end"] = stats.period_end.isoformat()
+    return payload
+
+
+@dataclass
+class _AppTotals:
+    last_window_title: str = ""
+    active_seconds: float = 0.0
+    work_active_seconds: float = 0.0
+    distract_active_seconds: float = 0.0
+
+
+class LiveTotals:
+    """
+    Итоги за сегодня в памяти: один раз читаются из БД при старте,
+    дальше каждый записанный тик добавляется сюда же. Читать можно
+    из любого потока.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._start, self._end = local_day_bounds_utc()
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self._total = 0.0
+        self._active = 0.0
+        self._work = 0.0
+        self._distract = 0.0
+        self._idle = 0.0
+        self._apps: dict[str, _AppTotals] = {}
+
+    @property
+    def bounds(self) -> tuple[datetime, datetime]:
+        return self._start, self._end
+
+    def seed(self, db_path: str, sample_interval_seconds: float) -> None:
+        start, end = local_day_bounds_utc()
+        stats = get_time_stats(
+            db_path=db_path,
+            start_utc=start,
+            end_utc=end,
+            sample_interval_seconds=sample_interval_seconds,
+        )
+        with self._lock:
+            self._start, self._end = start, end
+            self._total = stats.total_seconds
+            self._active = stats.active_seconds
+            self._work = stats.work_active_seconds
+            self._distract = stats.distract_active_seconds
+            self._idle = stats.idle_seconds
+            self._apps = {
+                row.app_name: _AppTotals(
+                    last_window_title=row.last_window_title,
+                    active_seconds=row.active_seconds,
+                    work_active_seconds=row.work_active_seconds,
+                    distract_active_seconds=row.distract_active_seconds,
+                )
+                for row in stats.by_app
+            }
+
+    def add(
+        self,
+        timestamp_utc: datetime,
+        app_name: str,
+        window_title: str,
+        user_active: bool,
+        is_work_app: bool,
+        is_distracting_app: bool,
+        seconds: float,
+    ) -> None:
+        with self._lock:
+            if timestamp_utc >= self._end:
+                self._start, self._end = local_day_bounds_utc()
+                self._reset_counters()
+
+            self._total += seconds
+            entry = self._apps.get(app_name)
+            # Как и в SQL, показывается последний непустой заголовок приложения.
+            if entry is not None and window_title:
+                entry.last_window_title = window_title
+            if not user_active:
+                self._idle += seconds
+                return
+
+            self._active += seconds
+            if entry is None:
+                entry = _AppTotals()
+                self._apps[app_name] = entry
+                entry.last_window_title = window_title or ""
+            entry.active_seconds += seconds
+            if is_work_app:
+                self._work += seconds
+                entry.work_active_seconds += seconds
+            if is_distracting_app:
+                self._distract += seconds
+                entry.distract_active_seconds += seconds
+
+    def headline(self) -> tuple[float, float]:
+        """(active_seconds, work_active_seconds) без сборки полной статистики."""
+        with self._lock:
+            return self._active, self._work
+
+    def snapshot(self) -> TimeStats:
+        with self._lock:
+            total = self._total
+            active = self._active
+            rows = [
+                AppUsageRow(
+                    app_name=name,
+                    last_window_title=entry.last_window_title,
+                    active_seconds=entry.active_seconds,
+                    work_active_seconds=entry.work_active_seconds,
+                    distract_active_seconds=entry.distract_active_seconds,
+                    other_active_seconds=max(
+                        entry.active_seconds
+                        - entry.work_active_seconds
+                        - entry.distract_active_seconds,
+                        0.0,
+                    ),
+                    share_of_total=(entry.active_seconds / total) if total else 0.0,
+                    share_of_active=(entry.active_seconds / active) if active else 0.0,
+                )
+                for name, entry in self._apps.items()
+                if entry.active_seconds > 0
+            ]
+            stats = TimeStats(
+                period_start=self._start,
+                period_end=self._end,
+                total_seconds=total,
+                active_seconds=active,
+                work_active_seconds=self._work,
+                distract_active_seconds=self._distract,
+                other_active_seconds=max(active - self._work - self._distract, 0.0),
+                idle_seconds=self._idle,
+                by_app=rows,
+            )
+        stats.by_app.sort(key=lambda row: (-row.active_seconds, row.app_name))
+        return stats
+
+
+class _PendingQuery:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: TimeStats | None = None
+        self.error: BaseException | None = None
+
+
+class RangeStatsCache:
+    """
+    Кеш статистики по диапазонам. Диапазон, конец которого уже в прошлом,
+    больше не меняется, поэтому результат хранится до вытеснения.
+    Одинаковые параллельные запросы получают результат одного скана БД.
+    """
+
+    def __init__(self, max_entries: int = 64) -> None:
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, TimeStats] = OrderedDict()
+        self._inflight: dict[tuple, _PendingQuery] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get(
+        self,
+        db_path: str,
+        start_utc: datetime,
+        end_utc: datetime,
+        sample_interval_seconds: float,
+    ) -> TimeStats:
+        key = (db_path, start_utc, end_utc, float(sample_interval_seconds))
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = _PendingQuery()
+                self._inflight[key] = pending
+
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.result
+
+        try:
+            pending.result = get_time_stats(
+                db_path=db_path,
+                start_utc=start_utc,
+                end_utc=end_utc,
+                sample_interval_seconds=sample_interval_seconds,
+            )
+        except BaseException as exc:
+            pending.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                if pending.result is not None and end_utc <= datetime.utcnow():
+                    self._entries[key] = pending.result
+                    while len(self._entries) > self._max_entries:
+                        self._entries.popitem(last=False)
+            pending.done.set()
+        return pending.result
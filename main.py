@@ -2,8 +2,6 @@ from __future__ import annotations
 
 import argparse
 import builtins
-import time
-from datetime import datetime, timedelta
 
 
 def _safe_console_text(value: str) -> str:
@@ -23,140 +21,107 @@ def safe_print(message: str) -> None:
 print = safe_print
 
 
-def run_cli_tracker() -> None:
-    """Run legacy terminal tracker mode."""
-    from app_rules import AppRulesRepository
-    from config import load_config
-    from notifier import send_notification
-    from storage.db import init_db, insert_event
-    from tracker.active_window import get_active_window_info
-    from tracker.input_tracker import InputActivityTracker
+def _run_engine(verbose: bool, profile: bool = False, memdiag: bool = False) -> None:
+    """Run TrackerEngine in the foreground with console output; no Qt imports."""
+    import signal
 
-    safe_print("=== FocusMeter CLI tracker ===")
+    from config import load_config
+    from ipc_server import TrackerIpcServer
+    from metrics_exporter import MetricsExporter
+    from notifier import get_dispatcher
+    from rules_service import AppRulesService
+    from status_file import StatusFileSink
+    from tracker_engine import ConsoleSink, TrackerEngine
 
     config = load_config()
-    rules_repo = AppRulesRepository(config)
-    rules_repo.apply_to_config(persist=False)
-    init_db(config.db_path)
-
     print(f"[INFO] Database: {config.db_path}")
     print(f"[INFO] Poll interval: {config.poll_interval_seconds}s")
     print(f"[INFO] Idle threshold: {config.idle_threshold_seconds}s")
     print(f"[INFO] Idle reminder: {config.idle_warning_minutes}m")
     print(f"[INFO] Break reminder: {config.break_warning_minutes}m")
-    print("Press Ctrl+C to stop.\n")
-
-    activity_tracker = InputActivityTracker()
-    activity_tracker.start()
 
-    continuous_work_seconds = 0
-    continuous_idle_seconds = 0
+    engine = TrackerEngine(
+        config,
+        rules_service=AppRulesService(config),
+        sinks=[ConsoleSink(printer=safe_print, verbose=verbose)],
+        watch_files=True,
+        profile=profile,
+    )
 
-    last_idle_notification_time: datetime | None = None
-    last_break_notification_time: datetime | None = None
-    last_observed_signature: tuple[str, str] | None = None
+    ipc_server = TrackerIpcServer(engine)
+    if config.ipc_enabled:
+        if ipc_server.start():
+            print(f"[INFO] IPC socket: {ipc_server.path}")
+        else:
+            print(f"[WARN] IPC socket unavailable: {ipc_server.path}")
+
+    status_file = StatusFileSink(engine)
+    if config.status_file_enabled and status_file.start():
+        print(f"[INFO] Status file: {status_file.path}")
+
+    metrics = MetricsExporter(engine, hub=ipc_server.hub)
+    if config.metrics_enabled:
+        if metrics.start():
+            print(f"[INFO] Metrics: {metrics.url}")
+        else:
+            print(f"[WARN] Metrics port {config.metrics_port} unavailable.")
+
+    diagnostics = None
+    if memdiag:
+        from memory_diagnostics import MemoryDiagnostics, format_report
+
+        diagnostics = MemoryDiagnostics(on_report=lambda report: print(format_report(report)))
+        diagnostics.start()
+        print(
+            f"[INFO] Memory diagnostics: report every {diagnostics.interval_seconds:.0f}s "
+            "(tracemalloc slows tracking down)."
+        )
+
+    def _request_stop(signum, frame) -> None:
+        engine.stop()
+
+    signal.signal(signal.SIGINT, _request_stop)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, _request_stop)
 
     try:
-        while True:
-            now = datetime.utcnow()
-
-            last_input_time, inputs_since_last = activity_tracker.consume_stats()
-            idle_seconds = (now - last_input_time).total_seconds()
-            user_active = idle_seconds <= config.idle_threshold_seconds
-
-            window = get_active_window_info()
-            app_name = window.process_name or ""
-            window_title = window.window_title or ""
-            app_name_norm = app_name.lower()
-
-            if app_name_norm:
-                signature = (app_name_norm, window_title)
-                if signature != last_observed_signature:
-                    rules_repo.record_observation(
-                        process_name=app_name_norm,
-                        window_title=window_title,
-                        exe_path=window.exe_path,
-                        observed_at=now,
-                    )
-                    last_observed_signature = signature
-
-            is_work_app = app_name_norm in config.work_apps
-            is_distracting_app = app_name_norm in config.distracting_apps
-
-            insert_event(
-                db_path=config.db_path,
-                timestamp_utc=now,
-                app_name=app_name or "",
-                window_title=window_title or "",
-                is_work_app=is_work_app,
-                is_distracting_app=is_distracting_app,
-                user_active=user_active,
-                idle_seconds=idle_seconds,
-                inputs_since_last=inputs_since_last,
-            )
-
-            if user_active and is_work_app:
-                continuous_work_seconds += config.poll_interval_seconds
-                continuous_idle_seconds = 0
-            elif not user_active:
-                continuous_idle_seconds += config.poll_interval_seconds
-                continuous_work_seconds = 0
-            else:
-                continuous_work_seconds = 0
-
-            safe_print(
-                f"[{now.isoformat()}] "
-                f"active={int(user_active)} idle={int(idle_seconds)}s "
-                f"inputs={inputs_since_last} "
-                f"app={app_name} "
-                f"work={is_work_app} distract={is_distracting_app} "
-                f"title={repr((window_title or '')[:50])}"
-            )
-
-            if (
-                config.notify_on_idle
-                and continuous_idle_seconds >= config.idle_warning_minutes * 60
-            ):
-                need_notify = False
-                if last_idle_notification_time is None:
-                    need_notify = True
-                elif (now - last_idle_notification_time) >= timedelta(minutes=5):
-                    need_notify = True
-
-                if need_notify:
-                    send_notification(
-                        "Looks like you're idle",
-                        "No recent activity detected. Continue work or take a break?",
-                    )
-                    last_idle_notification_time = now
-                    continuous_idle_seconds = 0
-
-            if (
-                config.notify_on_break
-                and continuous_work_seconds >= config.break_warning_minutes * 60
-            ):
-                need_notify = False
-                if last_break_notification_time is None:
-                    need_notify = True
-                elif (now - last_break_notification_time) >= timedelta(minutes=10):
-                    need_notify = True
-
-                if need_notify:
-                    send_notification(
-                        "Time for a break",
-                        "You've been working for a while. Stand up and rest for a few minutes.",
-                    )
-                    last_break_notification_time = now
-                    continuous_work_seconds = 0
-
-            time.sleep(config.poll_interval_seconds)
-    except KeyboardInterrupt:
-        print("\n[INFO] Stopped by Ctrl+C.")
+        engine.run()
     finally:
-        activity_tracker.stop()
+        timing = engine.scheduler.summary()
+        jitter = timing["jitter"]
+        print(
+            f"[INFO] Ticks: {timing['ticks']}, overruns: {timing['overruns']}, "
+            f"missed deadlines: {timing['missed_deadlines']}, "
+            f"jitter p50/p95/max: {jitter['p50_ms']:.1f}/{jitter['p95_ms']:.1f}/"
+            f"{jitter['max_ms']:.1f} ms"
+        )
+        if profile:
+            print("[INFO] Tick phase profile:")
+            print(engine.profiler.format_table())
+        if diagnostics is not None:
+            print("[INFO] Final memory report:")
+            diagnostics.sample_now()
+            diagnostics.stop()
+        metrics.stop()
+        ipc_server.stop()
+        status_file.stop()
+        get_dispatcher().stop()
         print("[INFO] Tracker stopped.")
 
 
+def run_cli_tracker(profile: bool = False, memdiag: bool = False) -> None:
+    """Run terminal tracker mode with a status line per tick."""
+    safe_print("=== FocusMeter CLI tracker ===")
+    print("Press Ctrl+C to stop.\n")
+    _run_engine(verbose=True, profile=profile, memdiag=memdiag)
+
+
+def run_daemon(profile: bool = False, memdiag: bool = False) -> None:
+    """Run headless tracking daemon: logs only state transitions, stops on SIGTERM."""
+    safe_print("=== FocusMeter tracking daemon ===")
+    _run_engine(verbose=False, profile=profile, memdiag=memdiag)
+
+
 def run_gui() -> None:
     """Run Qt desktop GUI mode."""
     from main_gui import main as run_gui_main
@@ -171,13 +136,33 @@ def _build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Run terminal tracker mode instead of desktop GUI.",
     )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run headless tracking daemon (no Qt), logging only state changes.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time each tick phase; print a summary every minute and on exit.",
+    )
+    parser.add_argument(
+        "--memdiag",
+        action="store_true",
+        help=(
+            "With --cli or --daemon: trace allocations and print memory growth by "
+            "module every minute and on exit (the GUI has this on the Diagnostics tab)."
+        ),
+    )
     return parser
 
 
 def main(argv: list[str] | None = None) -> None:
     args = _build_parser().parse_args(argv)
-    if args.cli:
-        run_cli_tracker()
+    if args.daemon:
+        run_daemon(profile=args.profile, memdiag=args.memdiag)
+    elif args.cli:
+        run_cli_tracker(profile=args.profile, memdiag=args.memdiag)
     else:
         run_gui()
 
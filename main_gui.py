@@ -2,24 +2,30 @@ from __future__ import annotations
 
 import platform
 import sys
+import threading
+from collections.abc import Callable
+from dataclasses import replace
 from datetime import datetime, time as dt_time, timedelta
 from pathlib import Path
-from typing import cast
-
-from PyQt5.QtCore import QFileInfo, Qt, QTimer
-from PyQt5.QtGui import QColor, QIcon, QPalette, QPixmap
+from typing import TYPE_CHECKING, cast
+
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import (
+    QColor,
+    QFontDatabase,
+    QPalette,
+    QTextCursor,
+)
 from PyQt5.QtWidgets import (
     QApplication,
     QCheckBox,
     QComboBox,
-    QFileIconProvider,
     QFrame,
     QGridLayout,
     QHBoxLayout,
     QLabel,
     QLineEdit,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QMainWindow,
     QMessageBox,
     QPlainTextEdit,
@@ -32,24 +38,49 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
+from activity_log import (
+    ActivityLog,
+    LOG_DEBUG,
+    LOG_INFO,
+    LOG_LEVEL_LABELS,
+    LOG_WARNING,
+)
+from app_catalog import ROW_ROLE, AppCatalog, AppCatalogModel, CatalogRow, unique_keys
 from app_rules import (
     AppHistoryEntry,
-    AppRulesRepository,
     RULE_DISTRACTING,
     RULE_EXCLUDED,
     RULE_LABELS,
     RULE_NONE,
     RULE_WORK,
 )
-from config import Config, load_config, save_config
+from config import (
+    CONFIG_PATH,
+    Config,
+    config_changes,
+    load_config,
+    read_config,
+    save_config,
+)
+from file_watcher import FileWatcher
 from focus_widget import FocusWidget, format_duration
-from focus_worker import FocusWorker, WorkerSnapshot
-from stats_window import StatsWindow
+from focus_worker import FocusWorker, SnapshotDelta, WorkerSnapshot, format_tick_status
+from icon_cache import IconCache
+from ipc_server import TrackerIpcServer
+from rules_service import AppRulesService, RulesSnapshot
+from stall_watchdog import StallWatchdog
+from status_file import StatusFileSink
 from storage.db import get_time_stats
 from tracker.active_window import WindowInfo, list_open_windows
+from tracker_engine import TrackerEngine
 from window_chrome import build_window_shell, prepare_frameless_window
 from window_chrome import schedule_window_layout_sync
 
+if TYPE_CHECKING:
+    from memory_diagnostics import MemoryDiagnostics
+    from metrics_exporter import MetricsExporter
+    from stats_window import StatsWindow
+
 if platform.system() == "Darwin":
     _UI_FONT_RULE = "font-size: 10pt;"
 elif platform.system() == "Windows":
@@ -57,14 +88,21 @@ elif platform.system() == "Windows":
 else:
     _UI_FONT_RULE = 'font-family: "Noto Sans", "DejaVu Sans", "Arial";\n    font-size: 10pt;'
 
-_IS_MACOS = platform.system() == "Darwin"
-if _IS_MACOS:
-    try:
-        from AppKit import NSWorkspace
-    except ImportError:
-        NSWorkspace = None
-else:
-    NSWorkspace = None
+# Снимки воркера применяются к виджетам не чаще этого интервала.
+UI_REFRESH_INTERVAL_MS = 250
+# Новые строки журнала дописываются в виджет пачкой раз в кадр.
+LOG_FLUSH_INTERVAL_MS = 16
+DIAGNOSTICS_REFRESH_INTERVAL_MS = 1000
+INITIAL_DATA_FALLBACK_MS = 500
+SECTION_RULES = 0
+SECTION_SETTINGS = 1
+SECTION_ACTIVITY = 2
+SECTION_DIAGNOSTICS = 3
+THEME_OPTIONS = (("Темная", "dark"), ("Светлая", "light"), ("Системная", "system"))
+
+APP_SEARCH_DEBOUNCE_MS = 150
+# История приложений не ограничена; столько последних попадает в «Недавние».
+CATALOG_HISTORY_LIMIT = 10_000
 
 
 LIGHT_STYLE_SHEET = """
@@ -255,18 +293,18 @@ QTableWidget {
     gridline-color: rgba(32, 32, 34, 18);
     alternate-background-color: rgba(255, 255, 255, 76);
 }
-QListWidget {
+QListView {
     background: rgba(255, 255, 255, 214);
     border: 1px solid rgba(32, 32, 34, 24);
     border-radius: 14px;
     padding: 6px;
 }
-QListWidget::item {
+QListView::item {
     border-radius: 12px;
     padding: 8px 8px;
     margin: 2px 0;
 }
-QListWidget::item:selected {
+QListView::item:selected {
     background: rgba(21, 21, 23, 18);
     color: #141416;
 }
@@ -489,18 +527,18 @@ QTableWidget {
     gridline-color: rgba(255, 255, 255, 10);
     alternate-background-color: rgba(255, 255, 255, 4);
 }
-QListWidget {
+QListView {
     background: rgba(255, 255, 255, 12);
     border: 1px solid rgba(255, 255, 255, 12);
     border-radius: 14px;
     padding: 6px;
 }
-QListWidget::item {
+QListView::item {
     border-radius: 12px;
     padding: 8px 8px;
     margin: 2px 0;
 }
-QListWidget::item:selected {
+QListView::item:selected {
     background: rgba(255, 255, 255, 10);
     color: #FBFBFD;
 }
@@ -568,7 +606,14 @@ class KpiCard(QFrame):
 
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    # Снимок правил из любого потока; слот всегда выполняется в потоке GUI.
+    rules_changed = pyqtSignal(object)
+
+    def __init__(
+        self,
+        config_path: Path = CONFIG_PATH,
+        engine_factory: Callable[..., TrackerEngine] = TrackerEngine,
+    ):
         super().__init__()
 
         self.setWindowTitle("FocusMeter")
@@ -576,35 +621,104 @@ class MainWindow(QMainWindow):
         self.setMinimumSize(1370, 1100)
         prepare_frameless_window(self)
 
-        self.config: Config = load_config()
-        self.rules_repo = AppRulesRepository(self.config)
+        self.config_path = config_path
+        self.config: Config = load_config(config_path)
+        self.rules_service = AppRulesService(self.config, self.config_path)
+        self.rules_changed.connect(self._on_rules_changed, Qt.ConnectionType.QueuedConnection)
+        self.rules_service.subscribe(self.rules_changed.emit)
+        # Движок живет столько же, сколько окно; поток Qt лишь подключается к нему.
+        # У движка своя копия настроек: окно меняет self.config на месте,
+        # а движку отдает новую копию через notify_config_changed.
+        self.engine = engine_factory(replace(self.config), rules_service=self.rules_service)
+        self.ipc_server = TrackerIpcServer(self.engine)
+        self.status_file = StatusFileSink(self.engine)
+        # Экспортер, диагностика памяти и окно статистики импортируются и
+        # создаются только по требованию: их модули заметно удлиняют запуск.
+        self.metrics_exporter: MetricsExporter | None = None
+        self.memory_diagnostics: MemoryDiagnostics | None = None
+        self.stall_watchdog = StallWatchdog(
+            self.config.stall_threshold_ms, log_path=self.config.stall_log_path or None
+        )
         self.worker: FocusWorker | None = None
         self.stats_window: StatsWindow | None = None
         self.widget_window: FocusWidget | None = None
         self.notify_break_check = QCheckBox()
 
-        self._icon_cache: dict[str, QIcon] = {}
+        self.icon_cache = IconCache(self.config.icon_cache_dir or None, parent=self)
+        self.app_catalog = AppCatalog()
+        self.app_model = AppCatalogModel(self.icon_cache, self)
         self._open_windows: list[WindowInfo] = []
-        self._visible_app_rows: list[dict[str, object]] = []
         self._current_snapshot: WorkerSnapshot | None = None
+        self._pending_snapshot: WorkerSnapshot | None = None
+        self._pending_fields: set[str] = set()
+        self._activity_log = ActivityLog()
+        self._log_min_level = LOG_INFO
         self._worker_paused = False
         self._screen_sync_connected = False
         self._initial_layout_stabilized = False
+        self._initial_data_loaded = False
+        self._initial_data_scheduled = False
+        self._section_builders: dict[int, Callable[[], QWidget]] = {}
+        self._diagnostics_page: QWidget | None = None
+
+        self.log_flush_timer = QTimer(self)
+        self.log_flush_timer.setSingleShot(True)
+        self.log_flush_timer.setInterval(LOG_FLUSH_INTERVAL_MS)
+        self.log_flush_timer.timeout.connect(self._flush_log)
 
         self._init_presets()
         self._build_window()
         self._load_config_to_ui()
-        self._refresh_app_catalog()
-        self._refresh_today_overview()
+        # Каталог открытых окон и сводка за сегодня грузятся после первой
+        # отрисовки (см. paintEvent), чтобы окно появлялось сразу.
+        if self.config.ipc_enabled:
+            if self.ipc_server.start():
+                self.append_log(f"IPC-сокет: {self.ipc_server.path}", LOG_DEBUG)
+            else:
+                self.append_log(
+                    f"IPC-сокет недоступен: {self.ipc_server.path}", LOG_WARNING
+                )
+        if self.config.status_file_enabled and not self.status_file.start():
+            self.append_log(
+                f"Файл статуса недоступен: {self.status_file.path}", LOG_WARNING
+            )
+        if self.config.metrics_enabled:
+            import metrics_exporter
+
+            self.metrics_exporter = metrics_exporter.MetricsExporter(self.engine, hub=self.ipc_server.hub)
+            if self.metrics_exporter.start():
+                self.append_log(f"Метрики: {self.metrics_exporter.url}", LOG_DEBUG)
+            else:
+                self.append_log(
+                    f"Порт метрик {self.config.metrics_port} занят.", LOG_WARNING
+                )
+
+        if self.config.stall_watchdog_enabled:
+            self.stall_watchdog.start()
 
         app = QApplication.instance()
         if app is not None:
             app.aboutToQuit.connect(self._stop_worker_if_running)
+            app.aboutToQuit.connect(self.ipc_server.stop)
+            app.aboutToQuit.connect(self.status_file.stop)
+            app.aboutToQuit.connect(self.stall_watchdog.stop)
+            app.aboutToQuit.connect(self._stop_on_demand_services)
+            app.aboutToQuit.connect(self.icon_cache.close)
 
         self.overview_timer = QTimer(self)
         self.overview_timer.timeout.connect(self._refresh_today_overview)
         self.overview_timer.start(30000)
 
+        self.snapshot_flush_timer = QTimer(self)
+        self.snapshot_flush_timer.setSingleShot(True)
+        self.snapshot_flush_timer.setInterval(UI_REFRESH_INTERVAL_MS)
+        self.snapshot_flush_timer.timeout.connect(self._flush_pending_snapshot)
+
+        self._config_watcher = FileWatcher([self.config_path])
+        self.file_watch_timer = QTimer(self)
+        self.file_watch_timer.timeout.connect(self._poll_external_changes)
+        self.file_watch_timer.start(2000)
+
     def _init_presets(self) -> None:
         self.preset_descriptions = {
             0: "Свободный режим: используйте собственные интервалы и уведомления.",
@@ -869,12 +983,13 @@ class MainWindow(QMainWindow):
         self.section_stack.setObjectName("SectionStack")
 
         self.section_buttons: list[QPushButton] = []
-        sections = [
-            ("Правила", self._build_rules_tab()),
-            ("Настройки", self._build_settings_tab()),
-            ("Активность", self._build_activity_tab()),
+        sections: list[tuple[str, Callable[[], QWidget]]] = [
+            ("Правила", self._build_rules_tab),
+            ("Настройки", self._build_settings_tab),
+            ("Активность", self._build_activity_tab),
+            ("Диагностика", self._build_diagnostics_tab),
         ]
-        for index, (title, page) in enumerate(sections):
+        for index, (title, builder) in enumerate(sections):
             button = QPushButton(title)
             button.setObjectName("SegmentButton")
             button.setCheckable(True)
@@ -884,7 +999,12 @@ class MainWindow(QMainWindow):
             )
             self.section_buttons.append(button)
             bar_layout.addWidget(button)
-            self.section_stack.addWidget(page)
+            # Сразу строится только первая вкладка, остальные — при открытии.
+            if index == SECTION_RULES:
+                self.section_stack.addWidget(builder())
+            else:
+                self.section_stack.addWidget(QWidget())
+                self._section_builders[index] = builder
 
         layout.addWidget(segment_bar)
         layout.addWidget(self.section_stack, 1)
@@ -892,9 +1012,34 @@ class MainWindow(QMainWindow):
         return host
 
     def _set_section(self, index: int) -> None:
+        self._ensure_section(index)
         self.section_stack.setCurrentIndex(index)
         for button_index, button in enumerate(self.section_buttons):
             button.setChecked(button_index == index)
+        # Панель диагностики обновляется, только пока она на экране.
+        if self._diagnostics_page is None:
+            return
+        if self.section_stack.currentWidget() is self._diagnostics_page:
+            self._refresh_diagnostics()
+            self.diagnostics_timer.start()
+        else:
+            self.diagnostics_timer.stop()
+
+    def _section_built(self, index: int) -> bool:
+        return index not in self._section_builders
+
+    def _ensure_section(self, index: int) -> None:
+        builder = self._section_builders.pop(index, None)
+        if builder is None:
+            return
+        placeholder = self.section_stack.widget(index)
+        self.section_stack.insertWidget(index, builder())
+        self.section_stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+        if index == SECTION_SETTINGS:
+            self._load_settings_to_ui()
+        elif index == SECTION_ACTIVITY:
+            self._on_log_level_changed(self.log_level_combo.currentIndex())
 
     def _make_detail_label(self, text: str) -> QLabel:
         label = QLabel(text)
@@ -936,7 +1081,14 @@ class MainWindow(QMainWindow):
         filters.setSpacing(8)
         self.app_search_edit = QLineEdit()
         self.app_search_edit.setPlaceholderText("Поиск по процессу или заголовку окна")
-        self.app_search_edit.textChanged.connect(self._populate_app_table)
+        self.app_search_timer = QTimer(self)
+        self.app_search_timer.setSingleShot(True)
+        self.app_search_timer.setInterval(APP_SEARCH_DEBOUNCE_MS)
+        self.app_search_timer.timeout.connect(self._apply_app_search)
+        self.app_search_edit.textChanged.connect(lambda _text: self.app_search_timer.start())
+        self.app_index_timer = QTimer(self)
+        self.app_index_timer.setInterval(0)
+        self.app_index_timer.timeout.connect(self._build_app_index_step)
         filters.addWidget(self.app_search_edit, 1)
 
         self.app_source_combo = QComboBox()
@@ -967,10 +1119,13 @@ class MainWindow(QMainWindow):
         list_title.setObjectName("SectionEyebrow")
         list_layout.addWidget(list_title)
 
-        self.app_list = QListWidget()
-        self.app_list.setSelectionMode(QListWidget.SelectionMode.SingleSelection)
+        self.app_list = QListView()
+        self.app_list.setModel(self.app_model)
+        self.app_list.setSelectionMode(QListView.SelectionMode.SingleSelection)
+        self.app_list.setUniformItemSizes(True)
+        self.app_list.setLayoutMode(QListView.LayoutMode.Batched)
         self.app_list.setMinimumHeight(0)
-        self.app_list.currentItemChanged.connect(self._update_selection_hint)
+        self.app_list.selectionModel().currentChanged.connect(self._update_selection_hint)
         list_layout.addWidget(self.app_list, 1)
 
         detail_side = QFrame()
@@ -1118,9 +1273,8 @@ class MainWindow(QMainWindow):
         panel_layout.addWidget(subtitle)
 
         self.theme_combo = QComboBox()
-        self.theme_combo.addItem("Темная", "dark")
-        self.theme_combo.addItem("Светлая", "light")
-        self.theme_combo.addItem("Системная", "system")
+        for label, key in THEME_OPTIONS:
+            self.theme_combo.addItem(label, key)
         self.theme_combo.currentIndexChanged.connect(self.on_theme_changed)
 
         self.preset_combo = QComboBox()
@@ -1261,10 +1415,17 @@ class MainWindow(QMainWindow):
         open_widget.clicked.connect(self._toggle_widget_visibility)
         actions.addWidget(open_widget)
         actions.addStretch()
+
+        self.log_level_combo = QComboBox()
+        for level in (LOG_INFO, LOG_DEBUG, LOG_WARNING):
+            self.log_level_combo.addItem(LOG_LEVEL_LABELS[level], level)
+        self.log_level_combo.currentIndexChanged.connect(self._on_log_level_changed)
+        actions.addWidget(self.log_level_combo)
         panel_layout.addLayout(actions)
 
         self.log_edit = QPlainTextEdit()
         self.log_edit.setReadOnly(True)
+        self.log_edit.setMaximumBlockCount(self._activity_log.capacity)
         self.log_edit.setMinimumHeight(0)
         self.log_edit.setSizePolicy(
             QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding
@@ -1274,6 +1435,132 @@ class MainWindow(QMainWindow):
         layout.addWidget(panel, 1)
         return tab
 
+    def _build_diagnostics_tab(self) -> QWidget:
+        tab = QWidget()
+        layout = QVBoxLayout(tab)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        panel = QFrame()
+        panel.setObjectName("ActivityPanel")
+        panel_layout = QVBoxLayout(panel)
+        panel_layout.setContentsMargins(16, 16, 16, 16)
+        panel_layout.setSpacing(10)
+
+        title = QLabel("Диагностика трекера")
+        title.setObjectName("HeroTitle")
+        panel_layout.addWidget(title)
+
+        subtitle = QLabel(
+            "Точность тиков и время каждой фазы цикла трекинга (p50/p95/max за последние 10–20 минут)."
+        )
+        subtitle.setObjectName("SecondaryText")
+        subtitle.setWordWrap(True)
+        panel_layout.addWidget(subtitle)
+
+        self.profile_check = QCheckBox("Замерять фазы тика")
+        self.profile_check.setChecked(self.engine.profiler.enabled)
+        self.profile_check.toggled.connect(self._on_profile_toggled)
+        panel_layout.addWidget(self.profile_check)
+
+        memory_row = QHBoxLayout()
+        memory_row.setSpacing(8)
+        self.memory_check = QCheckBox("Диагностика памяти (tracemalloc)")
+        self.memory_check.toggled.connect(self._on_memory_diagnostics_toggled)
+        memory_row.addWidget(self.memory_check)
+        self.memory_sample_button = QPushButton("Снимок сейчас")
+        self.memory_sample_button.setObjectName("GhostButton")
+        self.memory_sample_button.setEnabled(False)
+        self.memory_sample_button.clicked.connect(self._on_memory_sample_clicked)
+        memory_row.addWidget(self.memory_sample_button)
+        memory_row.addStretch(1)
+        panel_layout.addLayout(memory_row)
+
+        self.diagnostics_view = QPlainTextEdit()
+        self.diagnostics_view.setReadOnly(True)
+        self.diagnostics_view.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.diagnostics_view.setSizePolicy(
+            QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding
+        )
+        panel_layout.addWidget(self.diagnostics_view, 1)
+
+        self.diagnostics_timer = QTimer(self)
+        self.diagnostics_timer.setInterval(DIAGNOSTICS_REFRESH_INTERVAL_MS)
+        self.diagnostics_timer.timeout.connect(self._refresh_diagnostics)
+
+        layout.addWidget(panel, 1)
+        self._diagnostics_page = tab
+        return tab
+
+    def _on_profile_toggled(self, checked: bool) -> None:
+        self.engine.profiler.enabled = checked
+        if checked:
+            self.engine.profiler.reset()
+        self._refresh_diagnostics()
+
+    def _on_memory_diagnostics_toggled(self, checked: bool) -> None:
+        if checked:
+            if self.memory_diagnostics is None:
+                from memory_diagnostics import MemoryDiagnostics
+
+                self.memory_diagnostics = MemoryDiagnostics()
+            self.memory_diagnostics.start()
+            self.append_log("Диагностика памяти включена, замедляет приложение.", LOG_INFO)
+        elif self.memory_diagnostics is not None:
+            self.memory_diagnostics.stop()
+        self.memory_sample_button.setEnabled(checked)
+        self._refresh_diagnostics()
+
+    def _on_memory_sample_clicked(self) -> None:
+        if self.memory_diagnostics is None:
+            return
+        # Выборка обходит все трассы и объекты; в GUI-потоке окно бы замерло.
+        threading.Thread(
+            target=self.memory_diagnostics.sample_now,
+            name="FocusMeterMemorySample",
+            daemon=True,
+        ).start()
+
+    def _refresh_diagnostics(self) -> None:
+        timing = self.engine.scheduler.summary()
+        jitter = timing["jitter"]
+        overrun = timing["overrun"]
+        lines = [
+            f"interval   {timing['interval_seconds']:.2f} s",
+            f"ticks      {timing['ticks']}",
+            f"overruns   {timing['overruns']} (missed deadlines: {timing['missed_deadlines']})",
+            f"jitter     p50={jitter['p50_ms']:.2f} p95={jitter['p95_ms']:.2f} "
+            f"max={jitter['max_ms']:.2f} ms",
+            f"overrun    max={overrun['max_ms']:.2f} ms",
+            "",
+        ]
+        if self.stall_watchdog.running:
+            watchdog = self.stall_watchdog.summary()
+            latency = watchdog["latency"]
+            stalls = watchdog["stalls"]
+            lines += [
+                f"event loop p50={latency['p50_ms']:.2f} p95={latency['p95_ms']:.2f} "
+                f"max={latency['max_ms']:.2f} ms",
+                f"stalls     {stalls['count']} > {watchdog['threshold_ms']:.0f} ms "
+                f"(p95={stalls['p95_ms']:.0f} max={stalls['max_ms']:.0f} ms)",
+                f"stall log  {watchdog['log_path']}",
+                "",
+            ]
+        if self.engine.profiler.enabled:
+            lines.append(self.engine.profiler.format_table())
+        else:
+            lines.append("Замер фаз выключен.")
+        if self.memory_diagnostics is not None and self.memory_diagnostics.running:
+            from memory_diagnostics import format_report
+
+            report = self.memory_diagnostics.latest
+            lines.append("")
+            if report is None:
+                lines.append("Диагностика памяти: ждем первой выборки.")
+            else:
+                lines.append(format_report(report))
+        self.diagnostics_view.setPlainText("\n".join(lines))
+
     def _ensure_widget_window(self) -> FocusWidget:
         if self.widget_window is not None:
             return self.widget_window
@@ -1320,12 +1607,25 @@ class MainWindow(QMainWindow):
                 cfg.idle_warning_minutes = self.preset_configs[index][
                     "idle_warning_minutes"
                 ]
-                save_config(cfg)
+                save_config(cfg, self.config_path)
                 return
 
     def _load_config_to_ui(self) -> None:
         cfg = self.config
         self._upgrade_legacy_preset_config(cfg)
+        if self._section_built(SECTION_SETTINGS):
+            self._load_settings_to_ui()
+        theme_keys = [key for _label, key in THEME_OPTIONS]
+        self.apply_theme(cfg.theme if cfg.theme in theme_keys else theme_keys[0])
+
+        if self.widget_window is not None:
+            self.widget_window.apply_settings(
+                always_on_top=cfg.widget_always_on_top,
+                compact_mode=cfg.widget_compact_mode,
+            )
+
+    def _load_settings_to_ui(self) -> None:
+        cfg = self.config
         self.poll_interval_spin.setValue(cfg.poll_interval_seconds)
         self.idle_threshold_spin.setValue(cfg.idle_threshold_seconds)
         self.idle_warning_spin.setValue(cfg.idle_warning_minutes)
@@ -1347,25 +1647,21 @@ class MainWindow(QMainWindow):
         self.theme_combo.blockSignals(True)
         self.theme_combo.setCurrentIndex(theme_index)
         self.theme_combo.blockSignals(False)
-        self.apply_theme(self._combo_current_data_str(self.theme_combo))
-
-        if self.widget_window is not None:
-            self.widget_window.apply_settings(
-                always_on_top=cfg.widget_always_on_top,
-                compact_mode=cfg.widget_compact_mode,
-            )
 
     def _save_ui_to_config(self) -> None:
-        self.config.poll_interval_seconds = self.poll_interval_spin.value()
-        self.config.idle_threshold_seconds = self.idle_threshold_spin.value()
-        self.config.idle_warning_minutes = self.idle_warning_spin.value()
-        self.config.break_warning_minutes = self.break_warning_spin.value()
-        self.config.notify_on_idle = self.notify_idle_check.isChecked()
-        self.config.notify_on_break = self.notify_break_check.isChecked()
-        self.config.widget_always_on_top = self.widget_always_on_top_check.isChecked()
-        self.config.widget_compact_mode = self.widget_compact_check.isChecked()
-        self.rules_repo.apply_to_config(persist=False)
-        save_config(self.config)
+        # Пока вкладка настроек не открывалась, в config уже актуальные значения.
+        if self._section_built(SECTION_SETTINGS):
+            self.config.poll_interval_seconds = self.poll_interval_spin.value()
+            self.config.idle_threshold_seconds = self.idle_threshold_spin.value()
+            self.config.idle_warning_minutes = self.idle_warning_spin.value()
+            self.config.break_warning_minutes = self.break_warning_spin.value()
+            self.config.notify_on_idle = self.notify_idle_check.isChecked()
+            self.config.notify_on_break = self.notify_break_check.isChecked()
+            self.config.widget_always_on_top = self.widget_always_on_top_check.isChecked()
+            self.config.widget_compact_mode = self.widget_compact_check.isChecked()
+        self.rules_service.apply_to_config(persist=False)
+        save_config(self.config, self.config_path)
+        self.engine.notify_config_changed(replace(self.config))
         if self.widget_window is not None:
             self.widget_window.apply_settings(
                 always_on_top=self.config.widget_always_on_top,
@@ -1387,9 +1683,10 @@ class MainWindow(QMainWindow):
         widget.activateWindow()
 
     def _on_widget_compact_changed(self, value: bool) -> None:
-        self.widget_compact_check.setChecked(value)
+        if self._section_built(SECTION_SETTINGS):
+            self.widget_compact_check.setChecked(value)
         self.config.widget_compact_mode = value
-        save_config(self.config)
+        save_config(self.config, self.config_path)
         if self.widget_window is not None:
             self.widget_window.apply_settings(
                 always_on_top=self.config.widget_always_on_top,
@@ -1397,9 +1694,10 @@ class MainWindow(QMainWindow):
             )
 
     def _on_widget_topmost_changed(self, value: bool) -> None:
-        self.widget_always_on_top_check.setChecked(value)
+        if self._section_built(SECTION_SETTINGS):
+            self.widget_always_on_top_check.setChecked(value)
         self.config.widget_always_on_top = value
-        save_config(self.config)
+        save_config(self.config, self.config_path)
         if self.widget_window is not None:
             self.widget_window.apply_settings(
                 always_on_top=value,
@@ -1464,13 +1762,11 @@ class MainWindow(QMainWindow):
             return
         self.apply_theme(theme_key)
         self.config.theme = theme_key
-        save_config(self.config)
+        save_config(self.config, self.config_path)
         self.append_log(f"Тема интерфейса: {theme_key}")
 
     def on_save_clicked(self) -> None:
         self._save_ui_to_config()
-        if self.worker and self.worker.isRunning():
-            self.worker.reload_rules()
         self.append_log("Настройки сохранены.")
         QMessageBox.information(self, "FocusMeter", "Настройки и правила сохранены.")
 
@@ -1480,14 +1776,13 @@ class MainWindow(QMainWindow):
             return
 
         self._save_ui_to_config()
-        self.rules_repo.reload()
 
-        self.worker = FocusWorker(self.config)
+        self.worker = FocusWorker(self.engine)
         self.worker.status_updated.connect(self.on_worker_status)
         self.worker.started_tracking.connect(self.on_worker_started)
         self.worker.stopped_tracking.connect(self.on_worker_stopped)
         self.worker.paused_changed.connect(self.on_worker_paused_changed)
-        self.worker.snapshot_updated.connect(self.on_worker_snapshot)
+        self.worker.snapshot_changed.connect(self.on_worker_snapshot)
         self.worker.start()
         self.append_log("Запуск трекинга...")
 
@@ -1522,6 +1817,9 @@ class MainWindow(QMainWindow):
         self._set_worker_controls(is_running=False, paused=False)
         if self.widget_window is not None:
             self.widget_window.show_idle_state()
+        self.snapshot_flush_timer.stop()
+        self._pending_snapshot = None
+        self._pending_fields.clear()
         self._current_snapshot = None
         self._update_dashboard_idle_state()
         self._refresh_today_overview()
@@ -1534,39 +1832,59 @@ class MainWindow(QMainWindow):
         if self.widget_window is not None:
             self.widget_window.set_tracking_state(is_running=True, is_paused=is_paused)
 
-    def on_worker_snapshot(self, snapshot: WorkerSnapshot) -> None:
+    def on_worker_snapshot(self, delta: SnapshotDelta) -> None:
+        # Копим изменения и применяем их пачкой не чаще UI_REFRESH_INTERVAL_MS.
+        self._pending_snapshot = delta.snapshot
+        self._pending_fields |= delta.changed
+        if not self.snapshot_flush_timer.isActive():
+            self.snapshot_flush_timer.start()
+
+    def _flush_pending_snapshot(self) -> None:
+        snapshot = self._pending_snapshot
+        if snapshot is None:
+            return
+        changed = frozenset(self._pending_fields)
+        self._pending_snapshot = None
+        self._pending_fields.clear()
         self._current_snapshot = snapshot
-        self.current_app_label.setText(
-            snapshot.app_name or "Не удалось определить приложение"
-        )
-        self.context_label.setText(
-            snapshot.window_title
-            or (
-                "Трекинг поставлен на паузу."
+        self._apply_snapshot(snapshot, changed)
+
+    def _apply_snapshot(self, snapshot: WorkerSnapshot, changed: frozenset[str]) -> None:
+        # В журнал попадают только смены состояния и окна, а не каждый тик.
+        if not changed.isdisjoint({"state", "app_name", "window_title", "paused"}):
+            self.append_log(format_tick_status(snapshot), LOG_DEBUG)
+
+        if "app_name" in changed:
+            self.current_app_label.setText(
+                snapshot.app_name or "Не удалось определить приложение"
+            )
+        if not changed.isdisjoint({"window_title", "paused"}):
+            self.context_label.setText(
+                snapshot.window_title
+                or (
+                    "Трекинг поставлен на паузу."
+                    if snapshot.paused
+                    else "Заголовок окна недоступен."
+                )
+            )
+        if "fatigue_score" in changed:
+            self.timer_label.setText(format_duration(snapshot.fatigue_score))
+        if "paused" in changed:
+            self.timer_hint_label.setText(
+                "Сессия на паузе."
                 if snapshot.paused
-                else "Заголовок окна недоступен."
+                else "Фокус-таймер до следующего перерыва"
+            )
+        if "seconds_to_break" in changed:
+            self.break_eta_label.setText(
+                f"До перерыва: {format_duration(snapshot.seconds_to_break)}"
+            )
+        if "seconds_to_idle_warning" in changed:
+            self.idle_eta_label.setText(
+                f"До возврата: {format_duration(snapshot.seconds_to_idle_warning)}"
             )
-        )
-        self.timer_label.setText(format_duration(snapshot.fatigue_score))
-        self.timer_hint_label.setText(
-            "Сессия на паузе."
-            if snapshot.paused
-            else "Фокус-таймер до следующего перерыва"
-        )
-        self.break_eta_label.setText(
-            f"Перерыв: {format_duration(snapshot.seconds_to_break)}"
-        )
-        self.idle_eta_label.setText(
-            f"Idle: {format_duration(snapshot.seconds_to_idle_warning)}"
-        )
-        self.break_eta_label.setText(
-            f"До перерыва: {format_duration(snapshot.seconds_to_break)}"
-        )
-        self.idle_eta_label.setText(
-            f"До возврата: {format_duration(snapshot.seconds_to_idle_warning)}"
-        )
         if self.widget_window is not None:
-            self.widget_window.update_snapshot(snapshot)
+            self.widget_window.update_snapshot(snapshot, changed)
 
     def _set_worker_controls(self, is_running: bool, paused: bool) -> None:
         self.start_button.setEnabled(not is_running)
@@ -1581,8 +1899,6 @@ class MainWindow(QMainWindow):
         )
         self.timer_label.setText("00:00:00")
         self.timer_hint_label.setText("Фокус-таймер до следующего перерыва")
-        self.break_eta_label.setText("Перерыв: --")
-        self.idle_eta_label.setText("Idle: --")
         self.break_eta_label.setText("До перерыва: --")
         self.idle_eta_label.setText("До возврата: --")
 
@@ -1612,6 +1928,8 @@ class MainWindow(QMainWindow):
 
     def on_open_detailed_stats(self) -> None:
         if self.stats_window is None:
+            from stats_window import StatsWindow
+
             self.stats_window = StatsWindow(self.config, self)
         else:
             self.stats_window.refresh_for_today()
@@ -1620,11 +1938,46 @@ class MainWindow(QMainWindow):
         self.stats_window.activateWindow()
 
     def _refresh_app_catalog(self) -> None:
-        self.rules_repo.reload()
         self._open_windows = list_open_windows(limit=200)
-        self._icon_cache.clear()
+        if not self.rules_service.reload_if_changed():
+            self._populate_app_table()
+            self._update_rule_conflicts()
+
+    def _poll_external_changes(self) -> None:
+        # Правила: подписчик _on_rules_changed перерисует каталог,
+        # воркер увидит новый снимок на следующем тике.
+        if self.rules_service.reload_if_changed():
+            self.append_log("app_rules.json изменен извне, правила перечитаны.")
+
+        if not self._config_watcher.changed():
+            return
+        try:
+            fresh = read_config(self.config_path)
+        except (OSError, ValueError):
+            # Файл мог быть прочитан посреди записи — попробуем на следующем опросе.
+            self._config_watcher.invalidate(self.config_path)
+            return
+
+        if not config_changes(self.config, fresh):
+            return
+        self.config = fresh
+        if self.stats_window is not None:
+            self.stats_window.config = fresh
+        if self.rules_service.replace_config(fresh):
+            self.append_log(f"Правила читаются из {fresh.app_rules_path}.")
+        self._load_config_to_ui()
+        self.engine.notify_config_changed(replace(fresh))
+        self.append_log("config.json изменен извне, настройки применены.")
+
+    def _on_rules_changed(self, snapshot: RulesSnapshot) -> None:
         self._populate_app_table()
         self._update_rule_conflicts()
+        conflicts = snapshot.find_conflicts()
+        if conflicts:
+            self.append_log(
+                "Конфликт правил: " + ", ".join(conflicts[:6]),
+                LOG_WARNING,
+            )
 
     def _history_summary(self, entry: AppHistoryEntry | None) -> str:
         if entry is None:
@@ -1639,250 +1992,98 @@ class MainWindow(QMainWindow):
             last_seen_text = "недавно"
         return f"{entry.seen_count} раз • {last_seen_text}"
 
-    def _build_app_rows(self) -> list[dict[str, object]]:
+    def _build_app_rows(self) -> list[CatalogRow]:
         source = self._combo_current_data_str(self.app_source_combo)
-        rows: list[dict[str, object]] = []
+        rules = self.rules_service.snapshot
+        rows: list[CatalogRow] = []
 
         if source == "open":
             for window in self._open_windows:
                 key = (window.process_name or "").lower()
-                entry = self.rules_repo.state.history.get(key)
+                entry = self.rules_service.get_history_entry(key)
                 rows.append(
-                    {
-                        "process_name": window.process_name or "",
-                        "window_title": window.window_title or "",
-                        "exe_path": window.exe_path or "",
-                        "rule": self.rules_repo.get_rule(key),
-                        "history": self._history_summary(entry),
-                        "favorite": key in self.rules_repo.state.favorites,
-                    }
+                    CatalogRow(
+                        key=f"{key}\n{window.window_title or ''}",
+                        process_name=window.process_name or "",
+                        window_title=window.window_title or "",
+                        exe_path=window.exe_path or "",
+                        rule=rules.get_rule(key),
+                        history=self._history_summary(entry),
+                        favorite=key in rules.favorites,
+                    )
                 )
         elif source in {"recent", "favorites"}:
-            entries = self.rules_repo.get_recent_apps(
-                limit=200,
+            entries = self.rules_service.get_recent_apps(
+                limit=CATALOG_HISTORY_LIMIT,
                 favorites_only=(source == "favorites"),
             )
             for entry in entries:
                 rows.append(
-                    {
-                        "process_name": entry.process_name,
-                        "window_title": entry.window_title,
-                        "exe_path": entry.exe_path,
-                        "rule": self.rules_repo.get_rule(entry.process_name),
-                        "history": self._history_summary(entry),
-                        "favorite": entry.process_name
-                        in self.rules_repo.state.favorites,
-                    }
+                    CatalogRow(
+                        key=entry.process_name,
+                        process_name=entry.process_name,
+                        window_title=entry.window_title,
+                        exe_path=entry.exe_path,
+                        rule=rules.get_rule(entry.process_name),
+                        history=self._history_summary(entry),
+                        favorite=entry.process_name in rules.favorites,
+                    )
                 )
         else:
-            names = (
-                self.rules_repo.state.work_apps
-                | self.rules_repo.state.distracting_apps
-                | self.rules_repo.state.excluded_apps
-            )
-            for process_name in sorted(names):
-                entry = self.rules_repo.state.history.get(process_name)
+            for process_name in sorted(rules.ruled_apps):
+                entry = self.rules_service.get_history_entry(process_name)
                 rows.append(
-                    {
-                        "process_name": process_name,
-                        "window_title": entry.window_title if entry else "",
-                        "exe_path": entry.exe_path if entry else "",
-                        "rule": self.rules_repo.get_rule(process_name),
-                        "history": self._history_summary(entry),
-                        "favorite": process_name in self.rules_repo.state.favorites,
-                    }
+                    CatalogRow(
+                        key=process_name,
+                        process_name=process_name,
+                        window_title=entry.window_title if entry else "",
+                        exe_path=entry.exe_path if entry else "",
+                        rule=rules.get_rule(process_name),
+                        history=self._history_summary(entry),
+                        favorite=process_name in rules.favorites,
+                    )
                 )
+        return unique_keys(rows)
 
-        query = self.app_search_edit.text().strip().lower()
-        if query:
-            rows = [
-                row
-                for row in rows
-                if query in str(row["process_name"]).lower()
-                or query in str(row["window_title"]).lower()
-            ]
-        return rows
-
-    def _icon_for_path(self, exe_path: str, process_name: str = "") -> QIcon:
-        path = (exe_path or "").strip()
-        process_name = (process_name or "").strip()
-
-        cache_key = f"{platform.system()}::{path}::{process_name.lower()}"
-        cached_icon = self._icon_cache.get(cache_key)
-        if cached_icon is not None:
-            return cached_icon
-
-        if _IS_MACOS:
-            icon = self._icon_for_macos(path, process_name)
-        else:
-            provider = QFileIconProvider()
-            if path:
-                icon = provider.icon(QFileInfo(path))
-            else:
-                icon = QIcon()
-
-        self._icon_cache[cache_key] = icon
-        return icon
-
-    @staticmethod
-    def _macos_icon_source(exe_path: str) -> str:
-        """
-        На macOS иконка приложения обычно лежит у .app bundle, а не у бинарника
-        внутри Contents/MacOS. Возвращаем путь к bundle, если можем его вычислить.
-        """
-        candidate = (exe_path or "").strip()
-        if not candidate:
-            return candidate
-
-        path = Path(candidate)
-        parts = path.parts
-        for index, part in enumerate(parts):
-            if part.lower().endswith(".app"):
-                bundle_path = Path(*parts[: index + 1])
-                return str(bundle_path)
-            if part.lower().endswith(".app.bundle"):
-                bundle_like_path = Path(*parts[: index + 1])
-                return str(bundle_like_path)
-
-        return candidate
-
-    @staticmethod
-    def _macos_app_path_by_name(process_name: str) -> str:
-        if not process_name or NSWorkspace is None:
-            return ""
-
-        workspace = NSWorkspace.sharedWorkspace()
-        candidates = [
-            process_name,
-            process_name.title(),
-            process_name.replace("_", " "),
-            process_name.replace("_", " ").title(),
-        ]
-        for candidate in candidates:
-            try:
-                resolved = workspace.fullPathForApplication_(candidate)
-            except Exception:
-                resolved = None
-            if resolved:
-                return str(resolved)
-        return ""
-
-    @staticmethod
-    def _icon_from_nsworkspace(path: str) -> QIcon:
-        if not path or NSWorkspace is None:
-            return QIcon()
-
-        try:
-            ns_icon = NSWorkspace.sharedWorkspace().iconForFile_(path)
-        except Exception:
-            ns_icon = None
-        if ns_icon is None:
-            return QIcon()
-
-        try:
-            tiff_data = ns_icon.TIFFRepresentation()
-        except Exception:
-            tiff_data = None
-        if not tiff_data:
-            return QIcon()
+    def _populate_app_table(self) -> None:
+        self.app_catalog.set_rows(self._build_app_rows())
+        if not self.app_catalog.index_ready:
+            self.app_index_timer.start()
+        self._apply_app_search()
 
-        pixmap = QPixmap()
-        try:
-            raw = bytes(tiff_data)
-        except Exception:
-            raw = b""
-        if not raw:
-            return QIcon()
-        if not pixmap.loadFromData(raw):
-            return QIcon()
-        return QIcon(pixmap)
-
-    def _icon_for_macos(self, exe_path: str, process_name: str) -> QIcon:
-        provider = QFileIconProvider()
-        tried: set[str] = set()
-
-        def icon_for(candidate: str) -> QIcon:
-            candidate = (candidate or "").strip()
-            if not candidate or candidate in tried:
-                return QIcon()
-            tried.add(candidate)
-
-            icon = self._icon_from_nsworkspace(candidate)
-            if not icon.isNull():
-                return icon
-
-            return provider.icon(QFileInfo(candidate))
-
-        bundle_candidate = self._macos_icon_source(exe_path)
-        icon = icon_for(bundle_candidate)
-        if not icon.isNull():
-            return icon
-
-        icon = icon_for(exe_path)
-        if not icon.isNull():
-            return icon
-
-        app_path = self._macos_app_path_by_name(process_name)
-        icon = icon_for(app_path)
-        if not icon.isNull():
-            return icon
-
-        return QIcon()
+    def _build_app_index_step(self) -> None:
+        if self.app_catalog.build_index_step():
+            self.app_index_timer.stop()
 
-    def _populate_app_table(self) -> None:
+    def _apply_app_search(self) -> None:
+        self.app_search_timer.stop()
         previous = self._selected_row_payload()
-        previous_key = ""
-        if previous is not None:
-            previous_key = str(previous["process_name"])
-
-        self._visible_app_rows = self._build_app_rows()
-        self.app_list.clear()
-
-        for row in self._visible_app_rows:
-            rule_label = RULE_LABELS.get(str(row["rule"]), RULE_LABELS[RULE_NONE])
-            favorite_prefix = "★ " if bool(row["favorite"]) else ""
-            title = str(row["window_title"]) or "Без активного заголовка"
-            summary = f"{rule_label} • {row['history']}"
-            item = QListWidgetItem(
-                f"{favorite_prefix}{row['process_name']} · {rule_label}\n{title}"
-            )
-            item.setIcon(
-                self._icon_for_path(
-                    str(row["exe_path"]),
-                    str(row["process_name"]),
-                )
-            )
-            item.setData(Qt.ItemDataRole.UserRole, row)
-            item.setToolTip(f"{title}\n{summary}")
-            self.app_list.addItem(item)
+        self.app_model.set_rows(self.app_catalog.search(self.app_search_edit.text()))
 
-        if self.app_list.count() == 0:
+        if self.app_model.rowCount() == 0:
             self._update_selection_hint()
             return
 
-        target_index = 0
-        for index in range(self.app_list.count()):
-            item = self.app_list.item(index)
-            if item is None:
-                continue
-            payload = cast(dict[str, object], item.data(Qt.ItemDataRole.UserRole))
-            if str(payload["process_name"]) == previous_key:
-                target_index = index
-                break
-
-        self.app_list.setCurrentRow(target_index)
+        target = self.app_model.position_of(previous.key) if previous is not None else -1
+        if target < 0 and previous is not None:
+            # Окно с тем же процессом, но другим заголовком.
+            for position in range(self.app_model.rowCount()):
+                row = self.app_model.row_at(position)
+                if row is not None and row.process_name == previous.process_name:
+                    target = position
+                    break
+        target = max(target, 0)
+        if self.app_list.currentIndex().row() != target:
+            self.app_list.setCurrentIndex(self.app_model.index(target))
         self._update_selection_hint()
 
-    def _selected_row_payload(self) -> dict[str, object] | None:
-        item = self.app_list.currentItem()
-        if item is None:
-            return None
-        return cast(dict[str, object], item.data(Qt.ItemDataRole.UserRole))
+    def _selected_row_payload(self) -> CatalogRow | None:
+        return self.app_model.row_at(self.app_list.currentIndex().row())
 
     def _update_selection_hint(self, current=None, previous=None) -> None:
         del previous
-        if current is not None:
-            payload = cast(dict[str, object], current.data(Qt.ItemDataRole.UserRole))
+        if current is not None and current.isValid():
+            payload = cast(CatalogRow, current.data(ROW_ROLE))
         else:
             payload = self._selected_row_payload()
         if payload is None:
@@ -1899,25 +2100,21 @@ class MainWindow(QMainWindow):
             )
             return
 
-        process_name = str(payload["process_name"])
-        rule = RULE_LABELS.get(str(payload["rule"]), RULE_LABELS[RULE_NONE])
-        favorite = "в избранном" if bool(payload["favorite"]) else "не в избранном"
+        process_name = payload.process_name
+        rule = payload.rule_label
+        favorite = "в избранном" if payload.favorite else "не в избранном"
         self.selected_process_label.setText(process_name or "Без имени")
         self.selected_window_label.setText(
-            str(payload["window_title"]) or "Нет активного заголовка окна."
+            payload.window_title or "Нет активного заголовка окна."
         )
         self.current_rule_label.setText(rule)
-        self.current_history_label.setText(str(payload["history"]))
-        self.current_favorite_label.setText(
-            "Да" if bool(payload["favorite"]) else "Нет"
-        )
+        self.current_history_label.setText(payload.history)
+        self.current_favorite_label.setText("Да" if payload.favorite else "Нет")
         self.favorite_button.setText(
-            "Убрать из избранного"
-            if bool(payload["favorite"])
-            else "Добавить в избранное"
+            "Убрать из избранного" if payload.favorite else "Добавить в избранное"
         )
         self.selection_hint_label.setText(
-            f"{process_name}: {rule}, {payload['history']}, {favorite}."
+            f"{process_name}: {rule}, {payload.history}, {favorite}."
         )
 
     def _set_rule_for_selected(self, rule: str) -> None:
@@ -1926,11 +2123,8 @@ class MainWindow(QMainWindow):
             QMessageBox.information(self, "FocusMeter", "Сначала выберите приложение.")
             return
 
-        process_name = str(payload["process_name"])
-        self.rules_repo.set_rule(process_name, rule)
-        if self.worker and self.worker.isRunning():
-            self.worker.reload_rules()
-        self._refresh_app_catalog()
+        process_name = payload.process_name
+        self.rules_service.set_rule(process_name, rule)
         self.append_log(
             f"Правило для {process_name}: {RULE_LABELS.get(rule, RULE_LABELS[RULE_NONE])}"
         )
@@ -1941,15 +2135,14 @@ class MainWindow(QMainWindow):
             QMessageBox.information(self, "FocusMeter", "Сначала выберите приложение.")
             return
 
-        process_name = str(payload["process_name"])
-        is_favorite = self.rules_repo.toggle_favorite(process_name)
-        self._refresh_app_catalog()
+        process_name = payload.process_name
+        is_favorite = self.rules_service.toggle_favorite(process_name)
         self.append_log(
             f"{process_name} {'добавлено в избранное' if is_favorite else 'убрано из избранного'}."
         )
 
     def _update_rule_conflicts(self) -> None:
-        conflicts = self.rules_repo.find_conflicts()
+        conflicts = self.rules_service.snapshot.find_conflicts()
         if not conflicts:
             self.conflict_label.hide()
             return
@@ -1958,9 +2151,38 @@ class MainWindow(QMainWindow):
         )
         self.conflict_label.show()
 
-    def append_log(self, text: str) -> None:
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_edit.appendPlainText(f"[{timestamp}] {text}")
+    def append_log(self, text: str, level: int = LOG_INFO) -> None:
+        self._activity_log.append(text, level)
+        if not self.log_flush_timer.isActive():
+            self.log_flush_timer.start()
+
+    def _flush_log(self) -> None:
+        # До первого открытия ленты записи копятся в ActivityLog.
+        if not self._section_built(SECTION_ACTIVITY):
+            return
+        records = self._activity_log.drain_pending(self._log_min_level)
+        if records:
+            self.log_edit.appendPlainText(
+                "\n".join(record.format() for record in records)
+            )
+
+    def _on_log_level_changed(self, index: int) -> None:
+        data = self.log_level_combo.itemData(index)
+        self._log_min_level = int(data) if data is not None else LOG_INFO
+        self._activity_log.drain_pending()
+        self.log_edit.setPlainText(
+            "\n".join(
+                record.format()
+                for record in self._activity_log.records(self._log_min_level)
+            )
+        )
+        self.log_edit.moveCursor(QTextCursor.MoveOperation.End)
+
+    def _stop_on_demand_services(self) -> None:
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
+        if self.memory_diagnostics is not None:
+            self.memory_diagnostics.stop()
 
     def _stop_worker_if_running(self) -> None:
         if self.worker and self.worker.isRunning():
@@ -1994,10 +2216,26 @@ class MainWindow(QMainWindow):
             app.quit()
         event.accept()
 
+    def _load_initial_data(self) -> None:
+        if self._initial_data_loaded:
+            return
+        self._initial_data_loaded = True
+        self._refresh_app_catalog()
+        self._refresh_today_overview()
+
+    def paintEvent(self, event) -> None:  # noqa: N802
+        super().paintEvent(event)
+        if not self._initial_data_loaded and not self._initial_data_scheduled:
+            self._initial_data_scheduled = True
+            QTimer.singleShot(0, self._load_initial_data)
+
     def showEvent(self, event) -> None:  # noqa: N802
         super().showEvent(event)
         self._ensure_screen_sync()
         schedule_window_layout_sync(self, 0)
+        if not self._initial_data_loaded:
+            # Обычно загрузку запускает первая отрисовка; это запасной путь.
+            QTimer.singleShot(INITIAL_DATA_FALLBACK_MS, self._load_initial_data)
         if not self._initial_layout_stabilized:
             self._initial_layout_stabilized = True
             QTimer.singleShot(120, self._stabilize_initial_layout)
@@ -0,0 +1,258 @@
+"""
+Диагностика памяти по требованию: tracemalloc запускается только на время
+диагностики, фоновый поток периодически снимает снимок и сравнивает его с
+предыдущим. Аллокация приписывается ближайшему кадру из кода FocusMeter,
+поэтому, например, json внутри app_rules считается за app_rules.
+"""
+
+from __future__ import annotations
+
+import gc
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from config import BASE_DIR
+
+DEFAULT_INTERVAL_SECONDS = 60.0
+DEFAULT_TRACE_FRAMES = 10
+DEFAULT_TOP_SITES = 10
+TRACKED_TYPES = ("WorkerSnapshot", "CatalogRow", "AppUsageRow")
+# Пакеты группируются целиком, остальные модули — по имени файла.
+PACKAGE_GROUPS = ("storage", "tracker", "benchmarks")
+OTHER_GROUP = "other"
+
+Site = tuple[str, int]
+
+
+@dataclass
+class GroupDelta:
+    name: str
+    size: int
+    size_diff: int
+    count: int
+    count_diff: int
+
+
+@dataclass
+class MemoryReport:
+    taken_at: datetime
+    elapsed_seconds: float
+    traced_current: int
+    traced_peak: int
+    groups: list[GroupDelta] = field(default_factory=list)
+    top_sites: list[tuple[Site, int, int]] = field(default_factory=list)
+    live_objects: dict[str, tuple[int, int]] = field(default_factory=dict)
+    sample_seconds: float = 0.0
+
+
+def _kib(value: int) -> str:
+    return f"{value / 1024:+.1f}" if value else "0.0"
+
+
+def format_report(report: MemoryReport) -> str:
+    lines = [
+        f"memory diagnostics at {report.taken_at.isoformat(timespec='seconds')} "
+        f"(+{report.elapsed_seconds:.0f} s, sampled in {report.sample_seconds * 1000:.0f} ms)",
+        f"traced {report.traced_current / 1024:.1f} KiB, peak {report.traced_peak / 1024:.1f} KiB",
+        "",
+        f"{'module':<18}{'KiB':>10}{'diff KiB':>10}{'blocks':>9}{'diff':>8}",
+    ]
+    for group in report.groups:
+        lines.append(
+            f"{group.name:<18}{group.size / 1024:>10.1f}{_kib(group.size_diff):>10}"
+            f"{group.count:>9}{group.count_diff:>+8}"
+        )
+    lines += ["", "top growing sites (KiB, blocks):"]
+    if not report.top_sites:
+        lines.append("  none")
+    for (filename, lineno), size_diff, count_diff in report.top_sites:
+        lines.append(f"  {_kib(size_diff):>9} {count_diff:>+7}  {filename}:{lineno}")
+    lines += ["", "live objects:"]
+    for name, (count, diff) in report.live_objects.items():
+        lines.append(f"  {name:<18}{count:>8}{diff:>+8}")
+    return "\n".join(lines)
+
+
+class MemoryDiagnostics:
+    """
+    start() включает tracemalloc (если его не запустил кто-то другой) и
+    поток выборок; каждый отчет уходит в on_report и остается в latest.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = DEFAULT_INTERVAL_SECONDS,
+        frames: int = DEFAULT_TRACE_FRAMES,
+        top: int = DEFAULT_TOP_SITES,
+        tracked_types: Iterable[str] = TRACKED_TYPES,
+        on_report: Callable[[MemoryReport], None] | None = None,
+        root: Path = BASE_DIR,
+    ):
+        self.interval_seconds = max(1.0, interval_seconds)
+        self.frames = max(1, frames)
+        self.top = top
+        self.tracked_types = tuple(tracked_types)
+        self.on_report = on_report
+        self.latest: MemoryReport | None = None
+        self._root = str(root.resolve())
+        self._groups_by_file: dict[str, str | None] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._owns_tracing = False
+        self._started = 0.0
+        self._previous_groups: dict[str, tuple[int, int]] = {}
+        self._previous_sites: dict[Site, tuple[int, int]] = {}
+        self._previous_objects: dict[str, int] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owns_tracing = True
+        self._started = time.monotonic()
+        # Первая выборка — база: в ней растет все, что успело выделиться.
+        with self._lock:
+            self._collect()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="FocusMeterMemoryDiagnostics", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5.0)
+        self._thread = None
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+        self._previous_groups.clear()
+        self._previous_sites.clear()
+        self._previous_objects.clear()
+
+    def sample_now(self) -> MemoryReport | None:
+        """Внеочередная выборка, например по кнопке; None, если не запущено."""
+        if self._thread is None:
+            return None
+        with self._lock:
+            report = self._collect()
+        self._publish(report)
+        return report
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            with self._lock:
+                if self._stop.is_set():
+                    return
+                report = self._collect()
+            self._publish(report)
+
+    def _publish(self, report: MemoryReport) -> None:
+        self.latest = report
+        if self.on_report is not None:
+            self.on_report(report)
+
+    def _group_for(self, filename: str) -> str | None:
+        group = self._groups_by_file.get(filename, "")
+        if group != "":
+            return group
+        group = None
+        path = Path(filename)
+        if path.is_absolute() and filename.startswith(self._root):
+            parts = path.relative_to(self._root).parts
+            if len(parts) > 1 and parts[0] in PACKAGE_GROUPS:
+                group = parts[0]
+            elif len(parts) == 1 and path.suffix == ".py":
+                group = path.stem
+        self._groups_by_file[filename] = group
+        return group
+
+    def _collect(self) -> MemoryReport:
+        started = time.perf_counter()
+        gc.collect()
+        # Свои словари выборки в отчете не нужны: трассы, прошедшие через
+        # этот модуль, отбрасываются.
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, __file__, all_frames=True),)
+        )
+        traced_current, traced_peak = tracemalloc.get_traced_memory()
+
+        groups: dict[str, list[int]] = {}
+        sites: dict[Site, list[int]] = {}
+        group_for = self._group_for
+        for trace in snapshot.traces:
+            group = OTHER_GROUP
+            site: Site | None = None
+            # Кадры идут от внешнего к внутреннему; ищем самый внутренний свой.
+            for frame in reversed(trace.traceback):
+                own = group_for(frame.filename)
+                if own is not None:
+                    group = own
+                    site = (frame.filename, frame.lineno)
+                    break
+            totals = groups.setdefault(group, [0, 0])
+            totals[0] += trace.size
+            totals[1] += 1
+            if site is not None:
+                totals = sites.setdefault(site, [0, 0])
+                totals[0] += trace.size
+                totals[1] += 1
+        del snapshot
+
+        group_rows = []
+        for name, (size, count) in groups.items():
+            old_size, old_count = self._previous_groups.get(name, (0, 0))
+            group_rows.append(GroupDelta(name, size, size - old_size, count, count - old_count))
+        group_rows.sort(key=lambda row: (-row.size_diff, row.name))
+
+        site_rows = []
+        for site, (size, count) in sites.items():
+            old_size, old_count = self._previous_sites.get(site, (0, 0))
+            if size > old_size:
+                site_rows.append((self._relative(site), size - old_size, count - old_count))
+        site_rows.sort(key=lambda row: -row[1])
+
+        live = self._count_objects()
+        live_objects = {
+            name: (count, count - self._previous_objects.get(name, count))
+            for name, count in live.items()
+        }
+
+        self._previous_groups = {name: (size, count) for name, (size, count) in groups.items()}
+        self._previous_sites = {site: (size, count) for site, (size, count) in sites.items()}
+        self._previous_objects = live
+        return MemoryReport(
+            taken_at=datetime.now(),
+            elapsed_seconds=time.monotonic() - self._started,
+            traced_current=traced_current,
+            traced_peak=traced_peak,
+            groups=group_rows,
+            top_sites=site_rows[: self.top],
+            live_objects=live_objects,
+            sample_seconds=time.perf_counter() - started,
+        )
+
+    def _relative(self, site: Site) -> Site:
+        filename, lineno = site
+        return str(Path(filename).relative_to(self._root)), lineno
+
+    def _count_objects(self) -> dict[str, int]:
+        counts = dict.fromkeys(self.tracked_types, 0)
+        for obj in gc.get_objects():
+            name = type(obj).__name__
+            if name in counts:
+                counts[name] += 1
+        return counts
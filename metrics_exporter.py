@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from histogram import LatencyHistogram
+from snapshot_stream import SnapshotHub
+from tracker_engine import TrackerEngine
+
+METRICS_HOST = "127.0.0.1"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+TRACKER_STATES = ("work", "distract", "other", "excluded", "idle", "paused")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _MetricsWriter:
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+
+    def metric(self, kind: str, name: str, help_text: str, value: float) -> None:
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        self.lines.append(f"{name} {_format_value(value)}")
+
+    def labeled(
+        self,
+        kind: str,
+        name: str,
+        help_text: str,
+        samples: list[tuple[dict[str, str], float]],
+    ) -> None:
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            rendered = ",".join(f'{key}="{item}"' for key, item in labels.items())
+            self.lines.append(f"{name}{{{rendered}}} {_format_value(value)}")
+
+    def histogram(self, name: str, help_text: str, histogram: LatencyHistogram) -> None:
+        buckets, count, total_ms = histogram.export()
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} histogram")
+        cumulative = 0
+        for bound_ms, bucket in buckets:
+            cumulative += bucket
+            bound = bound_ms / 1000 if bound_ms != float("inf") else bound_ms
+            self.lines.append(f'{name}_bucket{{le="{_format_value(bound)}"}} {cumulative}')
+        self.lines.append(f"{name}_sum {_format_value(total_ms / 1000)}")
+        self.lines.append(f"{name}_count {count}")
+
+    def render(self) -> bytes:
+        return ("\n".join(self.lines) + "\n").encode("utf-8")
+
+
+def render_metrics(engine: TrackerEngine, hub: SnapshotHub | None = None) -> bytes:
+    """
+    Текст в формате Prometheus из уже посчитанных счетчиков и гистограмм.
+    Ни БД, ни поток трекера здесь не трогаются.
+    """
+    out = _MetricsWriter()
+    scheduler = engine.scheduler.stats
+
+    out.metric("gauge", "focusmeter_running", "1 while the tracker loop runs.", engine.is_running)
+    snapshot = engine.last_snapshot
+    current_state = snapshot.state if (snapshot is not None and engine.is_running) else ""
+    out.labeled(
+        "gauge",
+        "focusmeter_state",
+        "Current tracker state (1 for the active state).",
+        [({"state": state}, state == current_state) for state in TRACKER_STATES],
+    )
+    if snapshot is not None:
+        out.metric(
+            "gauge",
+            "focusmeter_fatigue_seconds",
+            "Accumulated fatigue score.",
+            snapshot.fatigue_score,
+        )
+        out.metric(
+            "gauge",
+            "focusmeter_seconds_to_break",
+            "Seconds left until the break reminder.",
+            snapshot.seconds_to_break,
+        )
+
+    active_seconds, work_seconds = engine.today.headline()
+    out.metric("gauge", "focusmeter_today_active_seconds", "Active time today.", active_seconds)
+    out.metric("gauge", "focusmeter_today_work_seconds", "Work-app time today.", work_seconds)
+
+    out.metric("counter", "focusmeter_ticks_total", "Tracker ticks executed.", scheduler.ticks)
+    out.metric(
+        "counter",
+        "focusmeter_tick_overruns_total",
+        "Ticks that started one or more intervals late.",
+        scheduler.overruns,
+    )
+    out.metric(
+        "counter",
+        "focusmeter_missed_deadlines_total",
+        "Tick deadlines skipped because of overruns.",
+        scheduler.missed_deadlines,
+    )
+    out.histogram(
+        "focusmeter_tick_duration_seconds",
+        "Wall time of one tracker tick.",
+        engine.tick_duration,
+    )
+    out.histogram(
+        "focusmeter_tick_jitter_seconds",
+        "Delay between the tick deadline and its start.",
+        engine.scheduler.jitter,
+    )
+    out.histogram(
+        "focusmeter_db_write_duration_seconds",
+        "Wall time of one insert_event call.",
+        engine.db_write_duration,
+    )
+
+    rules = engine.rules_service
+    out.metric("gauge", "focusmeter_rules_version", "Published rules snapshot version.", rules.version)
+    out.metric(
+        "counter",
+        "focusmeter_rules_reloads_total",
+        "app_rules.json reloads.",
+        rules.reload_count,
+    )
+    cache = rules.snapshot.classifier.cache_info()
+    out.metric(
+        "counter",
+        "focusmeter_classifier_cache_hits_total",
+        "Classifier cache hits (current rules version).",
+        cache.hits,
+    )
+    out.metric(
+        "counter",
+        "focusmeter_classifier_cache_misses_total",
+        "Classifier cache misses (current rules version).",
+        cache.misses,
+    )
+    out.metric(
+        "counter",
+        "focusmeter_stats_cache_hits_total",
+        "Range statistics served from cache.",
+        engine.range_cache.hits,
+    )
+    out.metric(
+        "counter",
+        "focusmeter_stats_cache_misses_total",
+        "Range statistics computed from SQLite.",
+        engine.range_cache.misses,
+    )
+
+    notifier = engine.notifier
+    stats = notifier.stats()
+    out.labeled(
+        "counter",
+        "focusmeter_notifications_total",
+        "Notifications by outcome.",
+        [
+            ({"outcome": "submitted"}, stats.submitted),
+            ({"outcome": "delivered"}, stats.delivered),
+            ({"outcome": "coalesced"}, stats.coalesced),
+            ({"outcome": "rate_limited"}, stats.rate_limited),
+            ({"outcome": "dropped"}, stats.dropped),
+            ({"outcome": "failed"}, stats.failed),
+        ],
+    )
+    out.labeled(
+        "gauge",
+        "focusmeter_queue_depth",
+        "Items waiting in internal queues.",
+        [
+            ({"queue": "notifications"}, notifier.queue_depth()),
+            ({"queue": "subscribers"}, hub.pending_total() if hub is not None else 0),
+        ],
+    )
+    if hub is not None:
+        out.metric(
+            "gauge",
+            "focusmeter_stream_subscribers",
+            "Connected snapshot stream subscribers.",
+            hub.subscriber_count(),
+        )
+        out.metric(
+            "counter",
+            "focusmeter_stream_dropped_total",
+            "Stream subscribers dropped for not reading.",
+            hub.dropped,
+        )
+    return out.render()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    server: _MetricsServer
+
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_metrics(self.server.engine, self.server.hub)
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        pass
+
+
+class _MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int, engine: TrackerEngine, hub: SnapshotHub | None):
+        self.engine = engine
+        self.hub = hub
+        super().__init__((METRICS_HOST, port), _MetricsHandler)
+
+
+class MetricsExporter:
+    """HTTP /metrics на localhost в отдельном потоке; включается в Config."""
+
+    def __init__(
+        self,
+        engine: TrackerEngine,
+        hub: SnapshotHub | None = None,
+        port: int | None = None,
+    ):
+        self.engine = engine
+        self.hub = hub
+        self.port = engine.config.metrics_port if port is None else port
+        self._server: _MetricsServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{METRICS_HOST}:{self.port}/metrics"
+
+    def start(self) -> bool:
+        if self._server is not None:
+            return True
+        try:
+            server = _MetricsServer(self.port, self.engine, self.hub)
+        except OSError:
+            return False
+        self.port = server.server_address[1]
+        self._server = server
+        self._thread = threading.Thread(
+            target=server.serve_forever,
+            kwargs={"poll_interval": 0.5},
+            name="FocusMeterMetrics",
+            daemon=True,
+        )
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        server = self._server
+        if server is None:
+            return
+        self._server = None
+        server.shutdown()
+        server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
@@ -1,7 +1,11 @@
 # notifier.py
 
+import queue
+import threading
+import time
+from dataclasses import dataclass, replace
 from datetime import datetime
-from typing import Any, cast
+from typing import Any, Callable, Optional, cast
 
 try:
     from plyer import notification
@@ -11,17 +15,26 @@ except ImportError:
     PLYER_AVAILABLE = False
     print("[NOTIFIER] plyer не установлен, буду только печатать уведомления в консоль.")
 
+NOTIFY_IDLE = "idle"
+NOTIFY_BREAK = "break"
 
-def send_notification(title: str, message: str):
+DEFAULT_MIN_INTERVALS = {
+    NOTIFY_IDLE: 30.0,
+    NOTIFY_BREAK: 30.0,
+}
+
+
+def send_notification(title: str, message: str) -> bool:
     """
     Отправляет системное уведомление (если возможно) + печатает в консоль.
+    False — если системное уведомление показать не удалось.
     """
     ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{ts}] NOTIFY: {title} — {message}")
 
     notifier_backend = notification
     if not PLYER_AVAILABLE or notifier_backend is None:
-        return
+        return True
 
     try:
         cast(Any, notifier_backend).notify(
@@ -32,3 +45,167 @@ def send_notification(title: str, message: str):
         )
     except Exception as e:
         print(f"[NOTIFIER ERROR] {e}")
+        return False
+    return True
+
+
+@dataclass
+class NotificationStats:
+    submitted: int = 0
+    delivered: int = 0
+    coalesced: int = 0
+    rate_limited: int = 0
+    dropped: int = 0
+    failed: int = 0
+    last_latency_seconds: float = 0.0
+    max_latency_seconds: float = 0.0
+    total_latency_seconds: float = 0.0
+
+    @property
+    def mean_latency_seconds(self) -> float:
+        return self.total_latency_seconds / self.delivered if self.delivered else 0.0
+
+
+class NotificationDispatcher:
+    """
+    Доставляет уведомления в отдельном потоке, чтобы цикл трекера только
+    ставил их в очередь и никогда не ждал D-Bus/подпроцессы plyer.
+
+    - очередь ограничена: при переполнении уведомление отбрасывается;
+    - пока уведомление какого-то вида ждет доставки, такие же склеиваются;
+    - для каждого вида есть минимальный интервал между уведомлениями.
+
+    deliver сообщает о неудаче, возвращая False или бросая исключение;
+    None считается успехом.
+    """
+
+    def __init__(
+        self,
+        deliver: Callable[[str, str], Optional[bool]] = send_notification,
+        max_queue: int = 16,
+        min_intervals: Optional[dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._deliver = deliver
+        self._clock = clock
+        self._min_intervals = dict(
+            DEFAULT_MIN_INTERVALS if min_intervals is None else min_intervals
+        )
+        self._queue: "queue.Queue[Optional[tuple[str, str, str, float]]]" = queue.Queue(
+            maxsize=max_queue
+        )
+        self._lock = threading.Lock()
+        self._pending: set[str] = set()
+        self._last_accepted: dict[str, float] = {}
+        self._stats = NotificationStats()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        # Пока жив прежний поток (в том числе после stop() по таймауту),
+        # второй не запускается: у очереди всегда один потребитель.
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name="FocusMeterNotifier",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 2.0) -> None:
+        thread = self._thread
+        if thread is None:
+            return
+        if not thread.is_alive():
+            # Маркер остановки уже съеден: второй остановил бы новый поток.
+            with self._lock:
+                if self._thread is thread:
+                    self._thread = None
+            return
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        thread.join(timeout)
+        with self._lock:
+            if self._thread is thread and not thread.is_alive():
+                self._thread = None
+
+    def submit(self, kind: str, title: str, message: str) -> bool:
+        """Ставит уведомление в очередь, не блокируясь. True — если принято."""
+        now = self._clock()
+        with self._lock:
+            self._stats.submitted += 1
+            if kind in self._pending:
+                self._stats.coalesced += 1
+                return False
+
+            last = self._last_accepted.get(kind)
+            min_interval = self._min_intervals.get(kind, 0.0)
+            if last is not None and now - last < min_interval:
+                self._stats.rate_limited += 1
+                return False
+
+            try:
+                self._queue.put_nowait((kind, title, message, now))
+            except queue.Full:
+                self._stats.dropped += 1
+                return False
+
+            self._pending.add(kind)
+            self._last_accepted[kind] = now
+
+        self.start()
+        return True
+
+    def stats(self) -> NotificationStats:
+        with self._lock:
+            return replace(self._stats)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            kind, title, message, submitted_at = item
+            failed = False
+            try:
+                failed = self._deliver(title, message) is False
+            except Exception as e:
+                failed = True
+                print(f"[NOTIFIER ERROR] {e}")
+
+            latency = max(self._clock() - submitted_at, 0.0)
+            with self._lock:
+                self._pending.discard(kind)
+                if failed:
+                    self._stats.failed += 1
+                    continue
+                self._stats.delivered += 1
+                self._stats.last_latency_seconds = latency
+                self._stats.max_latency_seconds = max(
+                    self._stats.max_latency_seconds, latency
+                )
+                self._stats.total_latency_seconds += latency
+
+
+_dispatcher: Optional[NotificationDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> NotificationDispatcher:
+    """Общий для процесса диспетчер уведомлений."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = NotificationDispatcher()
+        return _dispatcher
+
+
+def notify_async(kind: str, title: str, message: str) -> bool:
+    return get_dispatcher().submit(kind, title, message)
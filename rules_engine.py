@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import fnmatch
+import re
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from functools import lru_cache
+
+RULE_WORK = "work"
+RULE_DISTRACTING = "distracting"
+RULE_EXCLUDED = "excluded"
+RULE_NONE = "none"
+RULES = (RULE_WORK, RULE_DISTRACTING, RULE_EXCLUDED, RULE_NONE)
+
+SYNTAX_GLOB = "glob"
+SYNTAX_REGEX = "regex"
+
+FIELD_PROCESS = "process"
+FIELD_EXE_PATH = "exe_path"
+FIELD_TITLE = "title"
+PATTERN_FIELDS = (FIELD_PROCESS, FIELD_EXE_PATH, FIELD_TITLE)
+
+_GLOB_MAGIC = re.compile(r"[*?\[]")
+
+
+@dataclass(frozen=True)
+class PatternRule:
+    """
+    Правило по шаблону: все непустые поля должны совпасть одновременно.
+
+    glob сравнивается с полным значением поля, regex ищется в любом месте.
+    Регистр не учитывается. При нескольких совпадениях побеждает
+    наибольший priority, затем правило, объявленное раньше.
+    """
+
+    rule: str
+    process: str = ""
+    exe_path: str = ""
+    title: str = ""
+    syntax: str = SYNTAX_GLOB
+    priority: int = 0
+
+    def field_patterns(self) -> dict[str, str]:
+        values = {
+            FIELD_PROCESS: self.process,
+            FIELD_EXE_PATH: self.exe_path,
+            FIELD_TITLE: self.title,
+        }
+        return {name: value for name, value in values.items() if value}
+
+    def to_dict(self) -> dict[str, object]:
+        payload: dict[str, object] = {"rule": self.rule}
+        payload.update(self.field_patterns())
+        payload["syntax"] = self.syntax
+        payload["priority"] = self.priority
+        return payload
+
+    @classmethod
+    def from_dict(cls, payload: Mapping[str, object]) -> PatternRule | None:
+        rule = str(payload.get("rule") or "").strip().lower()
+        syntax = str(payload.get("syntax") or SYNTAX_GLOB).strip().lower()
+        if rule not in RULES or syntax not in {SYNTAX_GLOB, SYNTAX_REGEX}:
+            return None
+
+        try:
+            priority = int(payload.get("priority", 0) or 0)  # type: ignore[arg-type]
+        except (TypeError, ValueError):
+            priority = 0
+
+        item = cls(
+            rule=rule,
+            process=str(payload.get("process") or "").strip(),
+            exe_path=str(payload.get("exe_path") or "").strip(),
+            title=str(payload.get("title") or "").strip(),
+            syntax=syntax,
+            priority=priority,
+        )
+        if not item.field_patterns():
+            return None
+        if syntax == SYNTAX_REGEX:
+            try:
+                for value in item.field_patterns().values():
+                    re.compile(value)
+            except re.error:
+                return None
+        return item
+
+
+def _pattern_to_regex(pattern: str, syntax: str) -> str:
+    if syntax == SYNTAX_REGEX:
+        return pattern
+    return r"\A" + fnmatch.translate(pattern)
+
+
+def _compiles_grouped(source: str) -> bool:
+    try:
+        re.compile(f"(?:{source})", re.IGNORECASE)
+    except re.error:
+        return False
+    return True
+
+
+class _FieldMatcher:
+    """
+    Все шаблоны одного поля: литералы без glob-символов ищутся по словарю,
+    остальные склеены в одну регулярку, которая отсекает промахи за один
+    проход. Отдельные шаблоны проверяются только после попадания.
+
+    В склейку попадают только шаблоны без групп, которые компилируются
+    внутри (?:...): глобальные флаги вроде (?i) в середине выражения
+    запрещены, одинаковые имена групп конфликтуют, а \\1 второго шаблона
+    указывал бы на группу первого. Такие шаблоны проверяются по одному.
+    """
+
+    def __init__(self) -> None:
+        self._literals: dict[str, set[int]] = {}
+        self._patterns: dict[str, tuple[re.Pattern[str], set[int]]] = {}
+        self._combined: re.Pattern[str] | None = None
+        self._filtered: list[tuple[re.Pattern[str], set[int]]] = []
+        self._unfiltered: list[tuple[re.Pattern[str], set[int]]] = []
+
+    def add(self, rule_index: int, pattern: str, syntax: str) -> None:
+        if syntax == SYNTAX_GLOB and not _GLOB_MAGIC.search(pattern):
+            self._literals.setdefault(pattern.lower(), set()).add(rule_index)
+            return
+
+        source = _pattern_to_regex(pattern, syntax)
+        entry = self._patterns.get(source)
+        if entry is None:
+            entry = (re.compile(source, re.IGNORECASE), set())
+            self._patterns[source] = entry
+        entry[1].add(rule_index)
+
+    def compile(self) -> None:
+        sources: list[str] = []
+        for source, entry in self._patterns.items():
+            if entry[0].groups == 0 and _compiles_grouped(source):
+                sources.append(source)
+                self._filtered.append(entry)
+            else:
+                self._unfiltered.append(entry)
+        if not sources:
+            return
+        try:
+            self._combined = re.compile(
+                "|".join(f"(?:{source})" for source in sources),
+                re.IGNORECASE,
+            )
+        except re.error:
+            self._combined = None
+            self._unfiltered.extend(self._filtered)
+            self._filtered = []
+
+    def matching_rules(self, value: str) -> set[int]:
+        matched = set(self._literals.get(value.lower(), ()))
+        if self._combined is not None and self._combined.search(value):
+            for compiled, indices in self._filtered:
+                if compiled.search(value):
+                    matched |= indices
+        for compiled, indices in self._unfiltered:
+            if compiled.search(value):
+                matched |= indices
+        return matched
+
+
+class RulesClassifier:
+    """
+    Неизменяемый классификатор окна: сначала шаблонные правила,
+    затем точные имена процессов. Результат кешируется по
+    (process, title, exe_path), так что в установившемся режиме
+    классификация сводится к поиску в словаре.
+    """
+
+    def __init__(
+        self,
+        exact: Mapping[str, str],
+        patterns: Iterable[PatternRule] = (),
+        default: str = "",
+        cache_size: int = 4096,
+    ) -> None:
+        self._exact = dict(exact)
+        self._default = default
+        self._patterns = tuple(patterns)
+
+        ordered = sorted(
+            range(len(self._patterns)),
+            key=lambda index: (-self._patterns[index].priority, index),
+        )
+        self._order = tuple(ordered)
+        self._required = tuple(
+            frozenset(self._patterns[index].field_patterns())
+            for index in range(len(self._patterns))
+        )
+
+        self._fields: dict[str, _FieldMatcher] = {}
+        for index, item in enumerate(self._patterns):
+            for field_name, pattern in item.field_patterns().items():
+                matcher = self._fields.get(field_name)
+                if matcher is None:
+                    matcher = _FieldMatcher()
+                    self._fields[field_name] = matcher
+                matcher.add(index, pattern, item.syntax)
+        for matcher in self._fields.values():
+            matcher.compile()
+
+        self.classify = lru_cache(maxsize=cache_size)(self._classify_uncached)
+
+    @property
+    def patterns(self) -> tuple[PatternRule, ...]:
+        return self._patterns
+
+    def cache_info(self):
+        return self.classify.cache_info()
+
+    def _match_patterns(self, process: str, title: str, exe_path: str) -> str | None:
+        if not self._patterns:
+            return None
+
+        values = {
+            FIELD_PROCESS: process,
+            FIELD_EXE_PATH: exe_path,
+            FIELD_TITLE: title,
+        }
+        matched_fields: dict[int, int] = {}
+        for field_name, matcher in self._fields.items():
+            value = values[field_name]
+            if not value:
+                continue
+            for index in matcher.matching_rules(value):
+                matched_fields[index] = matched_fields.get(index, 0) + 1
+
+        if not matched_fields:
+            return None
+
+        for index in self._order:
+            hits = matched_fields.get(index)
+            if hits is not None and hits == len(self._required[index]):
+                return self._patterns[index].rule
+        return None
+
+    def _classify_uncached(
+        self,
+        process: str,
+        title: str = "",
+        exe_path: str = "",
+    ) -> str:
+        key = (process or "").strip().lower()
+        rule = self._match_patterns(key, title or "", exe_path or "")
+        if rule is not None:
+            return rule
+        return self._exact.get(key, self._default)
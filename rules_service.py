@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+
+from app_rules import (
+    AppHistoryEntry,
+    AppRulesRepository,
+    RULE_DISTRACTING,
+    RULE_EXCLUDED,
+    RULE_NONE,
+    RULE_WORK,
+    normalize_process_name,
+)
+from config import CONFIG_PATH, Config
+from rules_engine import PatternRule, RulesClassifier
+
+RulesSubscriber = Callable[["RulesSnapshot"], None]
+
+
+@dataclass(frozen=True)
+class RulesSnapshot:
+    """
+    Неизменяемый срез правил. Потоки держат ссылку на снимок и читают его
+    без блокировок; любое изменение публикует новый снимок с новой версией.
+    """
+
+    version: int
+    work_apps: frozenset[str]
+    distracting_apps: frozenset[str]
+    excluded_apps: frozenset[str]
+    favorites: frozenset[str]
+    patterns: tuple[PatternRule, ...]
+    classifier: RulesClassifier = field(compare=False, repr=False)
+
+    def get_rule(self, process_name: str) -> str:
+        key = normalize_process_name(process_name)
+        if not key:
+            return RULE_NONE
+        if key in self.work_apps:
+            return RULE_WORK
+        if key in self.distracting_apps:
+            return RULE_DISTRACTING
+        if key in self.excluded_apps:
+            return RULE_EXCLUDED
+        return RULE_NONE
+
+    def classify(
+        self,
+        process_name: str,
+        window_title: str = "",
+        exe_path: str = "",
+    ) -> str:
+        key = normalize_process_name(process_name)
+        if not key and not window_title and not exe_path:
+            return RULE_NONE
+        return self.classifier.classify(key, window_title or "", exe_path or "")
+
+    def find_conflicts(self) -> list[str]:
+        return sorted(self.work_apps & self.distracting_apps)
+
+    @property
+    def ruled_apps(self) -> frozenset[str]:
+        return self.work_apps | self.distracting_apps | self.excluded_apps
+
+
+class AppRulesService:
+    """
+    Единственный владелец AppRulesRepository в процессе.
+
+    Все изменения идут через сервис под блокировкой и публикуют новый
+    RulesSnapshot. Подписчики вызываются в потоке, который внес изменение
+    (GUI, IPC, движок), уже после снятия блокировки; подписчик, которому
+    нужен поток GUI, сам переносит вызов туда через queued-сигнал.
+    """
+
+    def __init__(self, config: Config, config_path: Path = CONFIG_PATH):
+        self._lock = threading.RLock()
+        self._repo = AppRulesRepository(config, config_path)
+        self._subscribers: list[RulesSubscriber] = []
+        self.reload_count = 0
+        self._snapshot = self._build_snapshot(version=1)
+
+    @property
+    def config(self) -> Config:
+        return self._repo.config
+
+    @property
+    def snapshot(self) -> RulesSnapshot:
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def subscribe(self, callback: RulesSubscriber) -> Callable[[], None]:
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def _build_snapshot(self, version: int) -> RulesSnapshot:
+        state = self._repo.state
+        return RulesSnapshot(
+            version=version,
+            work_apps=frozenset(state.work_apps),
+            distracting_apps=frozenset(state.distracting_apps),
+            excluded_apps=frozenset(state.excluded_apps),
+            favorites=frozenset(state.favorites),
+            patterns=tuple(state.patterns),
+            classifier=self._repo.classifier,
+        )
+
+    def _publish_locked(self) -> RulesSnapshot | None:
+        candidate = self._build_snapshot(version=self._snapshot.version + 1)
+        if replace(candidate, version=self._snapshot.version) == self._snapshot:
+            return None
+        self._snapshot = candidate
+        return candidate
+
+    def _notify(self, snapshot: RulesSnapshot | None) -> None:
+        if snapshot is None:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(snapshot)
+
+    def reload(self) -> RulesSnapshot:
+        with self._lock:
+            self._repo.reload()
+            self.reload_count += 1
+            published = self._publish_locked()
+        self._notify(published)
+        return self._snapshot
+
+    def reload_if_changed(self) -> bool:
+        """Перечитать app_rules.json, только если изменились его mtime или размер."""
+        with self._lock:
+            if not self._repo.reload_if_changed():
+                return False
+            self.reload_count += 1
+            published = self._publish_locked()
+        self._notify(published)
+        return True
+
+    def replace_config(self, config: Config) -> bool:
+        """
+        Переключить сервис на новый объект Config (например, после внешней
+        правки config.json). При смене app_rules_path правила перечитываются
+        из нового файла и публикуются; тогда возвращает True.
+        """
+        with self._lock:
+            if not self._repo.replace_config(config):
+                return False
+            self.reload_count += 1
+            published = self._publish_locked()
+        self._notify(published)
+        return True
+
+    def set_rule(self, process_name: str, rule: str) -> None:
+        with self._lock:
+            self._repo.set_rule(process_name, rule)
+            published = self._publish_locked()
+        self._notify(published)
+
+    def set_pattern_rules(self, patterns: list[PatternRule]) -> None:
+        with self._lock:
+            self._repo.set_pattern_rules(patterns)
+            published = self._publish_locked()
+        self._notify(published)
+
+    def toggle_favorite(self, process_name: str) -> bool:
+        with self._lock:
+            result = self._repo.toggle_favorite(process_name)
+            published = self._publish_locked()
+        self._notify(published)
+        return result
+
+    def apply_to_config(self, persist: bool = True) -> None:
+        with self._lock:
+            self._repo.apply_to_config(persist=persist)
+
+    def record_observation(
+        self,
+        process_name: str,
+        window_title: str = "",
+        exe_path: str = "",
+        observed_at: datetime | None = None,
+    ) -> bool:
+        with self._lock:
+            return self._repo.record_observation(
+                process_name=process_name,
+                window_title=window_title,
+                exe_path=exe_path,
+                observed_at=observed_at,
+            )
+
+    def get_history_entry(self, process_name: str) -> AppHistoryEntry | None:
+        with self._lock:
+            entry = self._repo.state.history.get(normalize_process_name(process_name))
+            return replace(entry) if entry is not None else None
+
+    def get_recent_apps(
+        self,
+        limit: int = 100,
+        favorites_only: bool = False,
+    ) -> list[AppHistoryEntry]:
+        with self._lock:
+            items = self._repo.get_recent_apps(
+                limit=limit,
+                favorites_only=favorites_only,
+            )
+            return [replace(item) for item in items]
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+from tracker_engine import (
+    SNAPSHOT_DIFF_FIELDS,
+    SnapshotDelta,
+    TrackerSink,
+    snapshot_to_dict,
+)
+
+DEFAULT_SUBSCRIBER_QUEUE = 8
+
+
+class StreamMessage:
+    """Дельта для рассылки; JSON строится один раз на всех подписчиков."""
+
+    __slots__ = ("delta", "_encoded")
+
+    def __init__(self, delta: SnapshotDelta):
+        self.delta = delta
+        self._encoded: bytes | None = None
+
+    def encoded(self) -> bytes:
+        if self._encoded is None:
+            payload = {
+                "jsonrpc": "2.0",
+                "method": "snapshot",
+                "params": {
+                    "changed": sorted(self.delta.changed),
+                    "snapshot": snapshot_to_dict(self.delta.snapshot),
+                },
+            }
+            self._encoded = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        return self._encoded
+
+
+@dataclass
+class SubscriberStats:
+    queued: int = 0
+    delivered: int = 0
+    coalesced: int = 0
+
+
+class Subscription:
+    """
+    Очередь одного подписчика. put() никогда не блокирует: если очередь
+    заполнена, накопленные дельты сворачиваются в одну (последний снимок
+    и объединение измененных полей).
+    """
+
+    def __init__(self, hub: SnapshotHub, max_queue: int = DEFAULT_SUBSCRIBER_QUEUE):
+        self._hub = hub
+        self._max_queue = max(1, max_queue)
+        self._queue: deque[StreamMessage] = deque()
+        self._cond = threading.Condition(threading.Lock())
+        self._closed = False
+        self.stats = SubscriberStats()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, message: StreamMessage) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            if len(self._queue) >= self._max_queue:
+                changed = set(message.delta.changed)
+                for pending in self._queue:
+                    changed |= pending.delta.changed
+                self.stats.coalesced += len(self._queue)
+                self._queue.clear()
+                message = StreamMessage(
+                    SnapshotDelta(message.delta.snapshot, frozenset(changed))
+                )
+            self._queue.append(message)
+            self.stats.queued += 1
+            self._cond.notify()
+
+    def get(self, timeout: float | None = None) -> StreamMessage | None:
+        """Следующее сообщение, либо None по таймауту или после close()."""
+        with self._cond:
+            if not self._queue and not self._closed:
+                self._cond.wait(timeout)
+            if not self._queue:
+                return None
+            self.stats.delivered += 1
+            return self._queue.popleft()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.clear()
+            self._cond.notify_all()
+        self._hub._remove(self)
+
+
+class SnapshotHub(TrackerSink):
+    """
+    Раздача дельт снимков внешним подписчикам. Вызывается из потока движка
+    и делает только неблокирующие вставки в очереди подписчиков.
+    """
+
+    def __init__(self, max_queue: int = DEFAULT_SUBSCRIBER_QUEUE):
+        self._max_queue = max_queue
+        self._lock = threading.Lock()
+        self._subscribers: tuple[Subscription, ...] = ()
+        self._last: SnapshotDelta | None = None
+        self.dropped = 0
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self, self._max_queue)
+        with self._lock:
+            # Новый подписчик сразу получает полный текущий снимок; под той же
+            # блокировкой, чтобы он не обогнал следующую дельту.
+            if self._last is not None:
+                subscription.put(
+                    StreamMessage(
+                        SnapshotDelta(
+                            self._last.snapshot, frozenset(SNAPSHOT_DIFF_FIELDS)
+                        )
+                    )
+                )
+            self._subscribers = (*self._subscribers, subscription)
+        return subscription
+
+    def drop(self, subscription: Subscription) -> None:
+        """Отключить подписчика, который не успевает забирать данные."""
+        if not subscription.closed:
+            with self._lock:
+                self.dropped += 1
+            subscription.close()
+
+    def _remove(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers = tuple(
+                item for item in self._subscribers if item is not subscription
+            )
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def pending_total(self) -> int:
+        return sum(subscription.pending() for subscription in self._subscribers)
+
+    def close_all(self) -> None:
+        for subscription in self._subscribers:
+            subscription.close()
+
+    def on_snapshot(self, delta: SnapshotDelta) -> None:
+        message = StreamMessage(delta)
+        with self._lock:
+            self._last = delta
+            subscribers = self._subscribers
+        for subscription in subscribers:
+            subscription.put(message)
+
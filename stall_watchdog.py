@@ -0,0 +1,183 @@
+"""
+Сторож цикла событий Qt. Таймер в GUI-потоке раз в HEARTBEAT_INTERVAL_MS
+отмечает время, отдельный поток следит за отметкой: если цикл не отвечает
+дольше порога, в ротируемый файл пишется стек GUI-потока, а по окончании
+зависания — его длительность и сводка по всем зависаниям.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import Qt, QTimer
+
+from config import BASE_DIR
+from histogram import LatencyHistogram, RollingHistogram, geometric_bounds
+
+if TYPE_CHECKING:
+    import logging
+
+HEARTBEAT_INTERVAL_MS = 100
+DEFAULT_STALL_LOG_PATH = BASE_DIR / "focusmeter-stalls.log"
+STALL_LOG_MAX_BYTES = 512 * 1024
+STALL_LOG_BACKUPS = 3
+# Длинное зависание снимается несколько раз с шагом в порог: по смене
+# стеков видно, куда уходит время.
+MAX_SAMPLES_PER_STALL = 5
+
+STALL_BOUNDS_MS = geometric_bounds(100.0, 60000.0, 1.5)
+
+
+def _format_ms(value: float) -> str:
+    return f"{value:.0f} ms"
+
+
+class StallWatchdog:
+    """
+    start() и stop() вызываются из GUI-потока: там живет таймер пульса.
+    Файл создается только при первом зависании.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = 500.0,
+        log_path: str | Path | None = None,
+        heartbeat_ms: int = HEARTBEAT_INTERVAL_MS,
+    ):
+        self.threshold_ms = max(1.0, float(threshold_ms))
+        self.log_path = Path(log_path) if log_path else DEFAULT_STALL_LOG_PATH
+        self.heartbeat_ms = max(1, int(heartbeat_ms))
+        # Опоздание пульса относительно интервала — задержка цикла событий.
+        self.latency = RollingHistogram(window=3000)
+        self.stalls = LatencyHistogram(STALL_BOUNDS_MS)
+        self._poll_seconds = min(max(self.threshold_ms / 5000, 0.01), 0.1)
+        self._timer: QTimer | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._gui_thread_id = 0
+        self._last_beat = 0.0
+        self._handler: logging.Handler | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._gui_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        timer = QTimer()
+        timer.setTimerType(Qt.TimerType.PreciseTimer)
+        timer.setInterval(self.heartbeat_ms)
+        timer.timeout.connect(self._beat)
+        timer.start()
+        self._timer = timer
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="FocusMeterStallWatchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+        if self._handler is not None:
+            self._handler.close()
+            self._handler = None
+
+    def summary(self) -> dict[str, object]:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "latency": self.latency.summary(),
+            "stalls": self.stalls.summary(),
+            "log_path": str(self.log_path),
+        }
+
+    def _beat(self) -> None:
+        now = time.monotonic()
+        late_ms = (now - self._last_beat) * 1000 - self.heartbeat_ms
+        self._last_beat = now
+        self.latency.record(max(0.0, late_ms))
+
+    def _watch(self) -> None:
+        interval = self.heartbeat_ms / 1000
+        threshold = self.threshold_ms / 1000
+        stall_beat: float | None = None
+        samples = 0
+        next_sample = 0.0
+        while not self._stop.wait(self._poll_seconds):
+            beat = self._last_beat
+            lag = time.monotonic() - beat - interval
+            if stall_beat is not None and beat != stall_beat:
+                # Пульс вернулся: зависание длилось от пропущенного тика до него.
+                self._finish_stall(max(0.0, beat - stall_beat - interval) * 1000, samples)
+                stall_beat = None
+            if lag < threshold:
+                continue
+            if stall_beat is None:
+                stall_beat = beat
+                samples = 0
+                next_sample = threshold
+            if samples < MAX_SAMPLES_PER_STALL and lag >= next_sample:
+                samples += 1
+                next_sample = lag + threshold
+                self._write_sample(lag * 1000, samples)
+
+    def _gui_stack(self) -> str:
+        frame = sys._current_frames().get(self._gui_thread_id)
+        if frame is None:
+            return "  <GUI thread is gone>\n"
+        return "".join(traceback.format_stack(frame))
+
+    def _write_sample(self, lag_ms: float, sample: int) -> None:
+        stack = self._gui_stack()
+        self._log(
+            f"{datetime.now().isoformat(timespec='milliseconds')} "
+            f"event loop blocked for {_format_ms(lag_ms)} "
+            f"(threshold {_format_ms(self.threshold_ms)}, sample {sample}), "
+            f"GUI thread stack:\n{stack}"
+        )
+
+    def _finish_stall(self, duration_ms: float, samples: int) -> None:
+        self.stalls.record(duration_ms)
+        stats = self.stalls.summary()
+        self._log(
+            f"{datetime.now().isoformat(timespec='milliseconds')} "
+            f"stall ended after {_format_ms(duration_ms)} ({samples} stack samples); "
+            f"stalls={stats['count']} p50={_format_ms(stats['p50_ms'])} "
+            f"p95={_format_ms(stats['p95_ms'])} max={_format_ms(stats['max_ms'])}\n"
+        )
+
+    def _log(self, message: str) -> None:
+        # logging.handlers тянет socket и pickle; без зависаний он не нужен.
+        import logging
+        import logging.handlers
+
+        if self._handler is None:
+            try:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                handler = logging.handlers.RotatingFileHandler(
+                    self.log_path,
+                    maxBytes=STALL_LOG_MAX_BYTES,
+                    backupCount=STALL_LOG_BACKUPS,
+                    encoding="utf-8",
+                )
+            except OSError:
+                return
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._handler = handler
+        # Без логгера: сообщения не должны уходить в корневые обработчики.
+        self._handler.handle(logging.makeLogRecord({"msg": message, "levelno": logging.INFO}))
@@ -0,0 +1,244 @@
+"""
+Модели списков в окне статистики. AppUsageModel подгружает приложения
+страницами через canFetchMore/fetchMore: окно открывается после первой
+страницы, остальные читаются по мере прокрутки. Поиск и фильтр по типу —
+в AppUsageFilterModel поверх нее. WindowTitleModel так же по страницам
+показывает заголовки окон выбранного приложения.
+"""
+
+from __future__ import annotations
+
+from datetime import timezone
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QObject, QSortFilterProxyModel, Qt
+
+from storage.db import (
+    AppPageKey,
+    AppUsageRow,
+    TimeStats,
+    TitlePageKey,
+    WindowTitleRow,
+    get_app_usage_page,
+    get_window_title_page,
+)
+
+ROW_ROLE = Qt.ItemDataRole.UserRole
+APP_PAGE_SIZE = 100
+TITLE_PAGE_SIZE = 100
+
+CATEGORY_TYPES = {
+    "work": "Рабочее",
+    "distract": "Отвлекающее",
+    "other": "Прочее",
+    "mixed": "Смешанное",
+}
+
+
+def format_duration(seconds: float) -> str:
+    total_seconds = max(int(seconds), 0)
+    hours = total_seconds // 3600
+    minutes = (total_seconds % 3600) // 60
+    secs = total_seconds % 60
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
+def format_percent(value: float) -> str:
+    return f"{value * 100:.1f}%"
+
+
+class AppUsageModel(QAbstractListModel):
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+        self._rows: list[AppUsageRow] = []
+        self._db_path = ""
+        self._totals: TimeStats | None = None
+        self._interval = 0.0
+        self._next_key: AppPageKey | None = None
+        self._exhausted = True
+        self.pages_loaded = 0
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: N802
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        row = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return (
+                f"{row.app_name or '<без имени>'}\n"
+                f"{row.last_window_title or 'Без заголовка'}\n"
+                f"{row.app_type} • {format_duration(row.active_seconds)} • {format_percent(row.share_of_active)}"
+            )
+        if role == ROW_ROLE:
+            return row
+        return None
+
+    def row_at(self, position: int) -> AppUsageRow | None:
+        if 0 <= position < len(self._rows):
+            return self._rows[position]
+        return None
+
+    def load(self, db_path: str, totals: TimeStats, sample_interval_seconds: float) -> None:
+        """Показывает период totals: сбрасывает список и читает первую страницу."""
+        self.beginResetModel()
+        self._rows = []
+        self._db_path = db_path
+        self._totals = totals
+        self._interval = sample_interval_seconds
+        self._next_key = None
+        self._exhausted = totals.active_seconds <= 0
+        self.pages_loaded = 0
+        self.endResetModel()
+        if not self._exhausted:
+            self.fetchMore(QModelIndex())
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._rows = []
+        self._totals = None
+        self._exhausted = True
+        self.endResetModel()
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:  # noqa: N802
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:  # noqa: N802
+        if parent.isValid() or self._exhausted or self._totals is None:
+            return
+        page, self._next_key = get_app_usage_page(
+            self._db_path,
+            self._totals,
+            self._interval,
+            APP_PAGE_SIZE,
+            self._next_key,
+        )
+        self._exhausted = self._next_key is None
+        self.pages_loaded += 1
+        if not page:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+
+    def fetch_all(self) -> None:
+        while self.canFetchMore():
+            self.fetchMore()
+
+
+class WindowTitleModel(QAbstractListModel):
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+        self._rows: list[WindowTitleRow] = []
+        self._db_path = ""
+        self._totals: TimeStats | None = None
+        self._app: AppUsageRow | None = None
+        self._interval = 0.0
+        self._next_key: TitlePageKey | None = None
+        self._exhausted = True
+        self.pages_loaded = 0
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: N802
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        row = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return (
+                f"{row.window_title or 'Без заголовка'}\n"
+                f"{format_duration(row.active_seconds)} • {format_percent(row.share_of_app)}"
+            )
+        if role == Qt.ItemDataRole.ToolTipRole:
+            if row.last_seen_utc is None:
+                return row.window_title
+            seen = row.last_seen_utc.replace(tzinfo=timezone.utc).astimezone()
+            return f"{row.window_title}\nПоследний раз: {seen:%d.%m.%Y %H:%M}"
+        if role == ROW_ROLE:
+            return row
+        return None
+
+    @property
+    def app(self) -> AppUsageRow | None:
+        return self._app
+
+    def load(
+        self,
+        db_path: str,
+        totals: TimeStats,
+        app: AppUsageRow | None,
+        sample_interval_seconds: float,
+    ) -> None:
+        """Показывает заголовки app за период totals (None — пустой список)."""
+        self.beginResetModel()
+        self._rows = []
+        self._db_path = db_path
+        self._totals = totals
+        self._app = app
+        self._interval = sample_interval_seconds
+        self._next_key = None
+        self._exhausted = app is None or app.active_seconds <= 0
+        self.pages_loaded = 0
+        self.endResetModel()
+        if not self._exhausted:
+            self.fetchMore(QModelIndex())
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._rows = []
+        self._app = None
+        self._exhausted = True
+        self.endResetModel()
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:  # noqa: N802
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:  # noqa: N802
+        if parent.isValid() or self._exhausted or self._totals is None or self._app is None:
+            return
+        page, self._next_key = get_window_title_page(
+            self._db_path,
+            self._totals,
+            self._app,
+            self._interval,
+            TITLE_PAGE_SIZE,
+            self._next_key,
+        )
+        self._exhausted = self._next_key is None
+        self.pages_loaded += 1
+        if not page:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+
+
+class AppUsageFilterModel(QSortFilterProxyModel):
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+        self._query = ""
+        self._app_type = ""
+
+    def set_filter(self, query: str, category: str) -> None:
+        self._query = query.strip().lower()
+        self._app_type = CATEGORY_TYPES.get(category, "")
+        source = self.sourceModel()
+        if (self._query or self._app_type) and isinstance(source, AppUsageModel):
+            # Фильтр должен видеть все приложения периода, а не только
+            # прокрученные страницы.
+            source.fetch_all()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:  # noqa: N802
+        source = self.sourceModel()
+        row = source.row_at(source_row) if isinstance(source, AppUsageModel) else None
+        if row is None:
+            return False
+        if self._query:
+            haystack = f"{row.app_name} {row.last_window_title}".lower()
+            if self._query not in haystack:
+                return False
+        return not self._app_type or row.app_type == self._app_type
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from datetime import date, datetime, time as dt_time, timedelta
+from datetime import date, datetime, time as dt_time, timedelta, timezone
 
-from PyQt5.QtCore import QDate, QRectF, QTimer, Qt
+from PyQt5.QtCore import QDate, QModelIndex, QRectF, QTimer, Qt
 from PyQt5.QtGui import QColor, QPainter, QPen
 from PyQt5.QtWidgets import (
     QComboBox,
@@ -13,8 +13,7 @@ from PyQt5.QtWidgets import (
     QHBoxLayout,
     QLabel,
     QLineEdit,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QPushButton,
     QSplitter,
     QVBoxLayout,
@@ -22,7 +21,16 @@ from PyQt5.QtWidgets import (
 )
 
 from config import Config
-from storage.db import AppUsageRow, TimeStats, get_time_stats
+from stats_models import (
+    ROW_ROLE,
+    AppUsageFilterModel,
+    AppUsageModel,
+    WindowTitleModel,
+    format_duration,
+    format_percent,
+)
+from storage.db import AppUsageRow, TimeStats, get_period_totals, search_window_titles
+from storage.title_search import MAX_MATCHED_TITLES, TitleSearchResult
 from window_chrome import (
     build_window_shell,
     prepare_frameless_window,
@@ -31,18 +39,13 @@ from window_chrome import (
 
 NO_PEN = Qt.PenStyle.NoPen
 ALIGN_CENTER = Qt.AlignmentFlag.AlignCenter
-
-
-def format_duration(seconds: float) -> str:
-    total_seconds = max(int(seconds), 0)
-    hours = total_seconds // 3600
-    minutes = (total_seconds % 3600) // 60
-    secs = total_seconds % 60
-    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
-
-
-def format_percent(value: float) -> str:
-    return f"{value * 100:.1f}%"
+SEARCH_DEBOUNCE_MS = 150
+# Заголовки читаются, когда выделение задержалось на приложении, а не на
+# каждом шаге стрелками по списку.
+TITLE_LOAD_DELAY_MS = 120
+TITLE_SEARCH_DEBOUNCE_MS = 300
+# Сколько дней и приложений перечисляется в итоге поиска по заголовкам.
+TITLE_SEARCH_LISTED = 7
 
 
 class MetricCard(QFrame):
@@ -137,7 +140,6 @@ class StatsWindow(QDialog):
         super().__init__(parent)
         self.config = config
         self._stats: TimeStats | None = None
-        self._visible_rows: list[AppUsageRow] = []
         self._screen_sync_connected = False
         self._initial_layout_stabilized = False
 
@@ -187,7 +189,11 @@ class StatsWindow(QDialog):
 
         self.search_edit = QLineEdit()
         self.search_edit.setPlaceholderText("Поиск по процессу или заголовку окна")
-        self.search_edit.textChanged.connect(self._apply_filters)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(lambda: self._apply_filters())
+        self.search_edit.textChanged.connect(lambda _text: self.search_timer.start())
 
         self.category_filter = QComboBox()
         self.category_filter.addItem("Все типы", "all")
@@ -195,7 +201,7 @@ class StatsWindow(QDialog):
         self.category_filter.addItem("Отвлекающие", "distract")
         self.category_filter.addItem("Прочие", "other")
         self.category_filter.addItem("Смешанные", "mixed")
-        self.category_filter.currentIndexChanged.connect(self._apply_filters)
+        self.category_filter.currentIndexChanged.connect(lambda _index: self._apply_filters())
 
         self.refresh_button = QPushButton("Обновить")
         self.refresh_button.setObjectName("PrimaryButton")
@@ -252,6 +258,32 @@ class StatsWindow(QDialog):
         distribution_layout.addWidget(self.distribution_legend)
         main_layout.addWidget(distribution_panel)
 
+        title_search_panel = QFrame()
+        title_search_panel.setObjectName("StatsPanel")
+        title_search_layout = QVBoxLayout(title_search_panel)
+        title_search_layout.setContentsMargins(14, 12, 14, 12)
+        title_search_layout.setSpacing(6)
+
+        self.title_search_edit = QLineEdit()
+        self.title_search_edit.setPlaceholderText(
+            "Поиск по заголовкам окон за период, например invoice.xlsx или PR #123"
+        )
+        self.title_search_timer = QTimer(self)
+        self.title_search_timer.setSingleShot(True)
+        self.title_search_timer.setInterval(TITLE_SEARCH_DEBOUNCE_MS)
+        self.title_search_timer.timeout.connect(self._run_title_search)
+        self.title_search_edit.textChanged.connect(lambda _text: self.title_search_timer.start())
+        self.title_search_edit.returnPressed.connect(self._run_title_search)
+        title_search_layout.addWidget(self.title_search_edit)
+
+        self.title_search_label = QLabel("")
+        self.title_search_label.setObjectName("SecondaryText")
+        self.title_search_label.setWordWrap(True)
+        self.title_search_label.setTextFormat(Qt.TextFormat.PlainText)
+        self.title_search_label.hide()
+        title_search_layout.addWidget(self.title_search_label)
+        main_layout.addWidget(title_search_panel)
+
         self.empty_state = QLabel("Для выбранного периода пока нет данных.")
         self.empty_state.setObjectName("WarningStrip")
         self.empty_state.setAlignment(ALIGN_CENTER)
@@ -271,8 +303,13 @@ class StatsWindow(QDialog):
         list_title.setObjectName("HeroTitle")
         list_layout.addWidget(list_title)
 
-        self.app_list = QListWidget()
-        self.app_list.currentItemChanged.connect(self._on_app_changed)
+        self.app_model = AppUsageModel(self)
+        self.app_proxy = AppUsageFilterModel(self)
+        self.app_proxy.setSourceModel(self.app_model)
+        self.app_list = QListView()
+        self.app_list.setUniformItemSizes(True)
+        self.app_list.setModel(self.app_proxy)
+        self.app_list.selectionModel().currentChanged.connect(self._on_app_changed)
         list_layout.addWidget(self.app_list, 1)
         splitter.addWidget(list_panel)
 
@@ -318,7 +355,21 @@ class StatsWindow(QDialog):
         details_grid.addWidget(self._detail_label("Доля активного"), 5, 0)
         details_grid.addWidget(self.detail_share, 5, 1)
         details_layout.addLayout(details_grid)
-        details_layout.addStretch()
+
+        titles_title = QLabel("Заголовки окон")
+        titles_title.setObjectName("DetailLabel")
+        details_layout.addWidget(titles_title)
+
+        self.title_model = WindowTitleModel(self)
+        self.title_list = QListView()
+        self.title_list.setUniformItemSizes(True)
+        self.title_list.setModel(self.title_model)
+        details_layout.addWidget(self.title_list, 1)
+
+        self.title_timer = QTimer(self)
+        self.title_timer.setSingleShot(True)
+        self.title_timer.setInterval(TITLE_LOAD_DELAY_MS)
+        self.title_timer.timeout.connect(self._load_titles)
         splitter.addWidget(details_panel)
 
         splitter.setStretchFactor(0, 5)
@@ -404,14 +455,76 @@ class StatsWindow(QDialog):
 
     def _refresh_stats(self) -> None:
         start_utc, end_utc, start_date, end_date = self._selected_period_bounds()
-        self._stats = get_time_stats(
+        previous = self._selected_row()
+        self._stats = get_period_totals(
             db_path=self.config.db_path,
             start_utc=start_utc,
             end_utc=end_utc,
             sample_interval_seconds=self.config.poll_interval_seconds,
         )
         self._fill_summary(self._stats, start_date, end_date)
-        self._apply_filters()
+        self.app_model.load(
+            self.config.db_path,
+            self._stats,
+            self.config.poll_interval_seconds,
+        )
+        self._apply_filters(previous.app_name if previous else "")
+        if self.title_search_edit.text().strip():
+            self._run_title_search()
+
+    def _run_title_search(self) -> None:
+        self.title_search_timer.stop()
+        query = self.title_search_edit.text().strip()
+        if not query:
+            self.title_search_label.hide()
+            return
+        start_utc, end_utc, _start_date, _end_date = self._selected_period_bounds()
+        result = search_window_titles(
+            self.config.db_path,
+            query,
+            start_utc,
+            end_utc,
+            self.config.poll_interval_seconds,
+        )
+        self.title_search_label.setText(self._format_title_search(result))
+        self.title_search_label.show()
+
+    def _format_title_search(self, result: TitleSearchResult) -> str:
+        text = self._format_title_matches(result)
+        if not result.index_complete:
+            text += "\nИстория еще индексируется, результаты неполные."
+        return text
+
+    def _format_title_matches(self, result: TitleSearchResult) -> str:
+        if result.matched_titles == 0:
+            return "Заголовков с такими словами нет."
+        if result.active_seconds <= 0:
+            return f"За выбранный период совпадений нет (заголовков с этими словами: {result.matched_titles})."
+
+        days = ", ".join(day.strftime("%d.%m") for day in result.days[:TITLE_SEARCH_LISTED])
+        if len(result.days) > TITLE_SEARCH_LISTED:
+            days += ", …"
+        lines = [f"{format_duration(result.active_seconds)} активного времени, дней: {len(result.days)} ({days})"]
+        if result.last_seen_utc is not None:
+            seen = result.last_seen_utc.replace(tzinfo=timezone.utc).astimezone()
+            lines[0] += f", последний раз {seen:%d.%m.%Y %H:%M}"
+        lines.append(
+            "Приложения: "
+            + ", ".join(
+                f"{app_name or '<без имени>'} {format_duration(seconds)}"
+                for app_name, seconds in result.apps[:TITLE_SEARCH_LISTED]
+            )
+        )
+        lines.append(
+            "Заголовки: "
+            + "; ".join(
+                f"{title} ({app_name}) {format_duration(seconds)}"
+                for app_name, title, seconds in result.titles
+            )
+        )
+        if result.truncated:
+            lines.append(f"Учтены первые {MAX_MATCHED_TITLES} заголовков — уточните запрос.")
+        return "\n".join(lines)
 
     def _fill_summary(self, stats: TimeStats, start_date: date, end_date: date) -> None:
         total = stats.total_seconds or 0.0
@@ -464,80 +577,48 @@ class StatsWindow(QDialog):
             )
         )
 
-    def _match_row(self, row: AppUsageRow) -> bool:
-        query = self.search_edit.text().strip().lower()
-        if query:
-            haystack = " ".join([row.app_name, row.last_window_title]).lower()
-            if query not in haystack:
-                return False
-
-        filter_key = self.category_filter.currentData()
-        if filter_key == "work":
-            return row.app_type == "Рабочее"
-        if filter_key == "distract":
-            return row.app_type == "Отвлекающее"
-        if filter_key == "other":
-            return row.app_type == "Прочее"
-        if filter_key == "mixed":
-            return row.app_type == "Смешанное"
-        return True
-
-    def _apply_filters(self) -> None:
-        stats = self._stats
-        if stats is None:
-            self._visible_rows = []
-            self.app_list.clear()
-            self.empty_state.show()
-            return
-
-        self._visible_rows = [row for row in stats.by_app if self._match_row(row)]
-        self.empty_state.setVisible(stats.total_seconds == 0 or not self._visible_rows)
-
-        previous = self._selected_row()
-        previous_key = previous.app_name if previous else ""
-
-        self.app_list.clear()
-        for row in self._visible_rows:
-            item = QListWidgetItem(
-                f"{row.app_name or '<без имени>'}\n"
-                f"{row.last_window_title or 'Без заголовка'}\n"
-                f"{row.app_type} • {format_duration(row.active_seconds)} • {format_percent(row.share_of_active)}"
-            )
-            item.setData(Qt.ItemDataRole.UserRole, row)
-            self.app_list.addItem(item)
+    def _apply_filters(self, previous_key: str | None = None) -> None:
+        self.search_timer.stop()
+        if previous_key is None:
+            previous = self._selected_row()
+            previous_key = previous.app_name if previous else ""
+        self.app_proxy.set_filter(
+            self.search_edit.text(),
+            self.category_filter.currentData(),
+        )
 
-        if self.app_list.count() == 0:
+        stats = self._stats
+        visible = self.app_proxy.rowCount()
+        self.empty_state.setVisible(stats is None or stats.total_seconds == 0 or visible == 0)
+        if visible == 0:
             self._fill_details(None)
             return
 
         target_index = 0
-        for index in range(self.app_list.count()):
-            item = self.app_list.item(index)
-            if item is None:
-                continue
-            row = item.data(Qt.ItemDataRole.UserRole)
-            if row.app_name == previous_key:
+        for index in range(visible):
+            row = self.app_proxy.index(index, 0).data(ROW_ROLE)
+            if row is not None and row.app_name == previous_key:
                 target_index = index
                 break
-        self.app_list.setCurrentRow(target_index)
+        target = self.app_proxy.index(target_index, 0)
+        if target == self.app_list.currentIndex():
+            self._fill_details(target.data(ROW_ROLE))
+        else:
+            self.app_list.setCurrentIndex(target)
 
     def _selected_row(self) -> AppUsageRow | None:
-        item = self.app_list.currentItem()
-        if item is None:
+        index = self.app_list.currentIndex()
+        if not index.isValid():
             return None
-        return item.data(Qt.ItemDataRole.UserRole)
-
-    def _on_app_changed(self, current=None, previous=None) -> None:
-        del previous
-        row = (
-            current.data(Qt.ItemDataRole.UserRole)
-            if current is not None
-            else self._selected_row()
-        )
-        self._fill_details(row)
+        return index.data(ROW_ROLE)
+
+    def _on_app_changed(self, current: QModelIndex, _previous: QModelIndex) -> None:
+        self._fill_details(current.data(ROW_ROLE) if current.isValid() else None)
 
     def _fill_details(self, row: AppUsageRow | None) -> None:
+        self.title_model.clear()
         if row is None:
+            self.title_timer.stop()
             self.detail_app_label.setText("Ничего не выбрано")
             self.detail_window_label.setText(
                 "Выберите приложение слева, чтобы увидеть детали."
@@ -558,6 +639,18 @@ class StatsWindow(QDialog):
         self.detail_distract.setText(format_duration(row.distract_active_seconds))
         self.detail_other.setText(format_duration(row.other_active_seconds))
         self.detail_share.setText(format_percent(row.share_of_active))
+        self.title_timer.start()
+
+    def _load_titles(self) -> None:
+        row = self._selected_row()
+        if row is None or self._stats is None:
+            return
+        self.title_model.load(
+            self.config.db_path,
+            self._stats,
+            row,
+            self.config.poll_interval_seconds,
+        )
 
     def showEvent(self, event) -> None:  # noqa: N802
         super().showEvent(event)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import mmap
+import os
+import time
+from pathlib import Path
+
+from ipc_protocol import prepare_runtime_path
+from status_reader import (
+    HEADER,
+    PAYLOAD,
+    PAYLOAD_OFFSET,
+    SEQ,
+    SEQ_OFFSET,
+    STATUS_FILE_SIZE,
+    STATUS_MAGIC,
+    STATUS_VERSION,
+    default_status_path,
+)
+from tracker_engine import TrackerEngine, TrackerSink, WorkerSnapshot
+
+
+def _fixed_text(value: str, size: int) -> bytes:
+    # Обрезка по границе символа, чтобы читатель не получил битый UTF-8.
+    return (value or "").encode("utf-8")[:size].decode("utf-8", "ignore").encode("utf-8")
+
+
+class StatusFileSink(TrackerSink):
+    """
+    Пишет текущее состояние движка в файл фиксированного размера через mmap.
+    Запись обрамлена seqlock-счетчиком: нечетное значение означает, что
+    данные в процессе обновления.
+    """
+
+    def __init__(self, engine: TrackerEngine, path: str | Path | None = None):
+        self.engine = engine
+        self.path = Path(path) if path else resolve_status_path(
+            engine.config.status_file_path
+        )
+        self._map: mmap.mmap | None = None
+        self._seq = 0
+        self._last: WorkerSnapshot | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._map is not None
+
+    def start(self) -> bool:
+        if self._map is not None:
+            return True
+        try:
+            prepare_runtime_path(self.path)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        except OSError:
+            return False
+        try:
+            os.ftruncate(fd, STATUS_FILE_SIZE)
+            self._map = mmap.mmap(fd, STATUS_FILE_SIZE)
+        except OSError:
+            return False
+        finally:
+            os.close(fd)
+
+        self._seq = 0
+        HEADER.pack_into(self._map, 0, STATUS_MAGIC, STATUS_VERSION, self._seq)
+        self._write(self.engine.last_snapshot, running=self.engine.is_running)
+        self.engine.add_sink(self)
+        return True
+
+    def stop(self) -> None:
+        if self._map is None:
+            return
+        self.engine.remove_sink(self)
+        self._write(self._last, running=False)
+        self._map.close()
+        self._map = None
+
+    def on_tick(self, snapshot: WorkerSnapshot | None) -> None:
+        self._last = snapshot
+        self._write(snapshot, running=True)
+
+    def on_stopped(self) -> None:
+        self._write(self._last, running=False)
+
+    def _write(self, snapshot: WorkerSnapshot | None, running: bool) -> None:
+        target = self._map
+        if target is None:
+            return
+        active_seconds, work_seconds = self.engine.today.headline()
+        if snapshot is None:
+            values = (
+                time.time(), b"stopped", running, False, False,
+                0.0, 0.0, 0.0, 0.0, 0.0, active_seconds, work_seconds, b"", b"",
+            )
+        else:
+            state = snapshot.state if running else "stopped"
+            values = (
+                time.time(),
+                _fixed_text(state, 16),
+                running,
+                snapshot.paused,
+                snapshot.user_active,
+                snapshot.idle_seconds,
+                snapshot.fatigue_score,
+                snapshot.fatigue_threshold,
+                snapshot.seconds_to_break,
+                snapshot.seconds_to_idle_warning,
+                active_seconds,
+                work_seconds,
+                _fixed_text(snapshot.app_name, 64),
+                _fixed_text(snapshot.window_title, 192),
+            )
+        self._seq += 1
+        SEQ.pack_into(target, SEQ_OFFSET, self._seq)
+        PAYLOAD.pack_into(target, PAYLOAD_OFFSET, *values)
+        self._seq += 1
+        SEQ.pack_into(target, SEQ_OFFSET, self._seq)
+
+
+def resolve_status_path(configured: str = "") -> Path:
+    return Path(configured).expanduser() if configured else default_status_path()
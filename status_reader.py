@@ -0,0 +1,148 @@
+"""
+Чтение файла статуса FocusMeter для панелей (polybar, waybar, tmux).
+
+Файл занимает одну страницу и перезаписывается трекером на месте.
+Счетчик seq нечетный во время записи; читатель копирует данные и
+повторяет попытку, если seq изменился. Блокировок нет.
+
+    python status_reader.py --format "{state} {today_work_hm}"
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import struct
+import sys
+import time
+from pathlib import Path
+
+from ipc_protocol import runtime_path
+
+STATUS_MAGIC = b"FMST"
+STATUS_VERSION = 1
+STATUS_FILE_SIZE = 4096
+
+HEADER = struct.Struct("<4sHxxQ")
+SEQ = struct.Struct("<Q")
+SEQ_OFFSET = 8
+PAYLOAD = struct.Struct("<d16sBBB5x7d64s192s")
+PAYLOAD_OFFSET = HEADER.size
+
+PAYLOAD_FIELDS = (
+    "updated_unix",
+    "state",
+    "running",
+    "paused",
+    "user_active",
+    "idle_seconds",
+    "fatigue_score",
+    "fatigue_threshold",
+    "seconds_to_break",
+    "seconds_to_idle_warning",
+    "today_active_seconds",
+    "today_work_seconds",
+    "app_name",
+    "window_title",
+)
+_TEXT_FIELDS = {"state", "app_name", "window_title"}
+_FLAG_FIELDS = {"running", "paused", "user_active"}
+
+
+def default_status_path() -> Path:
+    return runtime_path("status")
+
+
+def decode_payload(raw: bytes) -> dict[str, object]:
+    values = PAYLOAD.unpack(raw)
+    status: dict[str, object] = {}
+    for name, value in zip(PAYLOAD_FIELDS, values):
+        if name in _TEXT_FIELDS:
+            value = value.rstrip(b"\0").decode("utf-8", "ignore")
+        elif name in _FLAG_FIELDS:
+            value = bool(value)
+        status[name] = value
+    return status
+
+
+def _format_hm(seconds: float) -> str:
+    minutes = int(seconds) // 60
+    return f"{minutes // 60}:{minutes % 60:02d}"
+
+
+class StatusReader:
+    """Держит файл отображенным в память; read() можно звать хоть каждый кадр."""
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path else default_status_path()
+        with self.path.open("rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), STATUS_FILE_SIZE, access=mmap.ACCESS_READ)
+        magic, version, _seq = HEADER.unpack_from(self._map, 0)
+        if magic != STATUS_MAGIC or version != STATUS_VERSION:
+            self._map.close()
+            raise ValueError(f"Not a FocusMeter status file: {self.path}")
+
+    def close(self) -> None:
+        self._map.close()
+
+    def read(self, retries: int = 100) -> dict[str, object] | None:
+        for _ in range(retries):
+            before = SEQ.unpack_from(self._map, SEQ_OFFSET)[0]
+            if before & 1:
+                time.sleep(0)
+                continue
+            raw = self._map[PAYLOAD_OFFSET:PAYLOAD_OFFSET + PAYLOAD.size]
+            if SEQ.unpack_from(self._map, SEQ_OFFSET)[0] == before:
+                status = decode_payload(raw)
+                status["seq"] = before
+                status["age_seconds"] = max(time.time() - status["updated_unix"], 0.0)
+                status["today_work_hm"] = _format_hm(status["today_work_seconds"])
+                status["break_in_hm"] = _format_hm(status["seconds_to_break"])
+                return status
+        return None
+
+
+def read_status(path: str | Path | None = None) -> dict[str, object] | None:
+    try:
+        reader = StatusReader(path)
+    except (OSError, ValueError):
+        return None
+    try:
+        return reader.read()
+    finally:
+        reader.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Print FocusMeter live status")
+    parser.add_argument("--path", default="", help="Status file (default: runtime dir).")
+    parser.add_argument(
+        "--format",
+        default="{state} {app_name} work={today_work_hm} break_in={break_in_hm}",
+        help="str.format template over status fields.",
+    )
+    parser.add_argument(
+        "--stale-after",
+        type=float,
+        default=10.0,
+        help="Print 'offline' if the tracker has not updated the file for this long.",
+    )
+    args = parser.parse_args(argv)
+
+    status = read_status(args.path or None)
+    if status is None or not status["running"] or status["age_seconds"] > args.stale_after:
+        print("offline")
+        return 1
+    try:
+        line = args.format.format(**status)
+    except (KeyError, IndexError, AttributeError, ValueError) as exc:
+        reason = f"unknown field {exc}" if isinstance(exc, KeyError) else str(exc)
+        print(f"Invalid --format: {reason}", file=sys.stderr)
+        print("Valid fields: " + ", ".join(sorted(status)), file=sys.stderr)
+        return 2
+    print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
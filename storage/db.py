@@ -2,7 +2,10 @@ from __future__ import annotations
 
 import sqlite3
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from storage.rollup import begin_read, bucket_key, init_rollup, is_aligned
+from storage.title_search import TitleSearchResult, init_title_search, search_titles
 
 
 @dataclass
@@ -62,6 +65,8 @@ def init_db(db_path: str) -> None:
         );
         """
     )
+    init_rollup(cur)
+    init_title_search(cur)
     conn.commit()
     conn.close()
 
@@ -104,99 +109,162 @@ def insert_event(
             int(inputs_since_last),
         ),
     )
+    if window_title:
+        # Новый заголовок сразу попадает в поиск (триггер title_search).
+        cur.execute(
+            "INSERT OR IGNORE INTO window_titles (app_name, window_title) VALUES (?, ?);",
+            (app_name or "", window_title),
+        )
     conn.commit()
     conn.close()
 
 
-def get_time_stats(
+# (app_name, total_rows, active_rows, work_rows, distract_rows, last_title_id,
+#  last_window_title)
+_AppCounts = tuple[str, int, int, int, int, int, str]
+
+_RAW_APP_COUNTS = """
+    SELECT
+        COALESCE(app_name, ''),
+        COUNT(*),
+        SUM(CASE WHEN user_active = 1 THEN 1 ELSE 0 END),
+        SUM(CASE WHEN user_active = 1 AND is_work_app = 1 THEN 1 ELSE 0 END),
+        SUM(CASE WHEN user_active = 1 AND is_distracting_app = 1 THEN 1 ELSE 0 END),
+        MAX(CASE WHEN window_title <> '' THEN id END),
+        COALESCE(window_title, '')
+    FROM events
+    WHERE {where}
+    GROUP BY 1;
+"""
+
+_ROLLUP_APP_COUNTS = """
+    SELECT
+        app_name,
+        SUM(total_rows),
+        SUM(active_rows),
+        SUM(work_rows),
+        SUM(distract_rows),
+        MAX(last_title_id),
+        last_window_title
+    FROM usage_rollup
+    WHERE bucket >= ? AND bucket < ?
+    GROUP BY app_name
+"""
+
+
+def _merge_counts(rows: list[_AppCounts]) -> list[_AppCounts]:
+    merged: dict[str, list] = {}
+    for app_name, total, active, work, distract, title_id, title in rows:
+        current = merged.get(app_name)
+        if current is None:
+            merged[app_name] = [
+                app_name, total or 0, active or 0, work or 0, distract or 0, title_id or 0, title or ""
+            ]
+            continue
+        current[1] += total or 0
+        current[2] += active or 0
+        current[3] += work or 0
+        current[4] += distract or 0
+        if (title_id or 0) > current[5]:
+            current[5] = title_id
+            current[6] = title or ""
+    return [tuple(item) for item in merged.values()]  # type: ignore[misc]
+
+
+def _read_app_counts(
+    conn: sqlite3.Connection,
     db_path: str,
     start_utc: datetime,
     end_utc: datetime,
-    sample_interval_seconds: float,
-) -> TimeStats:
-    init_db(db_path)
-
+) -> list[_AppCounts]:
+    """
+    Счетчики по приложениям за период. Для периода, кратного интервалу
+    свертки, суммируются ее строки и хвост событий, который она еще не
+    учла.
+    """
     start_iso = start_utc.isoformat()
     end_iso = end_utc.isoformat()
-
-    conn = _connect(db_path)
     cur = conn.cursor()
+    if not (is_aligned(start_utc) and is_aligned(end_utc)):
+        cur.execute(
+            _RAW_APP_COUNTS.format(where="timestamp_utc >= ? AND timestamp_utc < ?"),
+            (start_iso, end_iso),
+        )
+        return cur.fetchall()
 
+    covered = begin_read(conn, db_path)
+    cur.execute(_ROLLUP_APP_COUNTS + ";", (bucket_key(start_utc), bucket_key(end_utc)))
+    rows = cur.fetchall()
     cur.execute(
-        """
-        SELECT
-            COUNT(*) AS total_rows,
-            SUM(CASE WHEN user_active = 1 THEN 1 ELSE 0 END) AS active_rows,
-            SUM(CASE WHEN user_active = 1 AND is_work_app = 1 THEN 1 ELSE 0 END) AS work_rows,
-            SUM(CASE WHEN user_active = 1 AND is_distracting_app = 1 THEN 1 ELSE 0 END) AS distract_rows,
-            SUM(CASE WHEN user_active = 0 THEN 1 ELSE 0 END) AS idle_rows
-        FROM events
-        WHERE timestamp_utc >= ? AND timestamp_utc < ?;
-        """,
-        (start_iso, end_iso),
+        _RAW_APP_COUNTS.format(where="id > ? AND timestamp_utc >= ? AND timestamp_utc < ?"),
+        (covered, start_iso, end_iso),
     )
-    row = cur.fetchone() or (0, 0, 0, 0, 0)
+    tail = cur.fetchall()
+    if not tail:
+        return rows
+    return _merge_counts(rows + tail)
+
 
-    total_rows = row[0] or 0
-    active_rows = row[1] or 0
-    work_rows = row[2] or 0
-    distract_rows = row[3] or 0
-    idle_rows = row[4] or 0
+def _app_usage_row(
+    counts: _AppCounts,
+    sample_interval_seconds: float,
+    total_seconds: float,
+    active_seconds: float,
+) -> AppUsageRow:
+    app_name, _total_rows, active_rows, work_rows, distract_rows, title_id, last_window_title = counts
+    app_active_seconds = (active_rows or 0) * sample_interval_seconds
+    app_work_seconds = (work_rows or 0) * sample_interval_seconds
+    app_distract_seconds = (distract_rows or 0) * sample_interval_seconds
+    app_other_seconds = max(
+        app_active_seconds - app_work_seconds - app_distract_seconds,
+        0.0,
+    )
+    return AppUsageRow(
+        app_name=app_name or "",
+        last_window_title=(last_window_title or "") if title_id else "",
+        active_seconds=app_active_seconds,
+        work_active_seconds=app_work_seconds,
+        distract_active_seconds=app_distract_seconds,
+        other_active_seconds=app_other_seconds,
+        share_of_total=(app_active_seconds / total_seconds) if total_seconds else 0.0,
+        share_of_active=(app_active_seconds / active_seconds) if active_seconds else 0.0,
+    )
+
+
+def _sorted_active(rows: list[_AppCounts]) -> list[_AppCounts]:
+    return sorted(
+        (row for row in rows if (row[2] or 0) > 0),
+        key=lambda row: (-(row[2] or 0), row[0] or ""),
+    )
+
+
+def _period_stats(
+    start_utc: datetime,
+    end_utc: datetime,
+    sample_interval_seconds: float,
+    rows: list[_AppCounts],
+    with_apps: bool,
+) -> TimeStats:
+    total_rows = sum(row[1] or 0 for row in rows)
+    active_rows = sum(row[2] or 0 for row in rows)
+    work_rows = sum(row[3] or 0 for row in rows)
+    distract_rows = sum(row[4] or 0 for row in rows)
 
     total_seconds = total_rows * sample_interval_seconds
     active_seconds = active_rows * sample_interval_seconds
     work_active_seconds = work_rows * sample_interval_seconds
     distract_active_seconds = distract_rows * sample_interval_seconds
-    idle_seconds = idle_rows * sample_interval_seconds
+    idle_seconds = (total_rows - active_rows) * sample_interval_seconds
     other_active_seconds = max(
         active_seconds - work_active_seconds - distract_active_seconds,
         0.0,
     )
-
-    cur.execute(
-        """
-        SELECT
-            app_name,
-            COALESCE(MAX(NULLIF(window_title, '')), '') AS last_window_title,
-            SUM(CASE WHEN user_active = 1 THEN 1 ELSE 0 END) AS active_rows,
-            SUM(CASE WHEN user_active = 1 AND is_work_app = 1 THEN 1 ELSE 0 END) AS work_rows,
-            SUM(CASE WHEN user_active = 1 AND is_distracting_app = 1 THEN 1 ELSE 0 END) AS distract_rows
-        FROM events
-        WHERE timestamp_utc >= ? AND timestamp_utc < ?
-        GROUP BY app_name
-        HAVING SUM(CASE WHEN user_active = 1 THEN 1 ELSE 0 END) > 0
-        ORDER BY active_rows DESC, app_name ASC;
-        """,
-        (start_iso, end_iso),
-    )
-
-    by_app: list[AppUsageRow] = []
-    for app_name, last_window_title, active_rows, work_rows, distract_rows in cur.fetchall():
-        active_rows = active_rows or 0
-        work_rows = work_rows or 0
-        distract_rows = distract_rows or 0
-
-        app_active_seconds = active_rows * sample_interval_seconds
-        app_work_seconds = work_rows * sample_interval_seconds
-        app_distract_seconds = distract_rows * sample_interval_seconds
-        app_other_seconds = max(
-            app_active_seconds - app_work_seconds - app_distract_seconds,
-            0.0,
-        )
-        by_app.append(
-            AppUsageRow(
-                app_name=app_name or "",
-                last_window_title=last_window_title or "",
-                active_seconds=app_active_seconds,
-                work_active_seconds=app_work_seconds,
-                distract_active_seconds=app_distract_seconds,
-                other_active_seconds=app_other_seconds,
-                share_of_total=(app_active_seconds / total_seconds) if total_seconds else 0.0,
-                share_of_active=(app_active_seconds / active_seconds) if active_seconds else 0.0,
-            )
-        )
-
-    conn.close()
+    by_app = []
+    if with_apps:
+        by_app = [
+            _app_usage_row(row, sample_interval_seconds, total_seconds, active_seconds)
+            for row in _sorted_active(rows)
+        ]
 
     return TimeStats(
         period_start=start_utc,
@@ -209,3 +277,271 @@ def get_time_stats(
         idle_seconds=idle_seconds,
         by_app=by_app,
     )
+
+
+def get_time_stats(
+    db_path: str,
+    start_utc: datetime,
+    end_utc: datetime,
+    sample_interval_seconds: float,
+) -> TimeStats:
+    init_db(db_path)
+    conn = _connect(db_path)
+    try:
+        rows = _read_app_counts(conn, db_path, start_utc, end_utc)
+    finally:
+        conn.close()
+    return _period_stats(start_utc, end_utc, sample_interval_seconds, rows, with_apps=True)
+
+
+def get_period_totals(
+    db_path: str,
+    start_utc: datetime,
+    end_utc: datetime,
+    sample_interval_seconds: float,
+) -> TimeStats:
+    """Как get_time_stats, но без списка приложений (by_app пуст)."""
+    init_db(db_path)
+    conn = _connect(db_path)
+    try:
+        rows = _read_app_counts(conn, db_path, start_utc, end_utc)
+    finally:
+        conn.close()
+    return _period_stats(start_utc, end_utc, sample_interval_seconds, rows, with_apps=False)
+
+
+def search_window_titles(
+    db_path: str,
+    text: str,
+    start_utc: datetime,
+    end_utc: datetime,
+    sample_interval_seconds: float,
+    utc_offset: timedelta | None = None,
+) -> TitleSearchResult:
+    """Полнотекстовый поиск по заголовкам окон, см. storage.title_search."""
+    init_db(db_path)
+    return search_titles(
+        db_path, text, start_utc, end_utc, sample_interval_seconds, utc_offset
+    )
+
+
+# Позиция после последней строки страницы: (active_rows, app_name).
+AppPageKey = tuple[int, str]
+
+
+def get_app_usage_page(
+    db_path: str,
+    totals: TimeStats,
+    sample_interval_seconds: float,
+    limit: int,
+    after: AppPageKey | None = None,
+) -> tuple[list[AppUsageRow], AppPageKey | None]:
+    """
+    Страница приложений периода totals в порядке убывания активного
+    времени. Возвращает строки и ключ следующей страницы (None — последняя).
+    Если свертка покрывает период целиком, страница выбирается в SQL по
+    ключу (active_rows, app_name), без OFFSET.
+    """
+    start_utc, end_utc = totals.period_start, totals.period_end
+    conn = _connect(db_path)
+    try:
+        rows = _read_app_counts_page(conn, db_path, start_utc, end_utc, limit, after)
+    finally:
+        conn.close()
+    page = [
+        _app_usage_row(row, sample_interval_seconds, totals.total_seconds, totals.active_seconds)
+        for row in rows
+    ]
+    next_key = (rows[-1][2] or 0, rows[-1][0] or "") if len(rows) >= limit else None
+    return page, next_key
+
+
+def _begin_rollup_only(
+    conn: sqlite3.Connection,
+    db_path: str,
+    start_utc: datetime,
+    end_utc: datetime,
+) -> bool:
+    """
+    True, если период целиком покрыт сверткой и ее можно читать одну; тогда
+    транзакция чтения остается открытой. Иначе (невыровненный период или
+    неучтенный хвост событий) возвращает False без открытой транзакции.
+    """
+    if not (is_aligned(start_utc) and is_aligned(end_utc)):
+        return False
+    covered = begin_read(conn, db_path)
+    tail = conn.execute(
+        "SELECT 1 FROM events WHERE id > ? AND timestamp_utc >= ? AND timestamp_utc < ? LIMIT 1;",
+        (covered, start_utc.isoformat(), end_utc.isoformat()),
+    ).fetchone()
+    if tail is None:
+        return True
+    conn.rollback()
+    return False
+
+
+def _read_app_counts_page(
+    conn: sqlite3.Connection,
+    db_path: str,
+    start_utc: datetime,
+    end_utc: datetime,
+    limit: int,
+    after: AppPageKey | None,
+) -> list[_AppCounts]:
+    if _begin_rollup_only(conn, db_path, start_utc, end_utc):
+        active, name = after if after is not None else (None, "")
+        cur = conn.execute(
+            _ROLLUP_APP_COUNTS
+            + """
+            HAVING SUM(active_rows) > 0
+                AND (? IS NULL OR SUM(active_rows) < ? OR (SUM(active_rows) = ? AND app_name > ?))
+            ORDER BY SUM(active_rows) DESC, app_name ASC
+            LIMIT ?;
+            """,
+            (
+                bucket_key(start_utc),
+                bucket_key(end_utc),
+                active,
+                active,
+                active,
+                name,
+                limit,
+            ),
+        )
+        return cur.fetchall()
+
+    # Свертка еще догоняет таблицу: страницу режем из полного списка.
+    rows = _sorted_active(_read_app_counts(conn, db_path, start_utc, end_utc))
+    if after is not None:
+        key = (-after[0], after[1])
+        rows = [row for row in rows if (-(row[2] or 0), row[0] or "") > key]
+    return rows[:limit]
+
+
+# (window_title, active_rows, last_event_id)
+_TitleCounts = tuple[str, int, int]
+# Позиция после последней строки страницы: (active_rows, window_title).
+TitlePageKey = tuple[int, str]
+
+_ROLLUP_TITLE_COUNTS = """
+    SELECT window_title, SUM(active_rows), MAX(last_event_id)
+    FROM title_rollup
+    WHERE app_name = ? AND bucket >= ? AND bucket < ?
+    GROUP BY window_title
+"""
+
+_RAW_TITLE_COUNTS = """
+    SELECT COALESCE(window_title, ''), COUNT(*), MAX(id)
+    FROM events
+    WHERE {where} AND COALESCE(app_name, '') = ? AND user_active = 1
+    GROUP BY 1;
+"""
+
+
+@dataclass
+class WindowTitleRow:
+    window_title: str
+    active_seconds: float
+    share_of_app: float
+    last_seen_utc: datetime | None
+
+
+def get_window_title_page(
+    db_path: str,
+    totals: TimeStats,
+    app: AppUsageRow,
+    sample_interval_seconds: float,
+    limit: int,
+    after: TitlePageKey | None = None,
+) -> tuple[list[WindowTitleRow], TitlePageKey | None]:
+    """
+    Страница заголовков окон приложения app за период totals в порядке
+    убывания активного времени, как get_app_usage_page. Заголовки читаются
+    из title_rollup по первичному ключу (app_name, bucket, window_title).
+    """
+    start_utc, end_utc = totals.period_start, totals.period_end
+    conn = _connect(db_path)
+    try:
+        rows = _read_title_counts_page(conn, db_path, app.app_name, start_utc, end_utc, limit, after)
+        last_seen = _event_timestamps(conn, [row[2] for row in rows])
+    finally:
+        conn.close()
+    page = []
+    for title, active_rows, last_id in rows:
+        seconds = (active_rows or 0) * sample_interval_seconds
+        page.append(
+            WindowTitleRow(
+                window_title=title or "",
+                active_seconds=seconds,
+                share_of_app=(seconds / app.active_seconds) if app.active_seconds else 0.0,
+                last_seen_utc=last_seen.get(last_id),
+            )
+        )
+    next_key = (rows[-1][1] or 0, rows[-1][0] or "") if len(rows) >= limit else None
+    return page, next_key
+
+
+def _read_title_counts_page(
+    conn: sqlite3.Connection,
+    db_path: str,
+    app_name: str,
+    start_utc: datetime,
+    end_utc: datetime,
+    limit: int,
+    after: TitlePageKey | None,
+) -> list[_TitleCounts]:
+    start_iso = start_utc.isoformat()
+    end_iso = end_utc.isoformat()
+    if _begin_rollup_only(conn, db_path, start_utc, end_utc):
+        active, title = after if after is not None else (None, "")
+        cur = conn.execute(
+            _ROLLUP_TITLE_COUNTS
+            + """
+            HAVING ? IS NULL OR SUM(active_rows) < ? OR (SUM(active_rows) = ? AND window_title > ?)
+            ORDER BY SUM(active_rows) DESC, window_title ASC
+            LIMIT ?;
+            """,
+            (app_name, bucket_key(start_utc), bucket_key(end_utc), active, active, active, title, limit),
+        )
+        return cur.fetchall()
+
+    if is_aligned(start_utc) and is_aligned(end_utc):
+        covered = begin_read(conn, db_path)
+        rows = conn.execute(
+            _ROLLUP_TITLE_COUNTS + ";", (app_name, bucket_key(start_utc), bucket_key(end_utc))
+        ).fetchall()
+        rows += conn.execute(
+            _RAW_TITLE_COUNTS.format(where="id > ? AND timestamp_utc >= ? AND timestamp_utc < ?"),
+            (covered, start_iso, end_iso, app_name),
+        ).fetchall()
+    else:
+        rows = conn.execute(
+            _RAW_TITLE_COUNTS.format(where="timestamp_utc >= ? AND timestamp_utc < ?"),
+            (start_iso, end_iso, app_name),
+        ).fetchall()
+
+    merged: dict[str, list[int]] = {}
+    for title, active_rows, last_id in rows:
+        current = merged.setdefault(title or "", [0, 0])
+        current[0] += active_rows or 0
+        current[1] = max(current[1], last_id or 0)
+    ordered = sorted(merged.items(), key=lambda item: (-item[1][0], item[0]))
+    if after is not None:
+        key = (-after[0], after[1])
+        ordered = [item for item in ordered if (-item[1][0], item[0]) > key]
+    return [(title, active_rows, last_id) for title, (active_rows, last_id) in ordered[:limit]]
+
+
+def _event_timestamps(conn: sqlite3.Connection, event_ids: list[int]) -> dict[int, datetime]:
+    if not event_ids:
+        return {}
+    placeholders = ", ".join("?" for _ in event_ids)
+    result = {}
+    for event_id, timestamp in conn.execute(
+        f"SELECT id, timestamp_utc FROM events WHERE id IN ({placeholders});", event_ids
+    ):
+        try:
+            result[event_id] = datetime.fromisoformat(timestamp)
+        except ValueError:
+            continue
+    return result
@@ -0,0 +1,276 @@
+"""
+Свертка событий по 15-минутным интервалам и приложениям (usage_rollup) и
+по заголовкам окон внутри приложений (title_rollup). Статистика за
+период, границы которого кратны 15 минутам (локальные сутки в любом
+часовом поясе), суммирует строки свертки вместо миллионов событий, и ее
+стоимость зависит от длины периода в интервалах, а не от частоты опроса.
+
+Запись событий свертку не трогает: она догоняется при чтении по id
+событий (rollup_state.max_event_id — последнее учтенное). Небольшое
+отставание закрывается тем же запросом, большое (старая БД) — фоновым
+потоком частями, а пока он идет, неучтенный хвост читается из events.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+BUCKET_MINUTES = 15
+# Сколько событий догоняется прямо в запросе статистики.
+READ_CATCH_UP_ROWS = 50_000
+BACKFILL_CHUNK_ROWS = 200_000
+# Пауза между частями фонового догона, чтобы запись тиков не ждала.
+BACKFILL_PAUSE_SECONDS = 0.05
+# Сколько раз подряд фоновый догон ждет занятую БД, прежде чем сдаться.
+BACKFILL_MAX_STALLS = 5
+BACKFILL_STALL_SECONDS = 1.0
+CONNECT_TIMEOUT_SECONDS = 5.0
+
+_BUCKET_SQL = (
+    "substr(timestamp_utc, 1, 14) || "
+    f"printf('%02d', CAST(substr(timestamp_utc, 15, 2) AS INTEGER) / {BUCKET_MINUTES} * {BUCKET_MINUTES})"
+)
+
+# Последний непустой заголовок берется по id события, а не по алфавиту:
+# MAX(last_title_id) в запросе по свертке выбирает и его заголовок.
+_CATCH_UP = f"""
+    INSERT INTO usage_rollup (
+        bucket, app_name, total_rows, active_rows, work_rows, distract_rows,
+        last_title_id, last_window_title
+    )
+    SELECT
+        grouped.bucket,
+        grouped.app_name,
+        grouped.total_rows,
+        grouped.active_rows,
+        grouped.work_rows,
+        grouped.distract_rows,
+        COALESCE(grouped.last_title_id, 0),
+        COALESCE(titled.window_title, '')
+    FROM (
+        SELECT
+            {_BUCKET_SQL} AS bucket,
+            COALESCE(app_name, '') AS app_name,
+            COUNT(*) AS total_rows,
+            SUM(CASE WHEN user_active = 1 THEN 1 ELSE 0 END) AS active_rows,
+            SUM(CASE WHEN user_active = 1 AND is_work_app = 1 THEN 1 ELSE 0 END) AS work_rows,
+            SUM(CASE WHEN user_active = 1 AND is_distracting_app = 1 THEN 1 ELSE 0 END) AS distract_rows,
+            MAX(CASE WHEN window_title <> '' THEN id END) AS last_title_id
+        FROM events
+        WHERE id > ? AND id <= ?
+        GROUP BY 1, 2
+    ) AS grouped
+    LEFT JOIN events AS titled ON titled.id = grouped.last_title_id
+    WHERE 1
+    ON CONFLICT (bucket, app_name) DO UPDATE SET
+        total_rows = total_rows + excluded.total_rows,
+        active_rows = active_rows + excluded.active_rows,
+        work_rows = work_rows + excluded.work_rows,
+        distract_rows = distract_rows + excluded.distract_rows,
+        last_window_title = CASE
+            WHEN excluded.last_title_id > last_title_id THEN excluded.last_window_title
+            ELSE last_window_title
+        END,
+        last_title_id = MAX(last_title_id, excluded.last_title_id);
+"""
+
+# Активное время по заголовкам окон для разбивки приложения.
+_CATCH_UP_TITLES = f"""
+    INSERT INTO title_rollup (app_name, bucket, window_title, active_rows, last_event_id)
+    SELECT
+        COALESCE(app_name, ''),
+        {_BUCKET_SQL},
+        COALESCE(window_title, ''),
+        COUNT(*),
+        MAX(id)
+    FROM events
+    WHERE id > ? AND id <= ? AND user_active = 1
+    GROUP BY 1, 2, 3
+    ON CONFLICT (app_name, bucket, window_title) DO UPDATE SET
+        active_rows = active_rows + excluded.active_rows,
+        last_event_id = MAX(last_event_id, excluded.last_event_id);
+"""
+
+
+# Заголовки окон для поиска (storage.title_search) заполняются вместе со
+# сверткой, от того же rollup_state.
+_CATCH_UP_WINDOW_TITLES = """
+    INSERT OR IGNORE INTO window_titles (app_name, window_title)
+    SELECT DISTINCT COALESCE(app_name, ''), window_title
+    FROM events
+    WHERE id > ? AND id <= ? AND window_title <> '';
+"""
+
+
+def init_rollup(cur: sqlite3.Cursor) -> None:
+    """Вызывается до init_title_search: та создает window_titles."""
+    tables = {
+        row[0] for row in cur.execute("SELECT name FROM sqlite_master WHERE type = 'table';")
+    }
+    columns = {row[1] for row in cur.execute("PRAGMA table_info(usage_rollup);")}
+    if "rollup_state" in tables and (
+        "last_title_id" not in columns or "window_titles" not in tables
+    ):
+        # Свертка прежней версии (заголовок по алфавиту, без заголовков для
+        # поиска): строим заново.
+        for table in ("usage_rollup", "title_rollup", "rollup_state"):
+            cur.execute(f"DROP TABLE IF EXISTS {table};")
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS usage_rollup (
+            bucket TEXT NOT NULL,
+            app_name TEXT NOT NULL,
+            total_rows INTEGER NOT NULL,
+            active_rows INTEGER NOT NULL,
+            work_rows INTEGER NOT NULL,
+            distract_rows INTEGER NOT NULL,
+            last_title_id INTEGER NOT NULL,
+            last_window_title TEXT NOT NULL,
+            PRIMARY KEY (bucket, app_name)
+        ) WITHOUT ROWID;
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS title_rollup (
+            app_name TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            window_title TEXT NOT NULL,
+            active_rows INTEGER NOT NULL,
+            last_event_id INTEGER NOT NULL,
+            PRIMARY KEY (app_name, bucket, window_title)
+        ) WITHOUT ROWID;
+        """
+    )
+    # Поиск по заголовкам суммирует конкретные пары (приложение, заголовок).
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS title_rollup_by_title
+        ON title_rollup (app_name, window_title, bucket);
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rollup_state (
+            name TEXT PRIMARY KEY,
+            max_event_id INTEGER NOT NULL
+        );
+        """
+    )
+
+
+def is_aligned(moment: datetime) -> bool:
+    return moment.tzinfo is None and moment.second == 0 and moment.microsecond == 0 and moment.minute % BUCKET_MINUTES == 0
+
+
+def bucket_key(moment: datetime) -> str:
+    """Ключ интервала в том же виде, что строит _BUCKET_SQL."""
+    return f"{moment:%Y-%m-%dT%H:%M}"
+
+
+def covered_event_id(cur: sqlite3.Cursor) -> int:
+    row = cur.execute("SELECT max_event_id FROM rollup_state WHERE name = 'events';").fetchone()
+    return int(row[0]) if row else 0
+
+
+def catch_up(conn: sqlite3.Connection, max_rows: int | None = READ_CATCH_UP_ROWS) -> tuple[int, bool]:
+    """
+    Учитывает в свертке не больше max_rows новых событий (None — все).
+    Возвращает (последний учтенный id, догнала ли свертка таблицу).
+    """
+    cur = conn.cursor()
+    covered = covered_event_id(cur)
+    last = cur.execute("SELECT COALESCE(MAX(id), 0) FROM events;").fetchone()[0]
+    if last <= covered:
+        return covered, True
+    try:
+        # IMMEDIATE: два догона не посчитают одни и те же события дважды.
+        cur.execute("BEGIN IMMEDIATE;")
+        covered = covered_event_id(cur)
+        upto = last if max_rows is None else min(last, covered + max_rows)
+        if upto > covered:
+            cur.execute(_CATCH_UP, (covered, upto))
+            cur.execute(_CATCH_UP_TITLES, (covered, upto))
+            cur.execute(_CATCH_UP_WINDOW_TITLES, (covered, upto))
+            cur.execute(
+                """
+                INSERT INTO rollup_state (name, max_event_id) VALUES ('events', ?)
+                ON CONFLICT (name) DO UPDATE SET max_event_id = excluded.max_event_id;
+                """,
+                (upto,),
+            )
+        conn.commit()
+    except sqlite3.OperationalError:
+        # БД занята дольше таймаута или открыта только на чтение: хвост
+        # прочитается из events.
+        if conn.in_transaction:
+            conn.rollback()
+        return covered, False
+    return max(covered, upto), upto >= last
+
+
+def begin_read(conn: sqlite3.Connection, db_path: str) -> int:
+    """
+    Догоняет небольшое отставание (большое отдает фоновому потоку) и
+    открывает транзакцию чтения. Возвращает последний учтенный id: свертку
+    и хвост events после него нужно читать в этой же транзакции, иначе
+    фоновый догон между запросами посчитает события дважды.
+    """
+    cur = conn.cursor()
+    covered = covered_event_id(cur)
+    last = cur.execute("SELECT COALESCE(MAX(id), 0) FROM events;").fetchone()[0]
+    if last - covered <= READ_CATCH_UP_ROWS:
+        catch_up(conn, None)
+    else:
+        ensure_backfill(db_path)
+    cur.execute("BEGIN;")
+    return covered_event_id(cur)
+
+
+_backfills: dict[str, threading.Thread] = {}
+_backfills_lock = threading.Lock()
+
+
+def ensure_backfill(db_path: str) -> None:
+    """Запускает фоновый догон свертки для db_path, если он еще не идет."""
+    with _backfills_lock:
+        thread = _backfills.get(db_path)
+        if thread is not None and thread.is_alive():
+            return
+        thread = threading.Thread(
+            target=_backfill, args=(db_path,), name="FocusMeterRollupBackfill", daemon=True
+        )
+        _backfills[db_path] = thread
+        thread.start()
+
+
+def _backfill(db_path: str) -> None:
+    previous = -1
+    stalls = 0
+    while True:
+        try:
+            conn = sqlite3.connect(db_path, timeout=CONNECT_TIMEOUT_SECONDS)
+        except sqlite3.Error:
+            return
+        try:
+            covered, done = catch_up(conn, BACKFILL_CHUNK_ROWS)
+        except sqlite3.Error:
+            return
+        finally:
+            conn.close()
+        if done:
+            return
+        if covered == previous:
+            # БД занята долгим чтением или открыта только на чтение; во
+            # втором случае следующее чтение статистики запустит догон снова.
+            stalls += 1
+            if stalls >= BACKFILL_MAX_STALLS:
+                return
+            time.sleep(BACKFILL_STALL_SECONDS)
+            continue
+        previous = covered
+        stalls = 0
+        time.sleep(BACKFILL_PAUSE_SECONDS)
@@ -0,0 +1,292 @@
+"""
+Полнотекстовый поиск по заголовкам окон. Индексируются не события, а
+различные пары (приложение, заголовок) из window_titles: их на порядки
+меньше. Новые пары добавляет insert_event, старые события — догон свертки
+(в том числе фоновый), а FTS5-таблица title_search обновляется триггером.
+Время по найденным заголовкам берется из title_rollup.
+
+Если SQLite собран без FTS5, поиск идет через LIKE по window_titles.
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+
+from storage.rollup import (
+    CONNECT_TIMEOUT_SECONDS,
+    begin_read,
+    bucket_key,
+    is_aligned,
+)
+
+# Больше найденных заголовков не суммируем: запрос слишком общий.
+MAX_MATCHED_TITLES = 5000
+TOP_TITLES = 5
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+_fts5_available: bool | None = None
+
+
+def fts5_available() -> bool:
+    global _fts5_available
+    if _fts5_available is None:
+        conn = sqlite3.connect(":memory:")
+        try:
+            conn.execute("CREATE VIRTUAL TABLE probe USING fts5(text);")
+            _fts5_available = True
+        except sqlite3.OperationalError:
+            _fts5_available = False
+        finally:
+            conn.close()
+    return _fts5_available
+
+
+def init_title_search(cur: sqlite3.Cursor) -> None:
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS window_titles (
+            id INTEGER PRIMARY KEY,
+            app_name TEXT NOT NULL,
+            window_title TEXT NOT NULL,
+            UNIQUE (app_name, window_title)
+        );
+        """
+    )
+    if not fts5_available():
+        return
+    exists = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'title_search';"
+    ).fetchone()
+    if exists:
+        return
+    cur.execute(
+        """
+        CREATE VIRTUAL TABLE title_search USING fts5(
+            window_title,
+            content = 'window_titles',
+            content_rowid = 'id',
+            prefix = '2 3'
+        );
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS window_titles_search_insert
+        AFTER INSERT ON window_titles
+        BEGIN
+            INSERT INTO title_search (rowid, window_title) VALUES (new.id, new.window_title);
+        END;
+        """
+    )
+    # window_titles могли заполниться, пока SQLite был без FTS5.
+    cur.execute("INSERT INTO title_search (title_search) VALUES ('rebuild');")
+
+
+def fts_query(text: str) -> str:
+    """
+    Запрос пользователя как FTS5-выражение: каждое слово — префикс, все
+    слова обязательны. «invoice.xlsx» ищет заголовки со словами invoice и
+    xlsx*, «PR #123» — со словами pr и 123*.
+    """
+    terms = _TERM_RE.findall(text.lower())
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+@dataclass
+class TitleSearchResult:
+    query: str
+    active_seconds: float = 0.0
+    days: list[date] = field(default_factory=list)
+    # (app_name, seconds) и (app_name, window_title, seconds) по убыванию.
+    apps: list[tuple[str, float]] = field(default_factory=list)
+    titles: list[tuple[str, str, float]] = field(default_factory=list)
+    matched_titles: int = 0
+    truncated: bool = False
+    last_seen_utc: datetime | None = None
+    index_complete: bool = True
+
+
+def _match_titles(conn: sqlite3.Connection, text: str) -> list[tuple[str, str]]:
+    if fts5_available():
+        expression = fts_query(text)
+        if not expression:
+            return []
+        cur = conn.execute(
+            """
+            SELECT w.app_name, w.window_title
+            FROM title_search
+            JOIN window_titles AS w ON w.id = title_search.rowid
+            WHERE title_search MATCH ?
+            LIMIT ?;
+            """,
+            (expression, MAX_MATCHED_TITLES + 1),
+        )
+    else:
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        cur = conn.execute(
+            """
+            SELECT app_name, window_title FROM window_titles
+            WHERE window_title LIKE ? ESCAPE '\\'
+            LIMIT ?;
+            """,
+            (pattern, MAX_MATCHED_TITLES + 1),
+        )
+    return cur.fetchall()
+
+
+def _day_modifier(utc_offset: timedelta) -> str:
+    return f"{int(utc_offset.total_seconds() // 60):+d} minutes"
+
+
+def search_titles(
+    db_path: str,
+    text: str,
+    start_utc: datetime,
+    end_utc: datetime,
+    sample_interval_seconds: float,
+    utc_offset: timedelta | None = None,
+) -> TitleSearchResult:
+    """
+    Активное время за период по заголовкам, подходящим под text: всего, по
+    дням (локальным, со сдвигом utc_offset), по приложениям и заголовкам.
+    Таблицы должны быть созданы (storage.db.search_window_titles).
+    """
+    result = TitleSearchResult(query=text.strip())
+    if not result.query:
+        return result
+    if utc_offset is None:
+        utc_offset = datetime.now().astimezone().utcoffset() or timedelta(0)
+
+    conn = sqlite3.connect(db_path, timeout=CONNECT_TIMEOUT_SECONDS)
+    try:
+        # Заголовки старых событий попадают в индекс вместе со сверткой:
+        # большое отставание догоняет фоновый поток, и до его конца
+        # результат неполон.
+        covered = begin_read(conn, db_path)
+        last = conn.execute("SELECT COALESCE(MAX(id), 0) FROM events;").fetchone()[0]
+        result.index_complete = covered >= last
+        matches = _match_titles(conn, result.query)
+        result.truncated = len(matches) > MAX_MATCHED_TITLES
+        matches = matches[:MAX_MATCHED_TITLES]
+        result.matched_titles = len(matches)
+        if matches:
+            rows = _read_match_counts(conn, covered, matches, start_utc, end_utc, utc_offset)
+            _summarize(conn, result, rows, sample_interval_seconds)
+    finally:
+        conn.close()
+    return result
+
+
+# (app_name, window_title, local_day, active_rows, last_event_id)
+_MatchCounts = tuple[str, str, str, int, int]
+
+
+def _read_match_counts(
+    conn: sqlite3.Connection,
+    covered: int,
+    matches: list[tuple[str, str]],
+    start_utc: datetime,
+    end_utc: datetime,
+    utc_offset: timedelta,
+) -> list[_MatchCounts]:
+    modifier = _day_modifier(utc_offset)
+    start_iso = start_utc.isoformat()
+    end_iso = end_utc.isoformat()
+    titles = sorted({title for _app, title in matches})
+    title_marks = ", ".join("?" for _ in titles)
+    raw = f"""
+        SELECT
+            COALESCE(app_name, ''),
+            window_title,
+            date(substr(timestamp_utc, 1, 19), ?),
+            COUNT(*),
+            MAX(id)
+        FROM events
+        WHERE {{where}} AND user_active = 1 AND window_title IN ({title_marks})
+        GROUP BY 1, 2, 3;
+    """
+
+    if not (is_aligned(start_utc) and is_aligned(end_utc)):
+        rows = conn.execute(
+            raw.format(where="timestamp_utc >= ? AND timestamp_utc < ?"),
+            (modifier, start_iso, end_iso, *titles),
+        ).fetchall()
+    else:
+        values = ", ".join("(?, ?)" for _ in matches)
+        rows = conn.execute(
+            f"""
+            WITH matched (app_name, window_title) AS (VALUES {values})
+            SELECT
+                t.app_name,
+                t.window_title,
+                date(t.bucket, ?),
+                SUM(t.active_rows),
+                MAX(t.last_event_id)
+            FROM matched
+            -- Без статистики планировщик берет первичный ключ и перебирает
+            -- все заголовки приложения для каждой найденной пары.
+            JOIN title_rollup AS t INDEXED BY title_rollup_by_title
+                ON t.app_name = matched.app_name AND t.window_title = matched.window_title
+            WHERE t.bucket >= ? AND t.bucket < ?
+            GROUP BY 1, 2, 3;
+            """,
+            (
+                *(value for pair in matches for value in pair),
+                modifier,
+                bucket_key(start_utc),
+                bucket_key(end_utc),
+            ),
+        ).fetchall()
+        rows += conn.execute(
+            raw.format(where="id > ? AND timestamp_utc >= ? AND timestamp_utc < ?"),
+            (modifier, covered, start_iso, end_iso, *titles),
+        ).fetchall()
+
+    # IN по заголовкам не смотрит на приложение: лишние пары отбрасываем.
+    wanted = set(matches)
+    return [row for row in rows if (row[0], row[1]) in wanted]
+
+
+def _summarize(
+    conn: sqlite3.Connection,
+    result: TitleSearchResult,
+    rows: list[_MatchCounts],
+    sample_interval_seconds: float,
+) -> None:
+    by_app: dict[str, int] = {}
+    by_title: dict[tuple[str, str], int] = {}
+    days: set[str] = set()
+    last_id = 0
+    for app_name, title, day, active_rows, event_id in rows:
+        active_rows = active_rows or 0
+        if active_rows <= 0:
+            continue
+        by_app[app_name] = by_app.get(app_name, 0) + active_rows
+        by_title[(app_name, title)] = by_title.get((app_name, title), 0) + active_rows
+        if day:
+            days.add(day)
+        last_id = max(last_id, event_id or 0)
+
+    result.active_seconds = sum(by_app.values()) * sample_interval_seconds
+    result.days = sorted(date.fromisoformat(day) for day in days)
+    result.apps = [
+        (app_name, active_rows * sample_interval_seconds)
+        for app_name, active_rows in sorted(by_app.items(), key=lambda item: (-item[1], item[0]))
+    ]
+    result.titles = [
+        (app_name, title, active_rows * sample_interval_seconds)
+        for (app_name, title), active_rows in sorted(
+            by_title.items(), key=lambda item: (-item[1], item[0])
+        )[:TOP_TITLES]
+    ]
+    if last_id:
+        row = conn.execute("SELECT timestamp_utc FROM events WHERE id = ?;", (last_id,)).fetchone()
+        if row:
+            try:
+                result.last_seen_utc = datetime.fromisoformat(row[0])
+            except ValueError:
+                pass
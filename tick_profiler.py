@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+
+from histogram import RollingHistogram, geometric_bounds
+
+PHASE_CONFIG = "config"
+PHASE_INPUT = "input"
+PHASE_WINDOW = "window"
+PHASE_OBSERVE = "observe"
+PHASE_CLASSIFY = "classify"
+PHASE_DB = "db"
+PHASE_PUBLISH = "publish"
+PHASE_NOTIFY = "notify"
+PHASE_SINKS = "sinks"
+PHASE_TOTAL = "total"
+
+TICK_PHASES = (
+    PHASE_CONFIG,
+    PHASE_INPUT,
+    PHASE_WINDOW,
+    PHASE_OBSERVE,
+    PHASE_CLASSIFY,
+    PHASE_DB,
+    PHASE_PUBLISH,
+    PHASE_NOTIFY,
+    PHASE_SINKS,
+    PHASE_TOTAL,
+)
+
+# От 10 мкс до 10 с с шагом 25%: перцентили точнее, чем по грубой шкале.
+PROFILE_BOUNDS_MS = geometric_bounds(0.01, 10_000.0, 1.25)
+DEFAULT_PROFILE_WINDOW = 600
+
+
+class TickProfiler:
+    """
+    Время фаз одного тика в скользящих гистограммах. Выключенный
+    профайлер стоит одну проверку атрибута на фазу.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        window: int = DEFAULT_PROFILE_WINDOW,
+        timer: Callable[[], float] = time.perf_counter,
+    ):
+        self.enabled = enabled
+        self._timer = timer
+        self._histograms = {
+            phase: RollingHistogram(window, PROFILE_BOUNDS_MS) for phase in TICK_PHASES
+        }
+        self._active = False
+        self._tick_started = 0.0
+        self._phase_started = 0.0
+
+    def reset(self) -> None:
+        for histogram in self._histograms.values():
+            histogram.reset()
+
+    def begin_tick(self) -> None:
+        # Переключение enabled из другого потока вступает в силу со следующего тика.
+        self._active = self.enabled
+        if self._active:
+            self._tick_started = self._phase_started = self._timer()
+
+    def mark(self, phase: str) -> None:
+        """Закрыть фазу: время с предыдущей отметки уходит в ее гистограмму."""
+        if self._active:
+            now = self._timer()
+            self._histograms[phase].record((now - self._phase_started) * 1000)
+            self._phase_started = now
+
+    def end_tick(self) -> None:
+        if self._active:
+            now = self._timer()
+            self._histograms[PHASE_TOTAL].record((now - self._tick_started) * 1000)
+            self._active = False
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        return {phase: self._histograms[phase].summary() for phase in TICK_PHASES}
+
+    def format_summary(self) -> str:
+        parts = []
+        for phase, stats in self.summary().items():
+            if stats["count"]:
+                parts.append(
+                    f"{phase}={stats['p50_ms']:.2f}/{stats['p95_ms']:.2f}/{stats['max_ms']:.2f}"
+                )
+        if not parts:
+            return "tick profile: no samples"
+        return "tick profile p50/p95/max ms: " + " ".join(parts)
+
+    def format_table(self) -> str:
+        lines = [f"{'phase':<10}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+        for phase, stats in self.summary().items():
+            lines.append(
+                f"{phase:<10}{stats['count']:>8}{stats['p50_ms']:>10.3f}"
+                f"{stats['p95_ms']:>10.3f}{stats['max_ms']:>10.3f}"
+            )
+        return "\n".join(lines)
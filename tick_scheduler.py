@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from histogram import LatencyHistogram
+
+
+@dataclass(frozen=True)
+class TickTiming:
+    deadline: float
+    started: float
+    jitter_ms: float
+    missed: int
+
+    @property
+    def late(self) -> bool:
+        """Тик опоздал хотя бы на один целый интервал."""
+        return self.missed > 0
+
+
+@dataclass
+class SchedulerStats:
+    ticks: int = 0
+    overruns: int = 0
+    missed_deadlines: int = 0
+
+
+class TickScheduler:
+    """
+    Планировщик тиков по абсолютным дедлайнам монотонных часов: время
+    самого тика не сдвигает следующие. Ожидание идет на Event, так что
+    stop/pause будят цикл сразу. Если тик не уложился в интервал,
+    пропущенные дедлайны не догоняются пачкой, а отбрасываются.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float,
+        monotonic: Callable[[], float],
+        wait: Callable[[threading.Event, float], bool],
+        wake_event: threading.Event | None = None,
+    ):
+        self._interval = max(0.001, float(interval_seconds))
+        self._monotonic = monotonic
+        self._wait = wait
+        self.wake_event = wake_event or threading.Event()
+        self._next_deadline = monotonic()
+        self.jitter = LatencyHistogram()
+        self.overrun = LatencyHistogram()
+        self.stats = SchedulerStats()
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    def set_interval(self, interval_seconds: float) -> None:
+        interval = max(0.001, float(interval_seconds))
+        if interval != self._interval:
+            self._next_deadline += interval - self._interval
+            self._interval = interval
+
+    def reset(self) -> None:
+        """Следующий тик сразу, например после снятия паузы."""
+        self._next_deadline = self._monotonic()
+
+    def wake(self) -> None:
+        self.wake_event.set()
+
+    def wait_next(self, should_abort: Callable[[], bool]) -> TickTiming | None:
+        """
+        Дождаться следующего дедлайна. Возвращает None, если ожидание
+        прервано и should_abort() вернул True.
+        """
+        while True:
+            if should_abort():
+                return None
+            remaining = self._next_deadline - self._monotonic()
+            if remaining <= 0:
+                break
+            if self._wait(self.wake_event, remaining):
+                self.wake_event.clear()
+
+        started = self._monotonic()
+        deadline = self._next_deadline
+        lateness = started - deadline
+        missed = int(lateness // self._interval)
+        if missed:
+            self.stats.overruns += 1
+            self.stats.missed_deadlines += missed
+            self.overrun.record(lateness * 1000)
+        self.stats.ticks += 1
+        self.jitter.record(lateness * 1000)
+        self._next_deadline = deadline + (missed + 1) * self._interval
+        return TickTiming(
+            deadline=deadline,
+            started=started,
+            jitter_ms=lateness * 1000,
+            missed=missed,
+        )
+
+    def summary(self) -> dict[str, object]:
+        return {
+            "interval_seconds": self._interval,
+            "ticks": self.stats.ticks,
+            "overruns": self.stats.overruns,
+            "missed_deadlines": self.stats.missed_deadlines,
+            "jitter": self.jitter.summary(),
+            "overrun": self.overrun.summary(),
+        }
@@ -1,39 +1,63 @@
 from __future__ import annotations
 
 import platform
+import threading
 from dataclasses import dataclass
 from typing import Optional
 
-import psutil
-
 _SYSTEM = platform.system()
 
-if _SYSTEM == "Windows":
-    try:
-        import win32gui
-        import win32process
-    except ImportError:
-        win32gui = None
-        win32process = None
-else:
-    win32gui = None
-    win32process = None
-
-if _SYSTEM == "Darwin":
-    try:
-        from AppKit import NSWorkspace
-        import Quartz
-    except ImportError:
-        NSWorkspace = None
-        Quartz = None
-else:
-    NSWorkspace = None
-    Quartz = None
+# psutil и платформенные модули стоят десятки миллисекунд импорта, поэтому
+# грузятся при первом опросе окон, а не при запуске приложения.
+psutil = None
+win32gui = None
+win32process = None
+NSWorkspace = None
+Quartz = None
+gw = None
+_backends_loaded = False
+_backends_lock = threading.Lock()
+
+
+def _load_backends() -> None:
+    global psutil, win32gui, win32process, NSWorkspace, Quartz, gw, _backends_loaded
+    if _backends_loaded:
+        return
+    # Окна опрашивают и GUI, и поток трекера; флаг ставится после импорта.
+    with _backends_lock:
+        if _backends_loaded:
+            return
+        import psutil as _psutil
+
+        psutil = _psutil
+
+        if _SYSTEM == "Windows":
+            try:
+                import win32gui as _win32gui
+                import win32process as _win32process
+            except ImportError:
+                pass
+            else:
+                win32gui = _win32gui
+                win32process = _win32process
+
+        if _SYSTEM == "Darwin":
+            try:
+                from AppKit import NSWorkspace as _NSWorkspace
+                import Quartz as _Quartz
+            except ImportError:
+                pass
+            else:
+                NSWorkspace = _NSWorkspace
+                Quartz = _Quartz
 
-try:
-    import pygetwindow as gw
-except ImportError:
-    gw = None
+        try:
+            import pygetwindow as _gw
+        except ImportError:
+            pass
+        else:
+            gw = _gw
+        _backends_loaded = True
 
 
 @dataclass(frozen=True)
@@ -338,6 +362,7 @@ def _list_open_windows_fallback(limit: int) -> list[WindowInfo]:
 
 
 def get_active_window_info() -> WindowInfo:
+    _load_backends()
     if _SYSTEM == "Windows":
         info = _get_active_window_windows()
         if info.process_name or info.window_title:
@@ -352,6 +377,7 @@ def get_active_window_info() -> WindowInfo:
 
 
 def list_open_windows(limit: int = 100) -> list[WindowInfo]:
+    _load_backends()
     if _SYSTEM == "Windows":
         windows = _list_open_windows_windows(limit)
         if windows:
@@ -0,0 +1,156 @@
+"""
+Подменные источники данных для TrackerEngine: часы с модельным временем,
+активное окно и ввод без обращения к ОС. Задержка платформенных вызовов
+и сценарии переключений задаются параметрами, все детерминировано seed.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+
+from tracker.active_window import WindowInfo
+
+DEFAULT_FAKE_WINDOWS = (
+    WindowInfo("code", "engine.py - focusmeter - Visual Studio Code", 101, "/usr/bin/code"),
+    WindowInfo("firefox", "Issue #42 · GitHub — Mozilla Firefox", 102, "/usr/bin/firefox"),
+    WindowInfo("terminal", "bash — ~/src/focusmeter", 103, "/usr/bin/terminal"),
+    WindowInfo("telegram", "Telegram (3)", 104, "/usr/bin/telegram"),
+)
+
+
+def _simulate_latency(seconds: float) -> None:
+    if seconds > 0:
+        time.sleep(seconds)
+
+
+class SimulatedClock:
+    """
+    Часы с модельным временем: wait() сдвигает время на timeout, поэтому
+    цикл движка прокручивает тики так быстро, как позволяет CPU. При
+    speedup > 0 ожидание все же длится timeout / speedup реальных секунд,
+    чтобы, например, GUI успевал обрабатывать события.
+    """
+
+    def __init__(
+        self,
+        start: datetime = datetime(2025, 1, 1, 9, 0),
+        speedup: float = 0.0,
+    ):
+        self._start = start
+        self._speedup = speedup
+        self._elapsed = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return self._elapsed
+
+    def now(self) -> datetime:
+        return self._start + timedelta(seconds=self._elapsed)
+
+    def monotonic(self) -> float:
+        return self._elapsed
+
+    def wait(self, event: threading.Event, timeout: float) -> bool:
+        if event.is_set():
+            return True
+        if self._speedup > 0 and event.wait(max(0.0, timeout) / self._speedup):
+            return True
+        self._elapsed += max(0.0, timeout)
+        return False
+
+    def advance(self, seconds: float) -> None:
+        self._elapsed += seconds
+
+
+class FakeWindowProbe:
+    """
+    Замена get_active_window_info. Окно меняется раз в dwell_seconds
+    модельного времени: по кругу или, при random_dwell, в случайном
+    порядке с экспоненциальной длительностью.
+    """
+
+    def __init__(
+        self,
+        clock: SimulatedClock,
+        windows: Sequence[WindowInfo] = DEFAULT_FAKE_WINDOWS,
+        dwell_seconds: float = 30.0,
+        random_dwell: bool = False,
+        latency_seconds: float = 0.0,
+        seed: int = 1,
+    ):
+        if not windows:
+            raise ValueError("windows must not be empty")
+        self._clock = clock
+        self._windows = tuple(windows)
+        self._dwell = max(0.001, float(dwell_seconds))
+        self._random = random.Random(seed) if random_dwell else None
+        self._latency = latency_seconds
+        self._index = 0
+        self._switch_at = self._next_dwell()
+        self.calls = 0
+        self.switches = 0
+
+    def _next_dwell(self) -> float:
+        if self._random is None:
+            return self._clock.monotonic() + self._dwell
+        return self._clock.monotonic() + self._random.expovariate(1 / self._dwell)
+
+    def __call__(self) -> WindowInfo:
+        _simulate_latency(self._latency)
+        self.calls += 1
+        if self._clock.monotonic() >= self._switch_at:
+            if self._random is None:
+                self._index = (self._index + 1) % len(self._windows)
+            else:
+                self._index = self._random.randrange(len(self._windows))
+            self._switch_at = self._next_dwell()
+            self.switches += 1
+        return self._windows[self._index]
+
+
+class FakeInputTracker:
+    """
+    Замена InputActivityTracker с тем же интерфейсом start/stop/consume_stats.
+    Пользователь циклически active_seconds работает (inputs_per_second
+    событий ввода), затем idle_seconds отсутствует.
+    """
+
+    def __init__(
+        self,
+        clock: SimulatedClock,
+        active_seconds: float = 600.0,
+        idle_seconds: float = 120.0,
+        inputs_per_second: float = 4.0,
+        latency_seconds: float = 0.0,
+    ):
+        self._clock = clock
+        self._active = max(0.0, active_seconds)
+        self._cycle = self._active + max(0.0, idle_seconds)
+        self._rate = inputs_per_second
+        self._latency = latency_seconds
+        self._origin = clock.monotonic()
+        self._last_poll = self._origin
+        self.started = False
+
+    def start(self) -> None:
+        self.started = True
+
+    def stop(self) -> None:
+        self.started = False
+
+    def consume_stats(self) -> tuple[datetime, int]:
+        _simulate_latency(self._latency)
+        now = self._clock.now()
+        elapsed = self._clock.monotonic()
+        since_poll = elapsed - self._last_poll
+        self._last_poll = elapsed
+        if self._cycle <= 0:
+            return now, 0
+        position = (elapsed - self._origin) % self._cycle
+        if position < self._active:
+            return now, int(since_poll * self._rate)
+        return now - timedelta(seconds=position - self._active), 0
@@ -6,23 +6,35 @@ import threading
 
 _SYSTEM = platform.system()
 
-if _SYSTEM == "Darwin":
-    try:
-        import Quartz
-    except ImportError:
-        Quartz = None
-else:
-    Quartz = None
-
-if _SYSTEM != "Darwin":
-    try:
-        from pynput import keyboard, mouse
-    except ImportError:
-        keyboard = None
-        mouse = None
-else:
-    keyboard = None
-    mouse = None
+# pynput и Quartz подгружаются при создании трекера (то есть при старте
+# трекинга), а не при импорте модуля.
+Quartz = None
+keyboard = None
+mouse = None
+_backends_loaded = False
+
+
+def _load_backends() -> None:
+    global Quartz, keyboard, mouse, _backends_loaded
+    if _backends_loaded:
+        return
+    _backends_loaded = True
+
+    if _SYSTEM == "Darwin":
+        try:
+            import Quartz as _Quartz
+        except ImportError:
+            pass
+        else:
+            Quartz = _Quartz
+    else:
+        try:
+            from pynput import keyboard as _keyboard, mouse as _mouse
+        except ImportError:
+            pass
+        else:
+            keyboard = _keyboard
+            mouse = _mouse
 
 
 class InputActivityTracker:
@@ -37,6 +49,7 @@ class InputActivityTracker:
     """
 
     def __init__(self):
+        _load_backends()
         self.lock = threading.Lock()
         self.last_input_time = datetime.utcnow()
         self.inputs_since_last_poll = 0
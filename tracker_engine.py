@@ -0,0 +1,678 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+
+from app_rules import RULE_DISTRACTING, RULE_EXCLUDED, RULE_WORK
+from config import CONFIG_PATH, Config, config_changes, read_config
+from file_watcher import FileWatcher
+from histogram import LatencyHistogram
+from live_stats import LiveTotals, RangeStatsCache, local_day_bounds_utc
+from notifier import NOTIFY_BREAK, NOTIFY_IDLE, NotificationDispatcher, get_dispatcher
+from rules_service import AppRulesService
+from storage.db import TimeStats, init_db, insert_event
+from tick_profiler import (
+    PHASE_CLASSIFY,
+    PHASE_CONFIG,
+    PHASE_DB,
+    PHASE_INPUT,
+    PHASE_NOTIFY,
+    PHASE_OBSERVE,
+    PHASE_PUBLISH,
+    PHASE_SINKS,
+    PHASE_WINDOW,
+    TickProfiler,
+)
+from tick_scheduler import TickScheduler
+from tracker.active_window import WindowInfo, get_active_window_info
+from tracker.input_tracker import InputActivityTracker
+
+FATIGUE_RECOVERY_FACTOR = 4.0
+MIN_BREAK_NOTIFY_INTERVAL_SECONDS = 60.0
+PROFILE_SUMMARY_INTERVAL_SECONDS = 60.0
+
+
+@dataclass
+class WorkerSnapshot:
+    timestamp_utc: datetime
+    state: str
+    status_text: str
+    app_name: str
+    window_title: str
+    exe_path: str
+    user_active: bool
+    is_work_app: bool
+    is_distracting_app: bool
+    is_excluded_app: bool
+    idle_seconds: float
+    non_productive_seconds: float
+    fatigue_score: float
+    fatigue_threshold: float
+    idle_notify_seconds: float
+    seconds_to_break: float
+    seconds_to_idle_warning: float
+    paused: bool
+
+
+# Метка времени меняется на каждом тике и сама по себе не повод будить GUI.
+SNAPSHOT_DIFF_FIELDS = tuple(
+    item.name for item in fields(WorkerSnapshot) if item.name != "timestamp_utc"
+)
+
+
+@dataclass(frozen=True)
+class SnapshotDelta:
+    """Новый снимок и имена полей, изменившихся с предыдущего."""
+
+    snapshot: WorkerSnapshot
+    changed: frozenset[str]
+
+
+def diff_snapshots(
+    previous: WorkerSnapshot | None,
+    current: WorkerSnapshot,
+) -> frozenset[str]:
+    if previous is None:
+        return frozenset(SNAPSHOT_DIFF_FIELDS)
+    return frozenset(
+        name
+        for name in SNAPSHOT_DIFF_FIELDS
+        if getattr(previous, name) != getattr(current, name)
+    )
+
+
+def snapshot_to_dict(snapshot: WorkerSnapshot) -> dict[str, object]:
+    payload = asdict(snapshot)
+    payload["timestamp_utc"] = snapshot.timestamp_utc.isoformat()
+    return payload
+
+
+def format_tick_status(snapshot: WorkerSnapshot) -> str:
+    """Отладочная строка тика; строится только тем, кому она нужна."""
+    return " | ".join(
+        [
+            f"state={snapshot.state}",
+            f"idle={int(snapshot.idle_seconds)}s",
+            f"break_in={int(snapshot.seconds_to_break)}s",
+            f"idle_warn_in={int(snapshot.seconds_to_idle_warning)}s",
+            f"app={snapshot.app_name or '-'}",
+            f"title={(snapshot.window_title or '')[:48]!r}",
+        ]
+    )
+
+
+def status_text_for_state(state: str) -> str:
+    mapping = {
+        "work": "В фокусе",
+        "distract": "Отвлекающее приложение",
+        "other": "Активность вне правил",
+        "excluded": "Исключенное приложение",
+        "idle": "Нет активности",
+        "paused": "Пауза",
+        "stopped": "Остановлено",
+    }
+    return mapping.get(state, "Ожидание")
+
+
+def thresholds_for_config(config: Config) -> tuple[float, float]:
+    idle_notify_seconds = (
+        config.idle_warning_minutes * 60
+        if config.idle_warning_minutes > 0
+        else config.idle_threshold_seconds
+    )
+    fatigue_threshold = max(1.0, float(config.break_warning_minutes * 60))
+    return float(idle_notify_seconds), fatigue_threshold
+
+
+class TrackerSink:
+    """
+    Получатель событий движка. Методы вызываются в потоке движка,
+    поэтому GUI-реализации должны перекладывать их в свой поток.
+    """
+
+    def on_started(self) -> None:
+        pass
+
+    def on_stopped(self) -> None:
+        pass
+
+    def on_paused(self, paused: bool) -> None:
+        pass
+
+    def on_status(self, text: str) -> None:
+        pass
+
+    def on_snapshot(self, delta: SnapshotDelta) -> None:
+        pass
+
+    def on_tick(self, snapshot: WorkerSnapshot | None) -> None:
+        """Каждый тик (и каждый цикл ожидания на паузе), даже без изменений."""
+        pass
+
+
+class ConsoleSink(TrackerSink):
+    """Печать событий в терминал для CLI и фонового режима."""
+
+    def __init__(
+        self,
+        printer: Callable[[str], None] = print,
+        verbose: bool = False,
+    ):
+        self._print = printer
+        self._verbose = verbose
+
+    def on_status(self, text: str) -> None:
+        self._print(f"[INFO] {text}")
+
+    def on_snapshot(self, delta: SnapshotDelta) -> None:
+        transition = not delta.changed.isdisjoint(
+            {"state", "app_name", "window_title", "paused"}
+        )
+        if self._verbose or transition:
+            snapshot = delta.snapshot
+            self._print(
+                f"[{snapshot.timestamp_utc.isoformat()}] {format_tick_status(snapshot)}"
+            )
+
+
+class SystemClock:
+    def now(self) -> datetime:
+        return datetime.utcnow()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def wait(self, event: threading.Event, timeout: float) -> bool:
+        return event.wait(timeout)
+
+
+class TrackerEngine:
+    """
+    Цикл трекинга без Qt: опрос ввода и активного окна, классификация,
+    запись события в БД, расчет усталости и уведомления. Источники данных,
+    часы и получатели событий подключаются снаружи, так что один и тот же
+    движок работает под GUI, в CLI и в фоновом режиме.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        rules_service: AppRulesService | None = None,
+        sinks: Iterable[TrackerSink] = (),
+        clock: SystemClock | None = None,
+        window_probe: Callable[[], WindowInfo] = get_active_window_info,
+        input_tracker_factory: Callable[[], InputActivityTracker] = InputActivityTracker,
+        notifier: NotificationDispatcher | None = None,
+        watch_files: bool = False,
+        profile: bool = False,
+    ):
+        self.config = config
+        self.rules_service = rules_service or AppRulesService(config)
+        self.clock = clock or SystemClock()
+        self._sinks: tuple[TrackerSink, ...] = tuple(sinks)
+        self._window_probe = window_probe
+        self._input_tracker_factory = input_tracker_factory
+        self._notifier = notifier
+        self._config_watcher = FileWatcher([CONFIG_PATH]) if watch_files else None
+
+        self._stop_flag = False
+        self._pause_flag = False
+        self._config_changed = False
+        # Новый Config от другого потока; подхватывается в начале тика.
+        self._pending_config: Config | None = None
+        self._running = False
+        self._last_snapshot: WorkerSnapshot | None = None
+        self.today = LiveTotals()
+        self.range_cache = RangeStatsCache()
+        self.profiler = TickProfiler(enabled=profile)
+        # Всегда включенные агрегаты для экспорта метрик.
+        self.tick_duration = LatencyHistogram()
+        self.db_write_duration = LatencyHistogram()
+        self.scheduler = TickScheduler(
+            config.poll_interval_seconds,
+            monotonic=self.clock.monotonic,
+            wait=self.clock.wait,
+        )
+
+    # --- управление -------------------------------------------------------
+
+    def add_sink(self, sink: TrackerSink) -> None:
+        if sink not in self._sinks:
+            self._sinks = (*self._sinks, sink)
+
+    def remove_sink(self, sink: TrackerSink) -> None:
+        self._sinks = tuple(item for item in self._sinks if item is not sink)
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    @property
+    def is_paused(self) -> bool:
+        return self._pause_flag
+
+    @property
+    def last_snapshot(self) -> WorkerSnapshot | None:
+        return self._last_snapshot
+
+    @property
+    def notifier(self) -> NotificationDispatcher:
+        return self._notifier or get_dispatcher()
+
+    def today_totals(self) -> TimeStats:
+        if self._running:
+            return self.today.snapshot()
+        start_utc, end_utc = local_day_bounds_utc()
+        return self.stats(start_utc, end_utc)
+
+    def stats(self, start_utc: datetime, end_utc: datetime) -> TimeStats:
+        """
+        Статистика за период: текущие сутки во время трекинга отдаются из
+        памяти, закрытые периоды из кеша, остальное одним запросом к БД.
+        """
+        if self._running and (start_utc, end_utc) == self.today.bounds:
+            return self.today.snapshot()
+        return self.range_cache.get(
+            db_path=self.config.db_path,
+            start_utc=start_utc,
+            end_utc=end_utc,
+            sample_interval_seconds=self.config.poll_interval_seconds,
+        )
+
+    def stop(self) -> None:
+        self._stop_flag = True
+        self.scheduler.wake()
+
+    def pause(self) -> None:
+        self._pause_flag = True
+        self.scheduler.wake()
+
+    def resume(self) -> None:
+        self._pause_flag = False
+        self.scheduler.wake()
+
+    def notify_config_changed(self, config: Config | None = None) -> None:
+        """
+        Применить настройки на следующем тике без перезапуска. config —
+        новый объект, который движок подхватит целиком (вызывающий больше
+        не меняет его); без него пороги пересчитываются из self.config.
+        """
+        if config is not None:
+            self._pending_config = config
+        self._config_changed = True
+
+    def _adopt_pending_config(self) -> None:
+        # Ссылка подменяется одним присваиванием: тик видит либо старый,
+        # либо новый Config целиком.
+        pending = self._pending_config
+        if pending is not None and pending is not self.config:
+            self.config = pending
+
+    # --- события ------------------------------------------------------------
+
+    def _status(self, text: str) -> None:
+        for sink in self._sinks:
+            sink.on_status(text)
+
+    def _paused_changed(self, paused: bool) -> None:
+        for sink in self._sinks:
+            sink.on_paused(paused)
+
+    def _heartbeat(self) -> None:
+        for sink in self._sinks:
+            sink.on_tick(self._last_snapshot)
+
+    def _publish(self, snapshot: WorkerSnapshot) -> None:
+        changed = diff_snapshots(self._last_snapshot, snapshot)
+        self._last_snapshot = snapshot
+        if not changed:
+            return
+        delta = SnapshotDelta(snapshot, changed)
+        for sink in self._sinks:
+            sink.on_snapshot(delta)
+
+    # --- цикл ---------------------------------------------------------------
+
+    def _reset(self) -> None:
+        self._adopt_pending_config()
+        self._db_path = self.config.db_path
+        self._rules_version = self.rules_service.version
+        self._idle_notify_seconds, self._fatigue_threshold = thresholds_for_config(
+            self.config
+        )
+        self._fatigue_score = 0.0
+        self._non_productive_seconds = 0.0
+        self._last_idle_notification_time: datetime | None = None
+        self._last_break_notification_time: datetime | None = None
+        self._last_observed_signature: tuple[str, str] | None = None
+        self._last_snapshot = None
+
+    def run(self, max_ticks: int | None = None) -> None:
+        """Блокирующий цикл до stop() или до max_ticks выполненных тиков."""
+        self._stop_flag = False
+        self._pause_flag = False
+        self._config_changed = False
+        self._status("Инициализация трекера...")
+        self._reset()
+        init_db(self._db_path)
+        self.today.seed(self._db_path, self.config.poll_interval_seconds)
+
+        activity_tracker = self._input_tracker_factory()
+        activity_tracker.start()
+        if self._notifier is None:
+            self._notifier = get_dispatcher()
+
+        self._running = True
+        for sink in self._sinks:
+            sink.on_started()
+        self._paused_changed(False)
+        self._status("Трекер запущен.")
+
+        scheduler = self.scheduler
+        scheduler.set_interval(self.config.poll_interval_seconds)
+        scheduler.reset()
+        profiler = self.profiler
+        last_profile_summary = self.clock.monotonic()
+        ticks = 0
+        try:
+            while not self._stop_flag:
+                if self._pause_flag:
+                    self._enter_pause()
+                    self._heartbeat()
+                    # На паузе тики не идут; ждем resume/stop, раз в интервал
+                    # отдавая heartbeat получателям.
+                    if self.clock.wait(scheduler.wake_event, scheduler.interval):
+                        scheduler.wake_event.clear()
+                    scheduler.reset()
+                    continue
+
+                timing = scheduler.wait_next(self._should_interrupt_wait)
+                if timing is None:
+                    continue
+
+                profiler.begin_tick()
+                tick_started = time.perf_counter()
+                self.step(activity_tracker, late=timing.late)
+                self._heartbeat()
+                profiler.mark(PHASE_SINKS)
+                profiler.end_tick()
+                self.tick_duration.record((time.perf_counter() - tick_started) * 1000)
+
+                if (
+                    profiler.enabled
+                    and timing.started - last_profile_summary
+                    >= PROFILE_SUMMARY_INTERVAL_SECONDS
+                ):
+                    last_profile_summary = timing.started
+                    self._status(profiler.format_summary())
+
+                ticks += 1
+                if max_ticks is not None and ticks >= max_ticks:
+                    break
+        finally:
+            activity_tracker.stop()
+            self._running = False
+            self._paused_changed(False)
+            for sink in self._sinks:
+                sink.on_stopped()
+            self._status("Трекер остановлен.")
+
+    def _should_interrupt_wait(self) -> bool:
+        return self._stop_flag or self._pause_flag
+
+    def _enter_pause(self) -> None:
+        last = self._last_snapshot
+        if last is None or last.paused:
+            return
+        self._publish(
+            self._build_snapshot(
+                now=self.clock.now(),
+                state="paused",
+                window=WindowInfo(
+                    process_name=last.app_name,
+                    window_title=last.window_title,
+                    exe_path=last.exe_path,
+                ),
+                user_active=last.user_active,
+                is_work_app=last.is_work_app,
+                is_distracting_app=last.is_distracting_app,
+                is_excluded_app=last.is_excluded_app,
+                idle_seconds=last.idle_seconds,
+                paused=True,
+            )
+        )
+        self._status("Трекинг поставлен на паузу.")
+        self._paused_changed(True)
+
+    def _apply_pending_changes(self, poll_files: bool = True) -> None:
+        if poll_files and self._config_watcher is not None:
+            if self.rules_service.reload_if_changed():
+                self._status("app_rules.json изменен извне, правила перечитаны.")
+            if self._config_watcher.changed():
+                try:
+                    fresh = read_config(CONFIG_PATH)
+                except (OSError, ValueError):
+                    self._config_watcher.invalidate(CONFIG_PATH)
+                else:
+                    if config_changes(self.config, fresh):
+                        if self.rules_service.replace_config(fresh):
+                            self._status("Путь к правилам изменен, правила перечитаны.")
+                        self.notify_config_changed(fresh)
+
+        if self._config_changed:
+            self._config_changed = False
+            self._adopt_pending_config()
+            self._idle_notify_seconds, self._fatigue_threshold = (
+                thresholds_for_config(self.config)
+            )
+            self.scheduler.set_interval(self.config.poll_interval_seconds)
+            if self.config.db_path != self._db_path:
+                self._db_path = self.config.db_path
+                init_db(self._db_path)
+                self.today.seed(self._db_path, self.config.poll_interval_seconds)
+            self._status("Настройки трекера применены.")
+
+    def step(
+        self,
+        activity_tracker: InputActivityTracker,
+        late: bool = False,
+    ) -> WorkerSnapshot:
+        """
+        Один тик трекинга. Если тик опоздал на целый интервал (late), опрос
+        файлов настроек и запись истории приложений откладываются до
+        следующего тика; событие, усталость и уведомления считаются всегда.
+        """
+        if self._last_snapshot is not None and self._last_snapshot.paused:
+            self._status("Трекинг возобновлен.")
+            self._paused_changed(False)
+
+        profiler = self.profiler
+        self._apply_pending_changes(poll_files=not late)
+        config = self.config
+        profiler.mark(PHASE_CONFIG)
+
+        now = self.clock.now()
+        last_input_time, inputs_since_last = activity_tracker.consume_stats()
+        idle_seconds = max((now - last_input_time).total_seconds(), 0.0)
+        user_active = idle_seconds <= config.idle_threshold_seconds
+        profiler.mark(PHASE_INPUT)
+
+        # Снимок правил берется один раз за тик: правки из GUI подменяют его
+        # атомарно и становятся видны со следующего тика.
+        rules = self.rules_service.snapshot
+        if rules.version != self._rules_version:
+            self._rules_version = rules.version
+            self._status(f"Правила приложений обновлены (версия {rules.version}).")
+
+        window = self._window_probe()
+        app_name = window.process_name or ""
+        app_name_norm = app_name.lower()
+        profiler.mark(PHASE_WINDOW)
+
+        if app_name_norm and not late:
+            signature = (app_name_norm, window.window_title or "")
+            if signature != self._last_observed_signature:
+                self.rules_service.record_observation(
+                    process_name=app_name_norm,
+                    window_title=window.window_title,
+                    exe_path=window.exe_path,
+                    observed_at=now,
+                )
+                self._last_observed_signature = signature
+        profiler.mark(PHASE_OBSERVE)
+
+        rule = rules.classify(
+            app_name_norm,
+            window_title=window.window_title,
+            exe_path=window.exe_path,
+        )
+        is_work_app = rule == RULE_WORK
+        is_distracting_app = rule == RULE_DISTRACTING
+        is_excluded_app = rule == RULE_EXCLUDED
+
+        if not user_active:
+            state = "idle"
+        elif is_work_app:
+            state = "work"
+        elif is_distracting_app:
+            state = "distract"
+        elif is_excluded_app:
+            state = "excluded"
+        else:
+            state = "other"
+        profiler.mark(PHASE_CLASSIFY)
+
+        db_started = time.perf_counter()
+        insert_event(
+            db_path=self._db_path,
+            timestamp_utc=now,
+            app_name=app_name,
+            window_title=window.window_title or "",
+            is_work_app=is_work_app,
+            is_distracting_app=is_distracting_app,
+            user_active=user_active,
+            idle_seconds=idle_seconds,
+            inputs_since_last=inputs_since_last,
+        )
+        self.db_write_duration.record((time.perf_counter() - db_started) * 1000)
+        dt = float(config.poll_interval_seconds)
+        self.today.add(
+            timestamp_utc=now,
+            app_name=app_name,
+            window_title=window.window_title or "",
+            user_active=user_active,
+            is_work_app=is_work_app,
+            is_distracting_app=is_distracting_app,
+            seconds=dt,
+        )
+        profiler.mark(PHASE_DB)
+
+        if state == "work":
+            self._fatigue_score += dt
+        elif state in {"idle", "distract"}:
+            self._fatigue_score = max(
+                0.0, self._fatigue_score - dt * FATIGUE_RECOVERY_FACTOR
+            )
+
+        if state == "idle":
+            self._non_productive_seconds = idle_seconds
+        elif state == "distract":
+            self._non_productive_seconds += dt
+        elif state == "work":
+            self._non_productive_seconds = 0.0
+
+        snapshot = self._build_snapshot(
+            now=now,
+            state=state,
+            window=window,
+            user_active=user_active,
+            is_work_app=is_work_app,
+            is_distracting_app=is_distracting_app,
+            is_excluded_app=is_excluded_app,
+            idle_seconds=idle_seconds,
+            paused=False,
+        )
+        self._publish(snapshot)
+        profiler.mark(PHASE_PUBLISH)
+        self._maybe_notify(now, state)
+        profiler.mark(PHASE_NOTIFY)
+        return snapshot
+
+    def _build_snapshot(
+        self,
+        now: datetime,
+        state: str,
+        window: WindowInfo,
+        user_active: bool,
+        is_work_app: bool,
+        is_distracting_app: bool,
+        is_excluded_app: bool,
+        idle_seconds: float,
+        paused: bool,
+    ) -> WorkerSnapshot:
+        fatigue_score = self._fatigue_score
+        fatigue_threshold = self._fatigue_threshold
+        non_productive_seconds = self._non_productive_seconds
+        idle_notify_seconds = self._idle_notify_seconds
+        return WorkerSnapshot(
+            timestamp_utc=now,
+            state=state,
+            status_text=status_text_for_state(state),
+            app_name=window.process_name,
+            window_title=window.window_title,
+            exe_path=window.exe_path,
+            user_active=user_active,
+            is_work_app=is_work_app,
+            is_distracting_app=is_distracting_app,
+            is_excluded_app=is_excluded_app,
+            idle_seconds=idle_seconds,
+            non_productive_seconds=non_productive_seconds,
+            fatigue_score=fatigue_score,
+            fatigue_threshold=fatigue_threshold,
+            idle_notify_seconds=idle_notify_seconds,
+            seconds_to_break=max(fatigue_threshold - fatigue_score, 0.0),
+            seconds_to_idle_warning=max(
+                idle_notify_seconds - non_productive_seconds, 0.0
+            ),
+            paused=paused,
+        )
+
+    def _maybe_notify(self, now: datetime, state: str) -> None:
+        config = self.config
+        notifier = self._notifier or get_dispatcher()
+
+        if (
+            state in {"idle", "distract"}
+            and config.notify_on_idle
+            and self._non_productive_seconds >= self._idle_notify_seconds
+        ):
+            last = self._last_idle_notification_time
+            if last is None or (now - last).total_seconds() >= self._idle_notify_seconds:
+                notifier.submit(
+                    NOTIFY_IDLE,
+                    "Пора вернуться к фокусу",
+                    "FocusMeter давно не видит продуктивной активности. Вернитесь к задаче или завершите сессию.",
+                )
+                self._last_idle_notification_time = now
+                self._non_productive_seconds = 0.0
+
+        if (
+            state == "work"
+            and config.notify_on_break
+            and self._fatigue_score >= self._fatigue_threshold
+        ):
+            last = self._last_break_notification_time
+            if (
+                last is None
+                or (now - last).total_seconds() >= MIN_BREAK_NOTIFY_INTERVAL_SECONDS
+            ):
+                notifier.submit(
+                    NOTIFY_BREAK,
+                    "Пора на короткий перерыв",
+                    "Вы долго держите фокус. Небольшая пауза сейчас поможет сохранить темп.",
+                )
+                self._last_break_notification_time = now
+                self._fatigue_score = self._fatigue_threshold * 0.5